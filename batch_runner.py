@@ -0,0 +1,231 @@
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from env import (
+    INITIAL_NUM_BIRDS,
+    FPS,
+    DESIRED_NUM_OBSTACLES,
+    OBSTACLE_SPEED,
+    FOOD_SPAWN_INTERVAL_FRAMES,
+    MAX_FOOD_ON_SCREEN,
+    GLOBAL_SPEED_FACTOR,
+    REPRODUCTION_THRESHOLD,
+    NUM_FLOCK_NEIGHBORS,
+    USE_SPATIAL_GRID,
+    USE_FLOCK_ENGINE,
+)
+from stats_sink import read_binary_stats
+
+# Defaults of every setting that can be swept; their types decide how
+# the values given on the command line are parsed.
+SWEEPABLE_SETTINGS = {
+    "INITIAL_NUM_BIRDS": INITIAL_NUM_BIRDS,
+    "FPS": FPS,
+    "DESIRED_NUM_OBSTACLES": DESIRED_NUM_OBSTACLES,
+    "OBSTACLE_SPEED": OBSTACLE_SPEED,
+    "FOOD_SPAWN_INTERVAL_FRAMES": FOOD_SPAWN_INTERVAL_FRAMES,
+    "MAX_FOOD_ON_SCREEN": MAX_FOOD_ON_SCREEN,
+    "GLOBAL_SPEED_FACTOR": GLOBAL_SPEED_FACTOR,
+    "REPRODUCTION_THRESHOLD": REPRODUCTION_THRESHOLD,
+    "NUM_FLOCK_NEIGHBORS": NUM_FLOCK_NEIGHBORS,
+    "USE_SPATIAL_GRID": USE_SPATIAL_GRID,
+    "USE_FLOCK_ENGINE": USE_FLOCK_ENGINE,
+}
+
+
+def parse_setting_value(key, text):
+    """
+    Converts a command-line value to the type of the setting's default.
+
+    Args:
+        key (str): The setting name.
+        text (str): The raw value.
+
+    Returns:
+        int | float | bool: The parsed value.
+    """
+    default = SWEEPABLE_SETTINGS[key]
+    if isinstance(default, bool):
+        return text.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(float(text))
+    return float(text)
+
+
+def parse_grid(specs):
+    """
+    Parses settings grid specifications of the form KEY=value1,value2,...
+
+    Args:
+        specs (list[str]): One specification per swept setting.
+
+    Returns:
+        dict: Setting name mapped to the list of values to try.
+    """
+    grid = {}
+    for spec in specs:
+        key, _, values = spec.partition("=")
+        key = key.strip().upper()
+        if key not in SWEEPABLE_SETTINGS:
+            raise ValueError(
+                f"Unknown setting '{key}'. Choose from: {', '.join(SWEEPABLE_SETTINGS)}"
+            )
+        if not values:
+            raise ValueError(f"No values given for '{key}'.")
+        grid[key] = [parse_setting_value(key, value) for value in values.split(",")]
+    return grid
+
+
+def build_jobs(grid, seeds, frames):
+    """
+    Expands a settings grid and a list of seeds into one job per combination.
+
+    Args:
+        grid (dict): Setting name mapped to the list of values to try.
+        seeds (list[int]): Random seeds; every setting combination runs once per seed.
+        frames (int): Number of frames each run simulates.
+
+    Returns:
+        list[dict]: Jobs with a run id, a seed, the settings overrides and the frame count.
+    """
+    keys = list(grid)
+    jobs = []
+    for combination in itertools.product(*(grid[key] for key in keys)):
+        overrides = dict(zip(keys, combination))
+        for seed in seeds:
+            jobs.append(
+                {
+                    "run_id": len(jobs),
+                    "seed": seed,
+                    "settings": overrides,
+                    "frames": frames,
+                }
+            )
+    return jobs
+
+
+def run_job(job):
+    """
+    Runs one headless simulation. Executed inside a worker process.
+
+    The trait time series is streamed to the binary statistics file named
+    in the job, so a worker's memory does not grow with the run length.
+
+    Args:
+        job (dict): A job produced by build_jobs, with a "stats_file" path.
+
+    Returns:
+        dict: The job and the run summary from Game.run_headless.
+    """
+    # Imported here so the parent process never initializes pygame.
+    from main import Game  # pylint: disable=import-outside-toplevel
+
+    game = Game(headless=True, settings_overrides=job["settings"], seed=job["seed"])
+    game.start_stats_log(job["stats_file"], stats_format="binary")
+    summary = game.run_headless(job["frames"])
+    return {"job": job, "summary": summary}
+
+
+def write_results(filename, grid_keys, results):
+    """
+    Merges the time series of every run into one CSV table.
+
+    The per-run statistics files are read one batch at a time, so the merge
+    needs no more memory for long runs than for short ones.
+
+    Args:
+        filename (str): The output path.
+        grid_keys (list[str]): The swept settings, written as columns.
+        results (list[dict]): Results returned by run_job, in run order.
+    """
+    header_written = False
+    with open(filename, "w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.writer(csvfile)
+        for result in results:
+            job = result["job"]
+            prefix = (
+                [job["run_id"], job["seed"]]
+                + [job["settings"][key] for key in grid_keys]
+                + [result["summary"]["frames"], result["summary"]["bird_count"]]
+            )
+            for columns, batch in read_binary_stats(job["stats_file"]):
+                if not header_written:
+                    writer.writerow(
+                        ["RunId", "Seed"]
+                        + grid_keys
+                        + ["FramesSimulated", "FinalBirdCount"]
+                        + columns
+                    )
+                    header_written = True
+                for row in zip(*(batch[name].tolist() for name in columns)):
+                    writer.writerow(prefix + list(row))
+
+
+def main():
+    """Parses the command line, runs every job in a process pool and writes the merged table."""
+    parser = argparse.ArgumentParser(
+        description="Run headless simulations over a grid of settings and seeds."
+    )
+    parser.add_argument(
+        "--set",
+        dest="grid",
+        action="append",
+        default=[],
+        metavar="KEY=V1,V2,...",
+        help="setting to sweep, e.g. NUM_FLOCK_NEIGHBORS=3,5,8 (repeatable)",
+    )
+    parser.add_argument(
+        "--seeds",
+        default="0",
+        help="comma-separated random seeds, each combination runs once per seed",
+    )
+    parser.add_argument(
+        "--frames", type=int, default=5000, help="frames to simulate per run"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes (default: all cores)",
+    )
+    parser.add_argument("--output", default=None, help="path of the merged CSV")
+    args = parser.parse_args()
+
+    grid = parse_grid(args.grid)
+    seeds = [int(seed) for seed in args.seeds.split(",")]
+    jobs = build_jobs(grid, seeds, args.frames)
+    output = args.output or (
+        f"batch_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    )
+
+    print(f"Running {len(jobs)} simulations on {args.workers} worker processes...")
+    start_time = time.perf_counter()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="batch_stats_") as stats_dir:
+        for job in jobs:
+            job["stats_file"] = os.path.join(stats_dir, f"run_{job['run_id']}.bin")
+        with multiprocessing.Pool(processes=args.workers) as pool:
+            for result in pool.imap_unordered(run_job, jobs):
+                results.append(result)
+                print(
+                    f"[{len(results)}/{len(jobs)}] run {result['job']['run_id']} "
+                    f"seed={result['job']['seed']} {result['job']['settings']}: "
+                    f"{result['summary']['frames']} frames, "
+                    f"{result['summary']['sim_fps']:.1f} frames/s"
+                )
+        results.sort(key=lambda result: result["job"]["run_id"])
+        write_results(output, list(grid), results)
+    print(
+        f"Finished {len(jobs)} runs in {time.perf_counter() - start_time:.1f}s. "
+        f"Results saved to {output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
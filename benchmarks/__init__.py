@@ -0,0 +1 @@
+"""Performance benchmarks of the simulation, run as `python -m benchmarks.<name>`."""
@@ -0,0 +1,159 @@
+"""
+Measures the strip-decomposed flock engine against the sequential one.
+
+Builds a population of randomly placed birds with obstacles and food, then
+times the steering phases (obstacle avoidance, flocking and food seeking) of
+FlockEngine and of DomainFlockEngine with each number of worker processes,
+and checks that every run produces exactly the sequential velocities. A few
+populations smaller than the number of workers, as near extinction, are
+checked first:
+
+    python -m benchmarks.domains --birds 50000,100000 --workers 2,4,8
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+DEFAULT_BIRDS = "50000,100000"
+DEFAULT_WORKERS = "2,4"
+DEFAULT_REPEAT = 3
+SMALL_POPULATIONS = (1, 2, 3)  # Fewer birds than workers leave workers idle
+NUM_OBSTACLES = 10
+NUM_FOOD = 200
+OBSTACLE_WARMUP_FRAMES = 120  # Comets spawn off screen; let them fly in
+
+
+def build_world(num_birds, pygame):
+    """
+    Creates the birds, obstacles and food of one benchmark population.
+
+    Args:
+        num_birds (int): Number of birds.
+        pygame (module): The imported pygame module.
+
+    Returns:
+        tuple: The bird, obstacle and food groups.
+    """
+    # pylint: disable=import-outside-toplevel
+    from bird_class import Bird
+    from env import SCREEN_WIDTH, SCREEN_HEIGHT
+    from food_class import Food
+    from obstacles import Obstacle
+    from particles import TrailParticleSystem
+    from rng import RNG
+
+    birds = pygame.sprite.Group(
+        Bird(RNG.uniform(0, SCREEN_WIDTH), RNG.uniform(0, SCREEN_HEIGHT))
+        for _ in range(num_birds)
+    )
+    trail_particles = TrailParticleSystem()
+    obstacles = pygame.sprite.Group(
+        Obstacle(trail_particles=trail_particles) for _ in range(NUM_OBSTACLES)
+    )
+    for _ in range(OBSTACLE_WARMUP_FRAMES):
+        obstacles.update()
+    food = pygame.sprite.Group(
+        Food(RNG.uniform(0, SCREEN_WIDTH), RNG.uniform(0, SCREEN_HEIGHT))
+        for _ in range(NUM_FOOD)
+    )
+    return birds, obstacles, food
+
+
+def time_steering(engine, world, repeat):
+    """
+    Steers the same population `repeat` times with an engine.
+
+    Args:
+        engine (FlockEngine): The engine to time.
+        world (tuple): The bird, obstacle and food groups.
+        repeat (int): Number of timed steps.
+
+    Returns:
+        tuple[float, numpy.ndarray]: Median milliseconds per step and the
+            velocities of the last step.
+    """
+    birds, obstacles, food = world
+    engine.sync(birds)
+    initial_state = engine.state.copy()
+    timings = []
+    for _ in range(repeat + 1):  # The first step starts the workers
+        engine.state[:] = initial_state
+        start = time.perf_counter()
+        engine.steer(obstacles, food)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    velocities = engine.state[2:4].copy()
+    # The birds are views of the engine's arrays; leave them as they were
+    # for the next engine.
+    engine.state[:] = initial_state
+    return statistics.median(timings[1:]), velocities
+
+
+def _int_list(text):
+    """Parses a comma-separated list of integers."""
+    return [int(value) for value in text.split(",")]
+
+
+def main():
+    """Parses the command line and prints the steering times."""
+    parser = argparse.ArgumentParser(
+        description="Steering time of the flock engine per number of domain workers."
+    )
+    parser.add_argument(
+        "--birds",
+        type=_int_list,
+        default=_int_list(DEFAULT_BIRDS),
+        help=f"comma-separated population sizes (default: {DEFAULT_BIRDS})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=_int_list,
+        default=_int_list(DEFAULT_WORKERS),
+        help=f"comma-separated worker process counts (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"timed steps per configuration (default: {DEFAULT_REPEAT})",
+    )
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    # pylint: disable=import-outside-toplevel
+    import numpy as np
+    import pygame
+    from domain_decomposition import DomainFlockEngine
+    from flock_engine import FlockEngine
+    from rng import seed_all
+
+    pygame.init()
+    seed_all(0)
+    print(f"{'birds':>8}{'workers':>9}{'ms':>10}{'speedup':>9}  velocities")
+    failed = False
+    for num_birds in SMALL_POPULATIONS + tuple(args.birds):
+        world = build_world(num_birds, pygame)
+        sequential_ms, expected = time_steering(FlockEngine(), world, args.repeat)
+        print(f"{num_birds:>8}{'-':>9}{sequential_ms:>10.1f}{1.0:>9.2f}")
+        for workers in args.workers:
+            engine = DomainFlockEngine(workers=workers)
+            try:
+                elapsed_ms, velocities = time_steering(engine, world, args.repeat)
+            finally:
+                engine.close()
+            identical = np.array_equal(velocities, expected)
+            failed |= not identical
+            print(
+                f"{num_birds:>8}{workers:>9}{elapsed_ms:>10.1f}"
+                f"{sequential_ms / elapsed_ms:>9.2f}  "
+                f"{'identical' if identical else 'DIFFERENT'}"
+            )
+    print(f"({os.cpu_count()} CPU cores)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
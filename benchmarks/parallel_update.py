@@ -0,0 +1,154 @@
+"""
+Compares the in-place sequential bird update with the two-phase threaded one.
+
+For every population size, starts the game headless from the same seed and
+times the bird update (neighbor search, steering, animation and movement)
+over a number of frames: once with Bird.update applied to one bird after
+the other, and once with ParallelBirdUpdater for each number of threads.
+The two-phase runs must end in the same state whatever the number of
+threads; how far the in-place run drifts from them after the first frame
+is printed as well:
+
+    python -m benchmarks.parallel_update --birds 2000,10000 --threads 1,2,4,8
+
+The chunks are steered with the NumPy flock kernels, which release the GIL
+inside their array loops, so the threads overlap also on a GIL build.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+DEFAULT_BIRDS = "2000,10000"
+DEFAULT_THREADS = "1,2,4"
+DEFAULT_FRAMES = 10
+BENCHMARK_SEED = 1234
+
+
+def _bird_state(game):
+    """Returns the position and velocity of every bird, in group order."""
+    return [(bird.x, bird.y, bird.speed_x, bird.speed_y) for bird in game.birds_group]
+
+
+def run(num_birds, threads, frames):
+    """
+    Times the bird update of a fresh game.
+
+    Args:
+        num_birds (int): Number of birds at the start.
+        threads (int): Threads of the two-phase update, 0 for the in-place
+                       sequential update.
+        frames (int): Number of timed frames.
+
+    Returns:
+        tuple[float, list, list]: Median milliseconds per frame, the bird
+            state after the first frame and after the last one.
+    """
+    from main import Game  # pylint: disable=import-outside-toplevel
+
+    game = Game(
+        headless=True,
+        seed=BENCHMARK_SEED,
+        settings_overrides={
+            "INITIAL_NUM_BIRDS": num_birds,
+            "PARALLEL_UPDATE_THREADS": threads,
+        },
+    )
+    groups = (game.birds_group, game.obstacle_group, game.food_group)
+    timings = []
+    first_state = None
+    try:
+        for _ in range(frames):
+            start = time.perf_counter()
+            if game.bird_updater:
+                game.bird_updater.update(*groups)
+            else:
+                # pylint: disable-next=protected-access
+                game.birds_group.update(*groups, game._rebuild_neighbor_grid())
+            timings.append((time.perf_counter() - start) * 1000.0)
+            if first_state is None:
+                first_state = _bird_state(game)
+    finally:
+        if game.bird_updater:
+            game.bird_updater.close()
+    return statistics.median(timings), first_state, _bird_state(game)
+
+
+def _max_difference(state, other):
+    """Returns the largest absolute difference between two bird states."""
+    return max(
+        (
+            abs(value - other_value)
+            for bird, other_bird in zip(state, other)
+            for value, other_value in zip(bird, other_bird)
+        ),
+        default=0.0,
+    )
+
+
+def _int_list(text):
+    """Parses a comma-separated list of integers."""
+    return [int(value) for value in text.split(",")]
+
+
+def main():
+    """Parses the command line and prints the update times."""
+    parser = argparse.ArgumentParser(
+        description="In-place sequential versus two-phase threaded bird update."
+    )
+    parser.add_argument(
+        "--birds",
+        type=_int_list,
+        default=_int_list(DEFAULT_BIRDS),
+        help=f"comma-separated population sizes (default: {DEFAULT_BIRDS})",
+    )
+    parser.add_argument(
+        "--threads",
+        type=_int_list,
+        default=_int_list(DEFAULT_THREADS),
+        help=f"comma-separated thread counts (default: {DEFAULT_THREADS})",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=DEFAULT_FRAMES,
+        help=f"timed frames per configuration (default: {DEFAULT_FRAMES})",
+    )
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(
+        f"Python {sys.version.split()[0]}, "
+        f"GIL {'enabled' if gil_enabled else 'disabled'}, {os.cpu_count()} CPU cores"
+    )
+    print(f"{'birds':>8}  {'update':<16}{'ms':>10}{'speedup':>9}  result")
+    failed = False
+    for num_birds in args.birds:
+        in_place_ms, in_place_first, _ = run(num_birds, 0, args.frames)
+        print(f"{num_birds:>8}  {'in place':<16}{in_place_ms:>10.1f}{1.0:>9.2f}")
+        reference = None
+        for threads in args.threads:
+            elapsed_ms, first_state, last_state = run(num_birds, threads, args.frames)
+            if reference is None:
+                reference = last_state
+                drift = _max_difference(first_state, in_place_first)
+                result = f"differs from in place by up to {drift:.3g} after 1 frame"
+            elif last_state == reference:
+                result = "identical"
+            else:
+                result = "DIFFERENT"
+                failed = True
+            label = f"two-phase x{threads}"
+            print(
+                f"{num_birds:>8}  {label:<16}{elapsed_ms:>10.1f}"
+                f"{in_place_ms / elapsed_ms:>9.2f}  {result}"
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+"""
+Scenario benchmarks of the simulation with fixed seeds.
+
+Every scenario runs the full game loop (simulation step and rendering to the
+offscreen surface of SDL's dummy video driver) for a population size and an
+obstacle and food density, and times every subsystem through the frame
+profiler. Results are appended to a JSON-lines history file, and `compare`
+flags the subsystems that got slower between two runs:
+
+    python -m benchmarks.scenarios list
+    python -m benchmarks.scenarios run --scenario "500_*" --label "before"
+    python -m benchmarks.scenarios run --scenario "500_*" --label "after"
+    python -m benchmarks.scenarios compare --threshold 10
+"""
+
+import argparse
+import fnmatch
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCHMARK_SEED = 1234
+DEFAULT_HISTORY = "benchmark_history.jsonl"
+DEFAULT_THRESHOLD_PERCENT = 10.0
+DEFAULT_MIN_MS = 0.05  # Baseline metrics below this are too noisy to compare
+
+POPULATIONS = (50, 500, 5000, 20000)
+# Measured frames per scenario; larger flocks take much longer per frame.
+FRAMES_PER_POPULATION = {50: 300, 500: 100, 5000: 10, 20000: 3}
+DENSITIES = {
+    "sparse": {"DESIRED_NUM_OBSTACLES": 2, "MAX_FOOD_ON_SCREEN": 30},
+    "default": {},
+    "dense": {"DESIRED_NUM_OBSTACLES": 28, "MAX_FOOD_ON_SCREEN": 600},
+}
+
+# Subsystems reported and compared, as the profiler phases they consist of.
+# Phases of the per-bird path and of the flock engine are both listed; only
+# the ones of the selected path are timed. In the engine the neighbor
+# search is part of engine.flock; with domain workers, flocking and food
+# seeking both run in domains.flock_food, and in the two-phase bird update
+# the neighbor search is parallel.neighbors and all steering parallel.plan.
+SUBSYSTEMS = {
+    "neighbor_search": (
+        "update.neighbor_grid",
+        "bird.neighbors",
+        "parallel.neighbors",
+    ),
+    "flocking": (
+        "bird.flock",
+        "engine.flock",
+        "domains.share",
+        "domains.flock_food",
+        "parallel.plan",
+    ),
+    "avoidance": (
+        "bird.avoid_obstacles",
+        "engine.avoid_obstacles",
+        "domains.avoid_obstacles",
+    ),
+    "food": ("bird.food", "engine.food", "update.food", "contacts.eating"),
+    "reproduction": ("contacts.mating",),
+    "deaths": ("contacts.deaths",),
+    "obstacles": ("update.obstacles",),
+    "particles": ("update.particles", "render.trails"),
+    "stats": ("update.stats",),
+    "gc": ("gc",),
+}
+
+
+def build_scenarios(engine=False, dirty_rects=False):
+    """
+    Lists every combination of population size and density.
+
+    Args:
+        engine (bool, optional): Run the birds in the NumPy flock engine
+                                 instead of the per-bird path. Defaults to False.
+        dirty_rects (bool, optional): Render with the dirty-rectangle renderer.
+                                      Defaults to False.
+
+    Returns:
+        list[dict]: Scenarios with a name, the settings overrides and the
+                    number of measured frames.
+    """
+    scenarios = []
+    for birds in POPULATIONS:
+        for density, overrides in DENSITIES.items():
+            settings = {"INITIAL_NUM_BIRDS": birds, "USE_FLOCK_ENGINE": engine}
+            settings.update(overrides)
+            name = f"{birds}_birds_{density}" + ("_engine" if engine else "")
+            scenarios.append(
+                {
+                    "name": name + ("_dirty" if dirty_rects else ""),
+                    "settings": settings,
+                    "frames": FRAMES_PER_POPULATION[birds],
+                    "dirty_rects": dirty_rects,
+                }
+            )
+    return scenarios
+
+
+def run_scenario(scenario, frames=None):
+    """
+    Runs one scenario and times it.
+
+    Args:
+        scenario (dict): A scenario from build_scenarios.
+        frames (int, optional): Measured frames; defaults to the scenario's.
+
+    Returns:
+        dict: The measured frames, the final bird count, the mean milliseconds
+              per frame of every metric (full frame, simulation step,
+              rendering and the subsystems) and of every profiler phase.
+    """
+    # Imported here so SDL_VIDEODRIVER is set before pygame initializes.
+    # pylint: disable=import-outside-toplevel
+    import pygame
+    from main import Game
+    from profiler import PROFILER
+
+    frames = frames or scenario["frames"]
+    game = Game(
+        seed=BENCHMARK_SEED,
+        settings_overrides=scenario["settings"],
+        dirty_rects=scenario["dirty_rects"],
+    )
+    PROFILER.set_recording(True)
+    for _ in range(max(1, frames // 5)):  # Warm up caches and fill the food
+        game.update_state()
+        game.render()
+        PROFILER.end_frame()
+
+    phase_totals = {}
+    update_total = render_total = 0.0
+    frame_times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        game.update_state()
+        updated = time.perf_counter()
+        game.render()
+        end = time.perf_counter()
+        update_total += updated - start
+        render_total += end - updated
+        frame_times.append(end - start)
+        for name, seconds in PROFILER.current.items():
+            phase_totals[name] = phase_totals.get(name, 0.0) + seconds
+        PROFILER.end_frame()
+    PROFILER.set_recording(False)
+    bird_count = len(game.birds_group)
+    pygame.quit()
+
+    phases = {
+        name: seconds * 1000.0 / frames
+        for name, seconds in sorted(phase_totals.items())
+    }
+    frame_times.sort()
+    metrics = {
+        "frame": sum(frame_times) * 1000.0 / frames,
+        "frame_p95": frame_times[math.ceil(frames * 0.95) - 1] * 1000.0,
+        "update": update_total * 1000.0 / frames,
+        "render": render_total * 1000.0 / frames,
+    }
+    for subsystem, names in SUBSYSTEMS.items():
+        metrics[subsystem] = sum(phases.get(name, 0.0) for name in names)
+    return {
+        "frames": frames,
+        "bird_count": bird_count,
+        "metrics": metrics,
+        "phases": phases,
+    }
+
+
+def current_commit():
+    """Returns the short hash of the checked-out commit, or None outside git."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def read_history(filename):
+    """
+    Loads a benchmark history file.
+
+    Returns:
+        dict: Run id mapped to its records, in the order the runs were made.
+    """
+    runs = {}
+    with open(filename, "r", encoding="utf-8") as history_file:
+        for line in history_file:
+            if line.strip():
+                record = json.loads(line)
+                runs.setdefault(record["run_id"], []).append(record)
+    return runs
+
+
+def command_list(args):
+    """Prints the scenarios."""
+    for scenario in build_scenarios(args.engine, args.dirty_rects):
+        print(
+            f"{scenario['name']:<28}{scenario['frames']:>5} frames  "
+            f"{scenario['settings']}"
+        )
+
+
+def command_run(args):
+    """Runs the selected scenarios and appends the results to the history."""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"  # Render offscreen, the same everywhere
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    patterns = args.scenario or ["*"]
+    scenarios = [
+        scenario
+        for scenario in build_scenarios(args.engine, args.dirty_rects)
+        if any(fnmatch.fnmatch(scenario["name"], pattern) for pattern in patterns)
+    ]
+    if not scenarios:
+        print("No scenario matches the given patterns.")
+        return 1
+
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    common = {
+        "run_id": run_id,
+        "label": args.label,
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "seed": BENCHMARK_SEED,
+    }
+    print(f"Benchmark run {run_id}: {len(scenarios)} scenarios")
+    print(
+        f"{'scenario':<28}{'frame ms':>10}{'p95':>9}{'update':>9}{'render':>9}"
+        "  slowest subsystems"
+    )
+    with open(args.history, "a", encoding="utf-8") as history_file:
+        for scenario in scenarios:
+            result = run_scenario(scenario, args.frames)
+            record = dict(
+                common, scenario=scenario["name"], settings=scenario["settings"]
+            )
+            record.update(result)
+            history_file.write(json.dumps(record) + "\n")
+            history_file.flush()
+
+            metrics = result["metrics"]
+            slowest = sorted(SUBSYSTEMS, key=lambda name: -metrics[name])[:3]
+            print(
+                f"{scenario['name']:<28}{metrics['frame']:>10.2f}"
+                f"{metrics['frame_p95']:>9.2f}{metrics['update']:>9.2f}"
+                f"{metrics['render']:>9.2f}  "
+                + ", ".join(f"{name} {metrics[name]:.2f}" for name in slowest)
+            )
+    print(f"Results appended to {args.history}")
+    return 0
+
+
+def command_compare(args):
+    """Compares two runs of the history and flags regressions."""
+    runs = read_history(args.history)
+    run_ids = list(runs)
+    if len(run_ids) < 2 and not (args.baseline and args.candidate):
+        print("The history needs at least two runs to compare.")
+        return 1
+    baseline_id = args.baseline or run_ids[-2]
+    candidate_id = args.candidate or run_ids[-1]
+    for run_id in (baseline_id, candidate_id):
+        if run_id not in runs:
+            print(f"Run {run_id} is not in {args.history}.")
+            return 1
+    baseline = {record["scenario"]: record for record in runs[baseline_id]}
+    candidate = {record["scenario"]: record for record in runs[candidate_id]}
+
+    baseline_label = runs[baseline_id][0].get("label") or "-"
+    candidate_label = runs[candidate_id][0].get("label") or "-"
+    print(
+        f"Baseline {baseline_id} ({baseline_label}) vs candidate {candidate_id} "
+        f"({candidate_label}), threshold {args.threshold:.0f}%"
+    )
+    regressions = 0
+    for name, new in candidate.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        if old["settings"] != new["settings"]:
+            print(f"{name}: settings differ, skipped")
+            continue
+        for metric, old_ms in old["metrics"].items():
+            new_ms = new["metrics"].get(metric)
+            if new_ms is None or old_ms < args.min_ms:
+                continue
+            change = (new_ms - old_ms) / old_ms * 100.0
+            if change > args.threshold:
+                status = "REGRESSION"
+                regressions += 1
+            elif change < -args.threshold:
+                status = "faster"
+            elif args.verbose:
+                status = ""
+            else:
+                continue
+            print(
+                f"{name:<28}{metric:<16}{old_ms:>10.2f} ->{new_ms:>10.2f} ms "
+                f"{change:>+7.1f}%  {status}"
+            )
+    print(f"{regressions} regression(s) beyond {args.threshold:.0f}%.")
+    return 1 if regressions else 0
+
+
+def main():
+    """Parses the command line and runs the chosen command."""
+    parser = argparse.ArgumentParser(
+        description="Scenario benchmarks of the simulation."
+    )
+    parser.add_argument(
+        "--history",
+        default=DEFAULT_HISTORY,
+        help=f"JSON-lines results file (default: {DEFAULT_HISTORY})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="list the scenarios")
+    run_parser = commands.add_parser(
+        "run", help="run scenarios and record the results"
+    )
+    for sub_parser in (list_parser, run_parser):
+        sub_parser.add_argument(
+            "--engine",
+            action="store_true",
+            help="run the birds in the NumPy flock engine",
+        )
+        sub_parser.add_argument(
+            "--dirty-rects",
+            action="store_true",
+            help="render with the dirty-rectangle renderer",
+        )
+    run_parser.add_argument(
+        "--scenario",
+        action="append",
+        metavar="PATTERN",
+        help="only run scenarios matching this glob pattern (repeatable)",
+    )
+    run_parser.add_argument(
+        "--frames", type=int, default=None, help="measured frames per scenario"
+    )
+    run_parser.add_argument("--label", default=None, help="note stored with the run")
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare two runs and flag regressions"
+    )
+    compare_parser.add_argument(
+        "--baseline", help="run id of the baseline (default: the second to last run)"
+    )
+    compare_parser.add_argument(
+        "--candidate", help="run id to check (default: the last run)"
+    )
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD_PERCENT,
+        help="percent slowdown that counts as a regression "
+        f"(default: {DEFAULT_THRESHOLD_PERCENT:.0f})",
+    )
+    compare_parser.add_argument(
+        "--min-ms",
+        type=float,
+        default=DEFAULT_MIN_MS,
+        help="ignore metrics faster than this in the baseline "
+        f"(default: {DEFAULT_MIN_MS} ms)",
+    )
+    compare_parser.add_argument(
+        "--verbose", action="store_true", help="also print unchanged metrics"
+    )
+    args = parser.parse_args()
+
+    if args.command == "list":
+        command_list(args)
+        return 0
+    if args.command == "run":
+        return command_run(args)
+    return command_compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Measures what creating a bird, a food item and a comet costs.
+
+For every entity kind, creates a batch of instances and reports the time per
+instance, the Python heap it holds (traced with tracemalloc) and the pixel
+memory of the surfaces it references, counting a surface shared by several
+instances only once:
+
+    python -m benchmarks.spawn --count 2000 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+DEFAULT_COUNT = 2000
+DEFAULT_REPEAT = 5
+
+
+def _surfaces_of(entity, pygame):
+    """Yields the surfaces an entity references directly or in a list or tuple."""
+    for value in vars(entity).values():
+        if isinstance(value, pygame.Surface):
+            yield value
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, pygame.Surface):
+                    yield item
+
+
+def measure(kind, factory, count, repeat, pygame):
+    """
+    Creates `count` entities `repeat` times and measures them.
+
+    Args:
+        kind (str): The label printed for the entity kind.
+        factory (callable): Creates one entity.
+        count (int): Entities per batch.
+        repeat (int): Number of timed batches.
+        pygame (module): The imported pygame module.
+
+    Returns:
+        dict: Median microseconds per entity, Python heap bytes per entity and
+              surface pixel bytes per entity.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        batch = [factory() for _ in range(count)]
+        timings.append((time.perf_counter() - start) * 1e6 / count)
+        del batch
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    batch = [factory() for _ in range(count)]
+    heap_bytes = (tracemalloc.get_traced_memory()[0] - before) / count
+    tracemalloc.stop()
+
+    surfaces = {}
+    for entity in batch:
+        for surface in _surfaces_of(entity, pygame):
+            surfaces[id(surface)] = surface
+    pixel_bytes = sum(
+        surface.get_pitch() * surface.get_height() for surface in surfaces.values()
+    )
+    return {
+        "kind": kind,
+        "spawn_us": statistics.median(timings),
+        "heap_bytes": heap_bytes,
+        "pixel_bytes": pixel_bytes / count,
+        "surfaces": len(surfaces),
+    }
+
+
+def main():
+    """Parses the command line and prints the spawn costs."""
+    parser = argparse.ArgumentParser(description="Spawn cost of the game entities.")
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=DEFAULT_COUNT,
+        help=f"entities per batch (default: {DEFAULT_COUNT})",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"timed batches per entity kind (default: {DEFAULT_REPEAT})",
+    )
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    # pylint: disable=import-outside-toplevel
+    import pygame
+    from bird_class import Bird
+    from food_class import Food
+    from obstacles import Obstacle
+    from particles import TrailParticleSystem
+    from rng import seed_all
+
+    pygame.init()
+    seed_all(0)
+    trail_particles = TrailParticleSystem()
+    factories = (
+        ("bird", lambda: Bird(100, 100)),
+        ("food", lambda: Food(100, 100)),
+        ("comet", lambda: Obstacle(trail_particles=trail_particles)),
+    )
+    print(
+        f"{'entity':<8}{'spawn us':>10}{'heap B':>10}{'pixels B':>10}"
+        f"{'surfaces':>10}  (per entity, {args.count} entities)"
+    )
+    for kind, factory in factories:
+        result = measure(kind, factory, args.count, args.repeat, pygame)
+        print(
+            f"{result['kind']:<8}{result['spawn_us']:>10.1f}"
+            f"{result['heap_bytes']:>10.0f}{result['pixel_bytes']:>10.0f}"
+            f"{result['surfaces']:>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Measures how long the simulation takes to start.
+
+Every repetition runs in a fresh interpreter, so module imports are cold,
+and reports the import and initialization phases separately:
+
+    python -m benchmarks.startup --repeat 5 --graph-backend matplotlib
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PHASES = (
+    "import pygame",
+    "import game modules",
+    "init headless game",
+    "init window game",
+    "import graph backend",
+    "first graph toggle",
+)
+
+
+def measure_once(graph_backend):
+    """
+    Times every startup phase once in the current interpreter.
+
+    Args:
+        graph_backend (str): "matplotlib" or "native".
+
+    Returns:
+        dict: Milliseconds per phase; a phase that failed maps to its error message.
+    """
+    # pylint: disable=import-outside-toplevel
+    timings = {}
+    start = time.perf_counter()
+    import pygame
+
+    timings["import pygame"] = (time.perf_counter() - start) * 1000.0
+
+    start = time.perf_counter()
+    from main import Game
+
+    timings["import game modules"] = (time.perf_counter() - start) * 1000.0
+
+    start = time.perf_counter()
+    Game(headless=True, seed=0)
+    timings["init headless game"] = (time.perf_counter() - start) * 1000.0
+
+    start = time.perf_counter()
+    game = Game(seed=0, graph_backend=graph_backend)
+    timings["init window game"] = (time.perf_counter() - start) * 1000.0
+
+    try:
+        start = time.perf_counter()
+        if graph_backend == "native":
+            import native_chart  # noqa: F401
+        else:
+            import plotter  # noqa: F401
+        timings["import graph backend"] = (time.perf_counter() - start) * 1000.0
+
+        start = time.perf_counter()
+        game._toggle_graph()  # pylint: disable=protected-access
+        timings["first graph toggle"] = (time.perf_counter() - start) * 1000.0
+        game.plotter.shutdown()
+    except (ImportError, RuntimeError) as e:
+        timings.setdefault("import graph backend", f"unavailable: {e}")
+    pygame.quit()
+    return timings
+
+
+def run_cold(graph_backend):
+    """
+    Runs measure_once in a new interpreter.
+
+    Returns:
+        dict: The timings printed by the child process.
+    """
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", graph_backend],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Parses the command line, runs the repetitions and prints the table."""
+    parser = argparse.ArgumentParser(
+        description="Measure the cold-start time of the simulation."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="number of fresh interpreters to time"
+    )
+    parser.add_argument(
+        "--graph-backend",
+        choices=("matplotlib", "native"),
+        default="matplotlib",
+        help="graph backend loaded by the first toggle (default: matplotlib)",
+    )
+    parser.add_argument("--child", metavar="BACKEND", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_once(args.child)))
+        return
+
+    runs = [run_cold(args.graph_backend) for _ in range(args.repeat)]
+    print(f"Startup phases over {len(runs)} cold starts (ms):")
+    print(f"{'phase':<24}{'median':>10}{'min':>10}")
+    for phase in PHASES:
+        samples = sorted(run[phase] for run in runs if isinstance(run.get(phase), float))
+        if samples:
+            print(f"{phase:<24}{samples[len(samples) // 2]:>10.1f}{samples[0]:>10.1f}")
+        else:
+            errors = {run[phase] for run in runs if phase in run}
+            print(f"{phase:<24}{'n/a':>10}  {'; '.join(errors) or 'skipped'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Compares seeded bird trajectories of the flock engine with the two-phase update.
+
+The flock engine steers every bird from the state all birds had at the
+start of the frame, like the two-phase update of ParallelBirdUpdater, and
+not bird after bird like Bird.update. For every population size, this
+starts the game headless from the same seed and records the position and
+velocity of every bird after each frame: with the two-phase update, with
+the flock engine and with the flock engine in domain worker processes.
+Both engines must stay within the tolerance of the two-phase update on
+every frame; how far the in-place per-object update drifts from it is
+printed as well:
+
+    python -m benchmarks.trajectories --birds 50,300 --frames 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+DEFAULT_BIRDS = "50,300"
+DEFAULT_FRAMES = 200
+DEFAULT_TOLERANCE = 1e-9
+BENCHMARK_SEED = 1234
+
+# The reference update and the ones compared against it, as settings overrides.
+REFERENCE = ("two-phase", {"PARALLEL_UPDATE_THREADS": 1})
+CHECKED_MODES = {
+    "engine": {"USE_FLOCK_ENGINE": True},
+    "engine, 2 domains": {"DOMAIN_WORKERS": 2},
+}
+INFORMATIONAL_MODES = {"per object": {}}
+
+
+def record(num_birds, frames, overrides):
+    """
+    Runs a fresh game and records the birds after every frame.
+
+    Args:
+        num_birds (int): Number of birds at the start.
+        frames (int): Number of simulated frames.
+        overrides (dict): Settings selecting the bird update path.
+
+    Returns:
+        tuple[list, float]: The (x, y, speed_x, speed_y) of every bird in group
+            order, one list per frame, and the elapsed seconds.
+    """
+    from main import Game  # pylint: disable=import-outside-toplevel
+
+    game = Game(
+        headless=True,
+        seed=BENCHMARK_SEED,
+        settings_overrides={
+            "INITIAL_NUM_BIRDS": num_birds,
+            "DOMAIN_WORKERS": 0,
+            "PARALLEL_UPDATE_THREADS": 0,
+            "USE_FLOCK_ENGINE": False,
+            **overrides,
+        },
+    )
+    trajectory = []
+    start = time.perf_counter()
+    try:
+        for _ in range(frames):
+            if not game.birds_group:
+                break
+            game.update_state()
+            trajectory.append(
+                [
+                    (bird.x, bird.y, bird.speed_x, bird.speed_y)
+                    for bird in game.birds_group
+                ]
+            )
+    finally:
+        if hasattr(game.flock_engine, "close"):
+            game.flock_engine.close()
+        if game.bird_updater:
+            game.bird_updater.close()
+    return trajectory, time.perf_counter() - start
+
+
+def first_divergence(trajectory, reference, tolerance):
+    """
+    Finds the first frame on which two trajectories differ by more than the tolerance.
+
+    Args:
+        trajectory (list): The trajectory to check, as returned by record().
+        reference (list): The two-phase trajectory.
+        tolerance (float): Largest allowed absolute difference of any value.
+
+    Returns:
+        tuple[int or None, float]: The first diverging frame (None if there is
+            none) and the largest difference up to it.
+    """
+    largest = 0.0
+    for frame, (birds, reference_birds) in enumerate(zip(trajectory, reference)):
+        if len(birds) != len(reference_birds):
+            return frame, largest
+        difference = max(
+            (
+                abs(value - reference_value)
+                for bird, reference_bird in zip(birds, reference_birds)
+                for value, reference_value in zip(bird, reference_bird)
+            ),
+            default=0.0,
+        )
+        if difference > tolerance:
+            return frame, max(largest, difference)
+        largest = max(largest, difference)
+    if len(trajectory) != len(reference):
+        return min(len(trajectory), len(reference)), largest
+    return None, largest
+
+
+def _int_list(text):
+    """Parses a comma-separated list of integers."""
+    return [int(value) for value in text.split(",")]
+
+
+def main():
+    """Parses the command line and prints how far each path drifts."""
+    parser = argparse.ArgumentParser(
+        description="Seeded trajectories of the flock engine against the "
+        "two-phase bird update."
+    )
+    parser.add_argument(
+        "--birds",
+        type=_int_list,
+        default=_int_list(DEFAULT_BIRDS),
+        help=f"comma-separated population sizes (default: {DEFAULT_BIRDS})",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=DEFAULT_FRAMES,
+        help=f"simulated frames per run (default: {DEFAULT_FRAMES})",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"largest allowed difference (default: {DEFAULT_TOLERANCE})",
+    )
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    print(f"{'birds':>8}  {'update':<20}{'ms/frame':>10}  result")
+    failed = False
+    for num_birds in args.birds:
+        label, overrides = REFERENCE
+        reference, elapsed = record(num_birds, args.frames, overrides)
+        frame_ms = elapsed * 1000.0 / max(len(reference), 1)
+        print(f"{num_birds:>8}  {label:<20}{frame_ms:>10.1f}  reference")
+        for label, overrides in {**CHECKED_MODES, **INFORMATIONAL_MODES}.items():
+            trajectory, elapsed = record(num_birds, args.frames, overrides)
+            frame_ms = elapsed * 1000.0 / max(len(trajectory), 1)
+            frame, largest = first_divergence(trajectory, reference, args.tolerance)
+            if frame is None:
+                result = f"within {args.tolerance:g} (up to {largest:.3g})"
+            else:
+                result = f"diverges on frame {frame + 1}"
+                failed |= label in CHECKED_MODES
+            print(f"{num_birds:>8}  {label:<20}{frame_ms:>10.1f}  {result}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
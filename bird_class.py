@@ -1,19 +1,35 @@
 import heapq
 import math
-import random
+import time
 import pygame
 from env import (
     SCREEN_WIDTH,
     SCREEN_HEIGHT,
-    DEFAULT_RADIUS,
     NUM_FLOCK_NEIGHBORS,
-    REPRODUCTION_THRESHOLD,
     OBSTACLE_REACTION_DISTANCE_HORIZONTAL,
     OBSTACLE_VERTICAL_EVASION_MAGNITUDE,
     GLOBAL_SPEED_FACTOR,
 )  # Import only necessary defaults
+from entity_pool import EntityPool, PooledGroup
+from population_stats import PopulationStats
+from profiler import PROFILER
+from rng import RNG, next_serial
+from sprite_atlas import SPRITE_ATLAS, BIRD_WIDTH, BIRD_HEIGHT
+from sprite_cache import BIRD_ROTATION_CACHE
 DEFAULT_OBSTACLE_AVOIDANCE_RADIUS = 100.0
 
+# --- Constants for tuning avoidance behavior ---
+# Maximum number of frames to look into the future for CPA
+MAX_PREDICTION_HORIZON_FRAMES = 60  # How far to look ahead
+# Base magnitude for the repulsion force
+BASE_REPULSION_FORCE_MAGNITUDE = 200.0 # Overall strength of avoidance
+# Scalar for how much `self.obstacle_avoidance_distance` affects the safe distance buffer
+AVOIDANCE_DISTANCE_BUFFER_SCALAR = 150.0 # Translates trait to pixel buffer
+# Scalar for how much `self.obstacle_avoidance_distance` affects repulsion strength
+AVOIDANCE_STRENGTH_SENSITIVITY_SCALAR = 2.0 # How trait influences force
+# Epsilon for floating point comparisons to avoid division by zero
+EPSILON = 0.001
+
 
 class Bird(pygame.sprite.Sprite):
     """
@@ -24,6 +40,11 @@ class Bird(pygame.sprite.Sprite):
     The visual appearance of the bird is a simple animated sprite.
     """
 
+    # --- Bird Visual Properties, the same for every bird ---
+    bird_width = BIRD_WIDTH
+    bird_height = BIRD_HEIGHT
+    radius = max(BIRD_WIDTH, BIRD_HEIGHT) // 2
+
     def __init__(
         self,
         x,
@@ -57,97 +78,73 @@ class Bird(pygame.sprite.Sprite):
                                        ENV.py are used.
         """
         super().__init__()
+        self.reset(
+            x,
+            y,
+            cohesion_strength,
+            alignment_strength,
+            separation_strength,
+            avoidance_strength,
+            food_attraction_strength,
+            obstacle_avoidance_distance,
+            settings,
+        )
+
+    def reset(
+        self,
+        x,
+        y,
+        cohesion_strength=0.1,
+        alignment_strength=0.1,
+        separation_strength=0.1,
+        avoidance_strength=0.1,
+        food_attraction_strength=0.1,
+        obstacle_avoidance_distance=0.1,
+        settings=None,
+    ):
+        """
+        (Re)initializes the bird in place as a newly hatched one, e.g. when
+        BIRD_POOL reuses it. Takes the same arguments as the constructor.
+        """
         self.settings = settings  # Store the settings
+        self.serial = next_serial()  # Run-independent tie-break key
         self.scree_width = SCREEN_WIDTH
         self.screen_height = SCREEN_HEIGHT
-        self.cohesion_strength = cohesion_strength * random.uniform(0.9, 1.1)
-        self.alignment_strength = alignment_strength * random.uniform(0.9, 1.1)
-        self.separation_strength = separation_strength * random.uniform(0.9, 1.1)
-        self.avoidance_strength = avoidance_strength * random.uniform(0.9, 1.1)
+        self.cohesion_strength = cohesion_strength * RNG.uniform(0.9, 1.1)
+        self.alignment_strength = alignment_strength * RNG.uniform(0.9, 1.1)
+        self.separation_strength = separation_strength * RNG.uniform(0.9, 1.1)
+        self.avoidance_strength = avoidance_strength * RNG.uniform(0.9, 1.1)
         self.x = x
         self.y = y
-        self.obstacle_avoidance_distance = obstacle_avoidance_distance * random.uniform(
+        # Position before the last move, for interpolated rendering
+        self.prev_x = x
+        self.prev_y = y
+        self.obstacle_avoidance_distance = obstacle_avoidance_distance * RNG.uniform(
             0.9, 1.1
         )
-        self.food_attraction_strength = food_attraction_strength * random.uniform(
+        self.food_attraction_strength = food_attraction_strength * RNG.uniform(
             0.9, 1.1
         )
 
-        angle = random.uniform(0, 2 * math.pi)
+        angle = RNG.uniform(0, 2 * math.pi)
         self.speed_x = math.cos(angle)
         self.speed_y = math.sin(angle)
 
-        # --- Bird Visual Properties ---
-        self.bird_width = DEFAULT_RADIUS * 5
-        self.bird_height = DEFAULT_RADIUS * 3
-
-        self.body_color = (170, 190, 220)  # Light bluish-grey
-        self.wing_color = (140, 160, 190)  # Darker bluish-grey
-        self.beak_color = (255, 180, 0)  # Bright orange/yellow
-        self.eye_color = (0, 0, 0)
-
-        self.radius = max(self.bird_width, self.bird_height) // 2
-        # --- End of New Tiny Bird Visual Properties ---
-
-        self.separation_distance = 50 * random.uniform(
+        self.separation_distance = 50 * RNG.uniform(
             0.9, 1.1
         )  # User's original value
         self.food_counter = 0
 
-        # --- Create the Base Image (Tiny Bird facing right) ---
+        # --- Base Image (Tiny Bird facing right), shared by every bird ---
         # For animation
-        self.animation_frames = [
-            self._create_tiny_bird_image(wing_offset=0),  # Wings normal
-            self._create_tiny_bird_image(wing_offset=-2),  # Wings up
-        ]
+        self.animation_frames = SPRITE_ATLAS.bird_frames()
         self.current_frame_index = 0
         self.animation_timer = 0
         self.base_image = self.animation_frames[self.current_frame_index]
 
-        self.image = self.base_image.copy()
+        self.image = self.base_image
         self.rect = self.image.get_rect(center=(self.x, self.y))
 
-    def _create_tiny_bird_image(self, wing_offset=0):
-        """
-        Creates a Pygame Surface representing a small bird.
-
-        The bird is drawn facing to the right, with a simple body, wing, beak, and eye.
-        The wing position can be offset for animation.
-
-        Args:
-            wing_offset (int, optional): Vertical offset for the wing, used for flapping animation.
-                                         Defaults to 0.
-
-        Returns:
-            pygame.Surface: A Surface object with the bird image.
-        """
-        image = pygame.Surface((self.bird_width, self.bird_height), pygame.SRCALPHA)
-        body_rect = pygame.Rect(0, 1, self.bird_width - 3, self.bird_height - 2)
-        pygame.draw.ellipse(image, self.body_color, body_rect)
-        wing_width = int(self.bird_width * 0.4)
-        wing_height = int(self.bird_height * 0.5)
-        wing_x = body_rect.centerx - wing_width - 1
-        wing_y = body_rect.centery - wing_height // 2 + wing_offset  # Apply offset
-        pygame.draw.ellipse(
-            image, self.wing_color, (wing_x, wing_y, wing_width, wing_height)
-        )
-        beak_tip_x = self.bird_width - 1
-        beak_tip_y = self.bird_height // 2
-        beak_base_x = self.bird_width - 4
-        pygame.draw.polygon(
-            image,
-            self.beak_color,
-            [
-                (beak_tip_x, beak_tip_y),
-                (beak_base_x, beak_tip_y - 2),
-                (beak_base_x, beak_tip_y + 2),
-            ],
-        )
-        eye_x = int(self.bird_width * 0.70)
-        eye_y = int(self.bird_height * 0.35)
-        pygame.draw.circle(image, self.eye_color, (eye_x, eye_y), 1)
-        return image
-
     def move(self):
         """
         Updates the bird's position based on its current speed.
@@ -159,6 +156,8 @@ class Bird(pygame.sprite.Sprite):
         if self.settings and "GLOBAL_SPEED_FACTOR" in self.settings:
             current_global_speed_factor = self.settings["GLOBAL_SPEED_FACTOR"]
 
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.x += self.speed_x * current_global_speed_factor
         self.y += self.speed_y * current_global_speed_factor
 
@@ -249,18 +248,6 @@ class Bird(pygame.sprite.Sprite):
         accumulated_avoidance_force_x = 0.0
         accumulated_avoidance_force_y = 0.0
 
-        # --- Constants for tuning avoidance behavior ---
-        # Maximum number of frames to look into the future for CPA
-        MAX_PREDICTION_HORIZON_FRAMES = 60  # How far to look ahead
-        # Base magnitude for the repulsion force
-        BASE_REPULSION_FORCE_MAGNITUDE = 200.0 # Overall strength of avoidance
-        # Scalar for how much `self.obstacle_avoidance_distance` affects the safe distance buffer
-        AVOIDANCE_DISTANCE_BUFFER_SCALAR = 150.0 # Translates trait to pixel buffer
-        # Scalar for how much `self.obstacle_avoidance_distance` affects repulsion strength
-        AVOIDANCE_STRENGTH_SENSITIVITY_SCALAR = 2.0 # How trait influences force
-        # Epsilon for floating point comparisons to avoid division by zero
-        EPSILON = 0.001
-
         # Get current global speed factor for accurate bird prediction
         current_global_speed_factor = GLOBAL_SPEED_FACTOR  # Default from ENV
         if self.settings and "GLOBAL_SPEED_FACTOR" in self.settings:
@@ -398,12 +385,14 @@ class Bird(pygame.sprite.Sprite):
 
     def move_towards_food(self, food_group):
         """
-        Moves the bird towards the closest food item and consumes it upon collision.
+        Steers the bird towards the closest food item.
+
+        If the group keeps a spatial index (FoodGroup), the closest item is
+        looked up in it. Eating is settled for all birds at once by
+        broadphase.resolve_contacts.
 
         Args:
             food_group (pygame.sprite.Group): A group of food sprites.
-            all_birds_group (pygame.sprite.Group): The group containing all birds,
-                                                   used for reproduction logic.
         """
         if not food_group:
             return
@@ -412,15 +401,18 @@ class Bird(pygame.sprite.Sprite):
         min_dist_sq = float("inf")
 
         # Step 1: Find the single closest food item
-        for food_item in food_group.sprites():
-            if not hasattr(food_item, "rect"):  # Basic check
-                continue
-            dx = food_item.rect.centerx - self.x
-            dy = food_item.rect.centery - self.y
-            dist_sq = dx**2 + dy**2
-            if dist_sq < min_dist_sq:
-                min_dist_sq = dist_sq
-                closest_food = food_item
+        if hasattr(food_group, "nearest"):
+            closest_food = food_group.nearest(self.x, self.y)
+        else:
+            for food_item in food_group.sprites():
+                if not hasattr(food_item, "rect"):  # Basic check
+                    continue
+                dx = food_item.rect.centerx - self.x
+                dy = food_item.rect.centery - self.y
+                dist_sq = dx**2 + dy**2
+                if dist_sq < min_dist_sq:
+                    min_dist_sq = dist_sq
+                    closest_food = food_item
 
         # Step 2: Act on the closest food (if one was found)
         # This entire block is now OUTSIDE the loop above.
@@ -445,37 +437,75 @@ class Bird(pygame.sprite.Sprite):
                 weight_for_food,  # Pass the calculated weight
             )
 
-            # Check collision with the definitively closest food
-            if pygame.sprite.collide_rect(self, closest_food):
-                closest_food.kill()  # Remove the eaten food
-                self.food_counter += 1
-
-    def update(self, birds_group, obstacles, food_group):
+    def update(self, birds_group, obstacles, food_group, neighbor_grid=None):
         """
         Updates the bird's state for the current frame.
 
         This includes obstacle avoidance, flocking, moving towards food,
-        handling reproduction, animation, and updating the bird's visual
-        representation and position.
+        animation, and updating the bird's visual representation and position.
+        Deaths, eating and reproduction are settled before the birds update,
+        from the contacts found by broadphase.resolve_contacts.
 
         Args:
             birds_group (pygame.sprite.Group): The group containing all bird sprites.
             obstacles (pygame.sprite.Group): The group containing all obstacle sprites.
             food_group (pygame.sprite.Group): The group containing all food sprites.
+            neighbor_grid (SpatialGrid, optional): The per-frame spatial index of
+                                                   birds_group. When None, neighbors
+                                                   are found by brute force.
         """
+        # Checked once so a disabled profiler costs one attribute lookup per bird.
+        profiling = PROFILER.enabled
+        if profiling:
+            lap = time.perf_counter()
         self.avoid_obstacles(obstacles)
-        for obstacle in obstacles:
-            if hasattr(obstacle, "hitbox"):
-                if self.rect.colliderect(obstacle.hitbox):
-                    self.kill()
-                    return
+        if profiling:
+            lap = PROFILER.lap("bird.avoid_obstacles", lap)
 
-        closest_birds_for_flocking = self.get_closest_n_birds(birds_group)
+        closest_birds_for_flocking = self.get_closest_n_birds(
+            birds_group, neighbor_grid
+        )
+        if profiling:
+            lap = PROFILER.lap("bird.neighbors", lap)
         if closest_birds_for_flocking:  # Only flock if neighbors are found
             self.flock(closest_birds_for_flocking)
-        self.move_towards_food(food_group)  # Pass birds_group for reproduction
+        if profiling:
+            lap = PROFILER.lap("bird.flock", lap)
+        self.move_towards_food(food_group)
+        if profiling:
+            lap = PROFILER.lap("bird.food", lap)
+
+        self.advance(lap if profiling else None)
+
+    def advance(self, lap=None):
+        """
+        Animates the bird and moves it with its current velocity: the part of
+        update() that follows the steering.
+
+        Args:
+            lap (float, optional): Start time of the current profiler lap; when
+                                   given, animation and movement are timed as
+                                   the bird.animate and bird.move phases.
+                                   Defaults to None.
+        """
+        self.animate()
+        if lap is not None:
+            lap = PROFILER.lap("bird.animate", lap)
+
+        self.rect = self.image.get_rect(center=(self.x, self.y))
+        self.move()
+        self.rect.center = (
+            int(self.x),
+            int(self.y),
+        )
+        if lap is not None:
+            PROFILER.lap("bird.move", lap)
 
-        # Animation
+    def animate(self):
+        """
+        Advances the wing-flap animation and rotates the current frame
+        to face the bird's direction of travel.
+        """
         self.animation_timer += 1
         if self.animation_timer > 5:  # Change frame every 5 game ticks
             self.animation_timer = 0
@@ -483,64 +513,59 @@ class Bird(pygame.sprite.Sprite):
                 self.animation_frames
             )
             self.base_image = self.animation_frames[self.current_frame_index]
+        self.face_heading()
+
+    def face_heading(self):
+        """Rotates the current animation frame to the bird's direction of travel."""
+        speed_x, speed_y = self.speed_x, self.speed_y
+        if speed_x != 0 or speed_y != 0:
+            angle_deg = math.degrees(math.atan2(-speed_y, speed_x))
+            # Every bird shares the same animation frames, so the rotated
+            # surface is looked up by frame index and quantized heading.
+            self.image = BIRD_ROTATION_CACHE.get(
+                self.current_frame_index, self.base_image, angle_deg
+            )
 
-        if self.speed_x != 0 or self.speed_y != 0:
-            angle_deg = math.degrees(math.atan2(-self.speed_y, self.speed_x))
-            # Rotate the current base_image (which might be a different animation frame)
-            self.image = pygame.transform.rotate(self.base_image, angle_deg)
-        bird: Bird
-
-        # Use REPRODUCTION_THRESHOLD from settings if available, otherwise from ENV.py
-        current_reproduction_threshold = REPRODUCTION_THRESHOLD  # Default from ENV
-        if self.settings and "REPRODUCTION_THRESHOLD" in self.settings:
-            current_reproduction_threshold = self.settings["REPRODUCTION_THRESHOLD"]
-
-        for bird in birds_group:
-            if (
-                bird is not self
-                and pygame.sprite.collide_rect(self, bird)
-                and self.food_counter >= current_reproduction_threshold
-            ):
-                self.food_counter = 0  # Reset counter for this parent bird
-                bird.food_counter = 0
-                new_offspring = Bird(
-                    x=self.x,
-                    y=self.y,
-                    cohesion_strength=(self.cohesion_strength + bird.cohesion_strength)
-                    / 2,
-                    alignment_strength=(
-                        self.alignment_strength + bird.alignment_strength
-                    )
-                    / 2,
-                    separation_strength=(
-                        self.separation_strength + bird.separation_strength
-                    )
-                    / 2,
-                    avoidance_strength=(
-                        self.avoidance_strength + bird.avoidance_strength
-                    )
-                    / 2,
-                    food_attraction_strength=(
-                        self.food_attraction_strength + bird.food_attraction_strength
-                    )
-                    / 2,
-                    obstacle_avoidance_distance=(
-                        self.obstacle_avoidance_distance
-                        + bird.obstacle_avoidance_distance
-                    )
-                    / 2,
-                    settings=self.settings,  # Pass settings to offspring
-                )
-                birds_group.add(new_offspring)
+    def mate_with(self, partner):
+        """
+        Produces one offspring with a touching bird and resets both food counters.
 
-        self.rect = self.image.get_rect(center=(self.x, self.y))
-        self.move()
-        self.rect.center = (
-            int(self.x),
-            int(self.y),
+        The offspring starts at this bird's position with the averaged traits
+        of both parents and is taken from BIRD_POOL. It is not added to any
+        group; see broadphase.resolve_contacts for when offspring join the flock.
+
+        Args:
+            partner (Bird): The other parent.
+
+        Returns:
+            Bird: The offspring.
+        """
+        self.food_counter = 0  # Reset counter for this parent bird
+        partner.food_counter = 0
+        return BIRD_POOL.acquire(
+            x=self.x,
+            y=self.y,
+            cohesion_strength=(self.cohesion_strength + partner.cohesion_strength) / 2,
+            alignment_strength=(self.alignment_strength + partner.alignment_strength)
+            / 2,
+            separation_strength=(
+                self.separation_strength + partner.separation_strength
+            )
+            / 2,
+            avoidance_strength=(self.avoidance_strength + partner.avoidance_strength)
+            / 2,
+            food_attraction_strength=(
+                self.food_attraction_strength + partner.food_attraction_strength
+            )
+            / 2,
+            obstacle_avoidance_distance=(
+                self.obstacle_avoidance_distance + partner.obstacle_avoidance_distance
+            )
+            / 2,
+            settings=self.settings,  # Pass settings to offspring
         )
 
-    def get_closest_n_birds(self, birds_group):
+    def get_closest_n_birds(self, birds_group, neighbor_grid=None):
         """
         Finds the N closest neighboring birds to this bird.
 
@@ -549,6 +574,10 @@ class Bird(pygame.sprite.Sprite):
 
         Args:
             birds_group (pygame.sprite.Group): The group of all bird sprites.
+            neighbor_grid (SpatialGrid, optional): A spatial index of birds_group.
+                                                   When given, it is queried instead
+                                                   of scanning every bird; the result
+                                                   is the same.
 
         Returns:
             list[Bird]: A list containing the N closest birds.
@@ -558,6 +587,9 @@ class Bird(pygame.sprite.Sprite):
         if self.settings and "NUM_FLOCK_NEIGHBORS" in self.settings:
             num_neighbors_to_consider = self.settings["NUM_FLOCK_NEIGHBORS"]
 
+        if neighbor_grid is not None:
+            return neighbor_grid.k_nearest(self, num_neighbors_to_consider)
+
         neighbors_with_distances = []
         for other_bird in birds_group.sprites():
             if other_bird is self:
@@ -565,7 +597,7 @@ class Bird(pygame.sprite.Sprite):
             dx = other_bird.x - self.x
             dy = other_bird.y - self.y
             dist_sq = dx**2 + dy**2
-            neighbors_with_distances.append((dist_sq, id(other_bird), other_bird))
+            neighbors_with_distances.append((dist_sq, other_bird.serial, other_bird))
 
         closest_neighbor_tuples = heapq.nsmallest(
             num_neighbors_to_consider,
@@ -573,3 +605,41 @@ class Bird(pygame.sprite.Sprite):
         )
         closest_birds = [bird_tuple[2] for bird_tuple in closest_neighbor_tuples]
         return closest_birds
+
+
+class BirdGroup(PooledGroup):
+    """
+    Sprite group for the flock that keeps running statistics of its traits.
+
+    Every bird that joins the group, at the start or as offspring, is added
+    to `stats`, and every bird that leaves it, e.g. by kill() when it dies,
+    is removed again, so the population statistics never need a pass over
+    the birds (see PopulationStats). With a pool, birds that leave the group
+    are released to it for reuse.
+    """
+
+    def __init__(self, *sprites, pool=None):
+        """
+        Initializes the group and its statistics.
+
+        Args:
+            *sprites (Bird): Birds to add right away.
+            pool (EntityPool, optional): The pool birds that leave the group are
+                                         released to, e.g. BIRD_POOL. Defaults to None.
+        """
+        self.stats = PopulationStats()
+        super().__init__(*sprites, pool=pool)
+
+    def add_internal(self, sprite, layer=None):
+        """Adds a bird to the group and its traits to the statistics."""
+        super().add_internal(sprite, layer)
+        self.stats.add(sprite)
+
+    def remove_internal(self, sprite):
+        """Removes a bird from the group and its traits from the statistics."""
+        super().remove_internal(sprite)
+        self.stats.remove(sprite)
+
+
+# Birds that died, reused for offspring and new flocks.
+BIRD_POOL = EntityPool(Bird)
@@ -0,0 +1,184 @@
+import numpy as np
+
+from env import REPRODUCTION_THRESHOLD
+from profiler import PROFILER
+
+LEFT, TOP, RIGHT, BOTTOM = 0, 1, 2, 3
+
+
+def rect_arrays(rects):
+    """
+    Packs pygame Rects into one array.
+
+    Args:
+        rects (list[pygame.Rect]): The rectangles.
+
+    Returns:
+        numpy.ndarray: A (4, n) array with the LEFT, TOP, RIGHT and BOTTOM rows.
+    """
+    boxes = np.empty((4, len(rects)), dtype=np.int64)
+    for index, rect in enumerate(rects):
+        boxes[:, index] = (rect.left, rect.top, rect.right, rect.bottom)
+    return boxes
+
+
+def overlapping_pairs(boxes_a, boxes_b, same_set=False):
+    """
+    Sweep-and-prune on x: every pair of overlapping boxes from two sets.
+
+    Boxes of set b are sorted by their left edge. Only the b boxes whose left
+    edge lies between the left edge of an a box minus the widest b box and
+    its right edge can overlap it, so each a box is matched against one
+    contiguous slice of the sorted b boxes before the exact test. As with
+    pygame.Rect.colliderect, boxes that only touch at an edge and empty boxes
+    do not overlap anything.
+
+    Args:
+        boxes_a (numpy.ndarray): (4, n) boxes from rect_arrays.
+        boxes_b (numpy.ndarray): (4, m) boxes from rect_arrays.
+        same_set (bool, optional): If True, boxes_b is boxes_a and each
+                                   unordered pair is returned once, as i < j.
+                                   Defaults to False.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: Indices into a and into b of every
+            overlapping pair, sorted by a index, then b index.
+    """
+    empty = np.empty(0, dtype=np.intp)
+    if boxes_a.shape[1] == 0 or boxes_b.shape[1] == 0:
+        return empty, empty
+
+    order = np.argsort(boxes_b[LEFT], kind="stable")
+    sorted_left = boxes_b[LEFT][order]
+    max_width = int((boxes_b[RIGHT] - boxes_b[LEFT]).max())
+    starts = np.searchsorted(sorted_left, boxes_a[LEFT] - max_width, side="right")
+    stops = np.searchsorted(sorted_left, boxes_a[RIGHT], side="left")
+    counts = np.maximum(stops - starts, 0)
+    if not counts.any():
+        return empty, empty
+
+    index_a = np.repeat(np.arange(boxes_a.shape[1]), counts)
+    offsets = np.arange(len(index_a)) - np.repeat(np.cumsum(counts) - counts, counts)
+    index_b = order[np.repeat(starts, counts) + offsets]
+
+    a = boxes_a[:, index_a]
+    b = boxes_b[:, index_b]
+    overlap = (
+        (a[LEFT] < b[RIGHT])
+        & (a[RIGHT] > b[LEFT])
+        & (a[TOP] < b[BOTTOM])
+        & (a[BOTTOM] > b[TOP])
+        & (a[LEFT] < a[RIGHT])
+        & (a[TOP] < a[BOTTOM])
+        & (b[LEFT] < b[RIGHT])
+        & (b[TOP] < b[BOTTOM])
+    )
+    if same_set:
+        overlap &= index_a < index_b
+    index_a, index_b = index_a[overlap], index_b[overlap]
+    pair_order = np.lexsort((index_b, index_a))
+    return index_a[pair_order], index_b[pair_order]
+
+
+def resolve_contacts(birds_group, obstacles, food_group, settings=None):
+    """
+    Finds all bird contacts of the frame once and settles them in a fixed order.
+
+    1. Deaths: every bird touching an obstacle hitbox is killed.
+    2. Eating: in group order, each surviving bird eats the food item
+       closest to it (ties go to the item added first) if it touches that
+       item and no earlier bird has eaten it. Touching other items does not
+       count, as when birds claimed their closest item.
+    3. Reproduction: in group order, each bird that has eaten enough mates
+       with the first bird (in group order) it touches. Only those birds are
+       swept against the flock.
+
+    Offspring are returned instead of being added, so the caller can add them
+    after the frame's movement, like the old per-bird loop where newborns
+    only started moving in the next frame.
+
+    Args:
+        birds_group (pygame.sprite.Group): The group containing all bird sprites.
+        obstacles (pygame.sprite.Group): The group containing all obstacle sprites.
+        food_group (pygame.sprite.Group): The group containing all food sprites.
+        settings (dict, optional): Game settings; REPRODUCTION_THRESHOLD is read
+                                   from them if present, otherwise from ENV.py.
+
+    Returns:
+        list[Bird]: The offspring born this frame.
+    """
+    reproduction_threshold = REPRODUCTION_THRESHOLD
+    if settings and "REPRODUCTION_THRESHOLD" in settings:
+        reproduction_threshold = settings["REPRODUCTION_THRESHOLD"]
+
+    birds = birds_group.sprites()
+    if not birds:
+        return []
+
+    # 1. Deaths
+    with PROFILER.phase("contacts.deaths"):
+        hitboxes = [
+            obstacle.hitbox for obstacle in obstacles if hasattr(obstacle, "hitbox")
+        ]
+        if hitboxes:
+            dead, _ = overlapping_pairs(
+                rect_arrays([bird.rect for bird in birds]), rect_arrays(hitboxes)
+            )
+            if len(dead):
+                for index in np.unique(dead).tolist():
+                    birds[index].kill()
+                birds = birds_group.sprites()
+        bird_boxes = rect_arrays([bird.rect for bird in birds])
+
+    # 2. Eating
+    with PROFILER.phase("contacts.eating"):
+        food_items = food_group.sprites()
+        if food_items:
+            food_boxes = rect_arrays([item.rect for item in food_items])
+            eaters, items = overlapping_pairs(bird_boxes, food_boxes)
+            if len(eaters):
+                # Only birds touching some item can eat; find their closest
+                # item among all items, with the same integer centers as
+                # Rect.centerx / Rect.centery. argmin keeps the first of
+                # equally close items, i.e. the one added first.
+                touching = set(zip(eaters.tolist(), items.tolist()))
+                eaters = np.unique(eaters)
+                food_center_x = (food_boxes[LEFT] + food_boxes[RIGHT]) // 2
+                food_center_y = (food_boxes[TOP] + food_boxes[BOTTOM]) // 2
+                eater_x = np.array([birds[i].x for i in eaters.tolist()])
+                eater_y = np.array([birds[i].y for i in eaters.tolist()])
+                dist_sq = (food_center_x[None, :] - eater_x[:, None]) ** 2 + (
+                    food_center_y[None, :] - eater_y[:, None]
+                ) ** 2
+                closest = np.argmin(dist_sq, axis=1)
+                eaten = set()
+                for bird_index, item_index in zip(eaters.tolist(), closest.tolist()):
+                    if (bird_index, item_index) not in touching or item_index in eaten:
+                        continue
+                    eaten.add(item_index)
+                    food_items[item_index].kill()
+                    birds[bird_index].food_counter += 1
+
+    # 3. Reproduction
+    with PROFILER.phase("contacts.mating"):
+        offspring = []
+        ready = np.flatnonzero(
+            np.fromiter(
+                (bird.food_counter >= reproduction_threshold for bird in birds),
+                dtype=bool,
+                count=len(birds),
+            )
+        )
+        if len(ready) == 0:
+            return offspring
+        first, second = overlapping_pairs(bird_boxes[:, ready], bird_boxes)
+        not_self = ready[first] != second
+        partners = {}
+        for i, j in zip(ready[first][not_self].tolist(), second[not_self].tolist()):
+            partners.setdefault(i, j)  # Pairs come sorted, so the first is the lowest
+        for index in sorted(partners):
+            bird = birds[index]
+            # An earlier mating may have reset this bird's food counter.
+            if bird.food_counter >= reproduction_threshold:
+                offspring.append(bird.mate_with(birds[partners[index]]))
+    return offspring
@@ -0,0 +1,294 @@
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import pygame
+
+from bird_class import BIRD_POOL
+from flock_engine import FIELD_ATTRIBUTES
+from food_class import FOOD_POOL
+from obstacles import OBSTACLE_POOL
+import rng
+from env import CHECKPOINT_INTERVAL_FRAMES
+
+CHECKPOINT_FORMAT_VERSION = 3
+
+# Per-bird columns. Floats are stored exactly as float64, the rest as int64.
+BIRD_FLOAT_FIELDS = FIELD_ATTRIBUTES + ("prev_x", "prev_y")
+BIRD_INT_FIELDS = ("serial", "food_counter", "current_frame_index", "animation_timer")
+OBSTACLE_FLOAT_FIELDS = ("x", "prev_x", "speed_x")
+OBSTACLE_INT_FIELDS = ("trail_owner", "frames_since_last_spawn")
+
+# Game attributes stored in the JSON header.
+GAME_COUNTERS = (
+    "frame_number",
+    "food_spawn_timer",
+    "stats_update_timer",
+    "frame_counter_for_logging_stats",
+    "data_point_counter",
+    "num_current_birds",
+    "avg_cohesion",
+    "avg_alignment",
+    "avg_separation",
+    "avg_avoidance",
+    "avg_food_attraction",
+    "avg_obstacle_avoidance_distance",
+)
+
+
+def _rect_rows(rects):
+    """Packs pygame Rects into an (n, 4) int64 array of x, y, width, height."""
+    return np.array([tuple(rect) for rect in rects], dtype=np.int64).reshape(-1, 4)
+
+
+def capture_checkpoint(game):
+    """
+    Copies the complete world state into arrays and a small JSON header.
+
+    Runs on the main loop so the state is consistent; the work is one pass
+    over every bird, obstacle and food item.
+
+    Args:
+        game (Game): The running game.
+
+    Returns:
+        tuple[dict, dict]: The header and the named arrays.
+    """
+    birds = game.birds_group.sprites()
+    obstacles = game.obstacle_group.sprites()
+    food_items = game.food_group.sprites()
+    particle_arrays, particle_info = game.trail_particles.snapshot()
+
+    arrays = {
+        "bird_floats": np.array(
+            [[getattr(bird, name) for name in BIRD_FLOAT_FIELDS] for bird in birds],
+            dtype=np.float64,
+        ).reshape(-1, len(BIRD_FLOAT_FIELDS)),
+        "bird_ints": np.array(
+            [[getattr(bird, name) for name in BIRD_INT_FIELDS] for bird in birds],
+            dtype=np.int64,
+        ).reshape(-1, len(BIRD_INT_FIELDS)),
+        "bird_rects": _rect_rows(bird.rect for bird in birds),
+        "obstacle_floats": np.array(
+            [
+                [getattr(obstacle, name) for name in OBSTACLE_FLOAT_FIELDS]
+                for obstacle in obstacles
+            ],
+            dtype=np.float64,
+        ).reshape(-1, len(OBSTACLE_FLOAT_FIELDS)),
+        "obstacle_ints": np.array(
+            [
+                [getattr(obstacle, name) for name in OBSTACLE_INT_FIELDS]
+                for obstacle in obstacles
+            ],
+            dtype=np.int64,
+        ).reshape(-1, len(OBSTACLE_INT_FIELDS)),
+        "obstacle_rects": _rect_rows(obstacle.rect for obstacle in obstacles),
+        "food_positions": np.array(
+            [(food_item.x, food_item.y) for food_item in food_items], dtype=np.int64
+        ).reshape(-1, 2),
+    }
+    _, arrays["graph_time_steps"], arrays["graph_values"], _ = (
+        game.graph_history.read_since(0)
+    )
+    for key, values in game.graph_summary.snapshot().items():
+        arrays[f"graph_summary_{key}"] = values
+    for key, values in particle_arrays.items():
+        arrays[f"particle_{key}"] = values
+
+    header = {
+        "version": CHECKPOINT_FORMAT_VERSION,
+        "seed": game.seed,
+        "settings": dict(game.settings),
+        "counters": {name: getattr(game, name) for name in GAME_COUNTERS},
+        "graph_series": game.graph_history.keys,
+        "particles": particle_info,
+        "rng": rng.get_state(),
+    }
+    return header, arrays
+
+
+def write_checkpoint(filename, header, arrays):
+    """
+    Writes a checkpoint as an uncompressed .npz archive.
+
+    The file is written next to its destination first and then moved into
+    place, so an interrupted write never replaces the previous checkpoint.
+
+    Args:
+        filename (str): The output path.
+        header (dict): The header from capture_checkpoint.
+        arrays (dict): The arrays from capture_checkpoint.
+    """
+    header_bytes = np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8)
+    temp_filename = f"{filename}.tmp"
+    with open(temp_filename, "wb") as checkpoint_file:
+        np.savez(checkpoint_file, header=header_bytes, **arrays)
+    os.replace(temp_filename, filename)
+
+
+def read_checkpoint(filename):
+    """
+    Loads a checkpoint written by write_checkpoint.
+
+    Args:
+        filename (str): The path of the checkpoint.
+
+    Returns:
+        tuple[dict, dict]: The header and the named arrays.
+    """
+    with np.load(filename) as data:
+        header = json.loads(data["header"].tobytes().decode("utf-8"))
+        arrays = {name: data[name] for name in data.files if name != "header"}
+    if header.get("version") != CHECKPOINT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported checkpoint format version {header.get('version')} in {filename}"
+        )
+    return header, arrays
+
+
+def restore_checkpoint(game, header, arrays):
+    """
+    Replaces the world of a game with the state stored in a checkpoint.
+
+    The game should have been created with the checkpoint's seed and
+    settings. Groups are rebuilt in their saved order and the random stream
+    is restored last, so the run continues exactly as the original would.
+
+    Args:
+        game (Game): The game to restore into.
+        header (dict): The header from read_checkpoint.
+        arrays (dict): The arrays from read_checkpoint.
+    """
+    game.birds_group.empty()
+    game.obstacle_group.empty()
+    game.food_group.empty()
+    game.trail_particles.clear()
+
+    for floats, ints, rect in zip(
+        arrays["bird_floats"].tolist(),
+        arrays["bird_ints"].tolist(),
+        arrays["bird_rects"].tolist(),
+    ):
+        bird = BIRD_POOL.acquire(floats[0], floats[1], settings=game.settings)
+        for name, value in zip(BIRD_FLOAT_FIELDS, floats):
+            setattr(bird, name, value)
+        for name, value in zip(BIRD_INT_FIELDS, ints):
+            setattr(bird, name, value)
+        bird.base_image = bird.animation_frames[bird.current_frame_index]
+        bird.face_heading()
+        bird.rect = pygame.Rect(rect)
+        game.birds_group.add(bird)
+
+    for floats, ints, rect in zip(
+        arrays["obstacle_floats"].tolist(),
+        arrays["obstacle_ints"].tolist(),
+        arrays["obstacle_rects"].tolist(),
+    ):
+        obstacle = OBSTACLE_POOL.acquire(trail_particles=game.trail_particles)
+        for name, value in zip(OBSTACLE_FLOAT_FIELDS, floats):
+            setattr(obstacle, name, value)
+        for name, value in zip(OBSTACLE_INT_FIELDS, ints):
+            setattr(obstacle, name, value)
+        obstacle.rect = pygame.Rect(rect)
+        obstacle.hitbox.topleft = obstacle.rect.topleft
+        game.obstacle_group.add(obstacle)
+
+    for x, y in arrays["food_positions"].tolist():
+        game.food_group.add(FOOD_POOL.acquire(x, y))
+
+    game.trail_particles.restore(
+        {
+            key: arrays[f"particle_{key}"]
+            for key in ("state", "owners", "color_indices")
+        },
+        header["particles"],
+    )
+    for name, value in header["counters"].items():
+        setattr(game, name, value)
+    game.graph_history.restore(arrays["graph_time_steps"], arrays["graph_values"])
+    game.graph_summary.restore(
+        {
+            key[len("graph_summary_") :]: values
+            for key, values in arrays.items()
+            if key.startswith("graph_summary_")
+        }
+    )
+    rng.set_state(header["rng"])
+
+
+class CheckpointWriter:
+    """
+    Saves periodic checkpoints of a running game on a background thread.
+
+    The world state is copied on the main loop (capture_checkpoint) and
+    handed to a writer thread, so the frame only pays for the copy. If the
+    previous checkpoint is still being written when the next one is due,
+    the new one is skipped rather than stalling the frame.
+    """
+
+    def __init__(self, filename, interval_frames=CHECKPOINT_INTERVAL_FRAMES):
+        """
+        Starts the writer thread.
+
+        Args:
+            filename (str): The checkpoint path; every save replaces it.
+            interval_frames (int, optional): Frames between checkpoints.
+                                             Defaults to CHECKPOINT_INTERVAL_FRAMES
+                                             from ENV.py.
+        """
+        self.filename = filename
+        self.interval_frames = interval_frames
+        self.pending = queue.Queue(maxsize=1)
+        self.thread = threading.Thread(target=self._write_loop, daemon=True)
+        self.thread.start()
+
+    def _write_loop(self):
+        """Writes queued checkpoints until the None sentinel arrives."""
+        while True:
+            item = self.pending.get()
+            if item is None:
+                self.pending.task_done()
+                return
+            frame_number, header, arrays = item
+            start_time = time.perf_counter()
+            try:
+                write_checkpoint(self.filename, header, arrays)
+                print(
+                    f"Checkpoint of frame {frame_number} saved to {self.filename} "
+                    f"in {time.perf_counter() - start_time:.2f}s"
+                )
+            except OSError as e:
+                print(f"Error saving checkpoint: {e}")
+            self.pending.task_done()
+
+    def on_frame(self, game):
+        """Saves a checkpoint in the background every interval_frames frames."""
+        if self.interval_frames <= 0 or game.frame_number % self.interval_frames:
+            return
+        header, arrays = capture_checkpoint(game)
+        try:
+            self.pending.put_nowait((game.frame_number, header, arrays))
+        except queue.Full:
+            print(
+                f"Skipped checkpoint of frame {game.frame_number}: "
+                "the previous one is still being written."
+            )
+
+    def close(self, game=None):
+        """
+        Stops the writer thread after the queued checkpoint has been written.
+
+        Args:
+            game (Game, optional): If given, a final checkpoint of its current
+                                   state is written before returning.
+        """
+        self.pending.join()
+        if game is not None:
+            header, arrays = capture_checkpoint(game)
+            self.pending.put((game.frame_number, header, arrays))
+        self.pending.put(None)
+        self.thread.join()
@@ -0,0 +1,175 @@
+import pygame
+
+from env import SKY_BLUE, DIRTY_RECT_FULL_UPDATE_FRACTION, DIRTY_RECT_MAX_RECTS
+
+
+class DirtyRectRenderer:
+    """
+    Tracks which parts of the window changed, so only those are redrawn and sent
+    to the display.
+
+    Every frame, the regions drawn in the previous frame are erased by copying
+    them from a cached background surface instead of filling the whole window,
+    the new frame's sprites, trails and UI are drawn and their rectangles
+    recorded, and only the old and new rectangles are passed to
+    pygame.display.update. When those cover most of the window or are very
+    many (a large flock), one blit and flip of the whole window is cheaper
+    than a call per rectangle, so the renderer falls back to it. Overlays
+    that are not tracked (the settings menu, the profiler panel) call
+    invalidate(), which redraws the whole window once they are gone.
+
+    Sprites that never move (food) stay on the screen between frames. Only
+    the ones that appeared or disappeared, the ones an erased region touches
+    and the ones the frame draws other sprites under are erased and redrawn;
+    redrawing the others would blend their translucent pixels over
+    themselves.
+    """
+
+    def __init__(
+        self,
+        screen,
+        background_color=SKY_BLUE,
+        full_update_fraction=DIRTY_RECT_FULL_UPDATE_FRACTION,
+        max_rects=DIRTY_RECT_MAX_RECTS,
+    ):
+        """
+        Initializes the renderer and caches the background.
+
+        Args:
+            screen (pygame.Surface): The display surface.
+            background_color (tuple, optional): The RGB color of the empty sky.
+                                                Defaults to SKY_BLUE from ENV.py.
+            full_update_fraction (float, optional): Fraction of the window area
+                                                    above which the whole window
+                                                    is redrawn instead. Defaults
+                                                    to DIRTY_RECT_FULL_UPDATE_FRACTION
+                                                    from ENV.py.
+            max_rects (int, optional): Number of rectangles above which the
+                                       whole window is redrawn instead.
+                                       Defaults to DIRTY_RECT_MAX_RECTS from ENV.py.
+        """
+        self.screen = screen
+        self.background = pygame.Surface(screen.get_size()).convert()
+        self.background.fill(background_color)
+        self.window_area = screen.get_width() * screen.get_height()
+        self.full_update_area = full_update_fraction * self.window_area
+        self.max_rects = max_rects
+        self.previous_rects = []
+        self.previous_area = 0
+        self.drawn_rects = []
+        self.static_rects = {}  # Static sprite -> rect it is drawn at on the screen
+        self.static_redraw = []  # Static sprites to draw in this frame
+        self.needs_full_redraw = True
+        self.full_redraw = True
+        self.updated_fraction = 1.0  # Share of the window updated last frame
+
+    def invalidate(self):
+        """Redraws and updates the whole window in the next frame."""
+        self.needs_full_redraw = True
+
+    def begin_frame(self, static_group=None, covered_rects=()):
+        """
+        Erases what the previous frame drew by restoring the background under it.
+
+        Args:
+            static_group (pygame.sprite.Group, optional): Sprites that never move,
+                                                          drawn later with
+                                                          draw_static_group().
+            covered_rects (list[pygame.Rect], optional): Regions this frame draws
+                                                         before the static group,
+                                                         which must be drawn
+                                                         over them. Defaults to
+                                                         none.
+        """
+        # Past the thresholds one blit of the window is cheaper than one per rect.
+        self.full_redraw = (
+            self.needs_full_redraw
+            or self.previous_area >= self.full_update_area
+            or len(self.previous_rects) > self.max_rects
+        )
+        self.needs_full_redraw = False
+        self.drawn_rects = []
+        static_sprites = static_group.sprites() if static_group is not None else []
+
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+            self.static_redraw = static_sprites
+            return
+
+        # Appeared and disappeared static sprites change the screen by themselves.
+        # A pooled sprite can be reused elsewhere, which counts as both.
+        changed = [
+            rect
+            for sprite, rect in self.static_rects.items()
+            if sprite not in static_group or sprite.rect != rect
+        ]
+        changed.extend(
+            sprite.rect
+            for sprite in static_sprites
+            if self.static_rects.get(sprite) != sprite.rect
+        )
+        self.drawn_rects.extend(changed)
+
+        # Erase every static sprite an erased or covered region touches, and in
+        # turn every one those touch, so none is drawn over its own pixels.
+        erase_rects = self.previous_rects + changed
+        static_rect_list = [sprite.rect for sprite in static_sprites]
+        redraw = [False] * len(static_sprites)
+        pending = erase_rects + list(covered_rects)
+        while pending:
+            touched = []
+            for rect in pending:
+                for index in rect.collidelistall(static_rect_list):
+                    if not redraw[index]:
+                        redraw[index] = True
+                        touched.append(static_rect_list[index])
+            erase_rects = erase_rects + touched
+            pending = touched
+        self.static_redraw = [
+            sprite for sprite, selected in zip(static_sprites, redraw) if selected
+        ]
+        self.screen.blits(
+            [(self.background, rect, rect) for rect in erase_rects], doreturn=False
+        )
+
+    def add_rects(self, rects):
+        """
+        Records regions drawn in this frame.
+
+        Args:
+            rects (list[pygame.Rect]): The regions, e.g. as returned by Surface.blits.
+        """
+        self.drawn_rects.extend(rects)
+
+    def draw_static_group(self, group):
+        """
+        Draws the sprites of the static group that begin_frame() erased or that
+        are new. Their regions were already recorded if they changed.
+
+        Args:
+            group (pygame.sprite.Group): The group passed to begin_frame().
+        """
+        self.screen.blits(
+            [(sprite.image, sprite.rect) for sprite in self.static_redraw],
+            doreturn=False,
+        )
+        self.static_rects = {sprite: sprite.rect.copy() for sprite in group}
+
+    def end_frame(self):
+        """Sends the regions that changed since the previous frame to the display."""
+        drawn_area = sum(rect.width * rect.height for rect in self.drawn_rects)
+        area = self.previous_area + drawn_area
+        # An overlay drawn during this frame was not tracked, so flip it whole.
+        if (
+            self.full_redraw
+            or self.needs_full_redraw
+            or area >= self.full_update_area
+            or len(self.drawn_rects) > self.max_rects
+        ):
+            pygame.display.flip()
+            self.updated_fraction = 1.0
+        else:
+            pygame.display.update(self.previous_rects + self.drawn_rects)
+            self.updated_fraction = area / self.window_area
+        self.previous_rects = self.drawn_rects
+        self.previous_area = drawn_area
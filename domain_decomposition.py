@@ -0,0 +1,425 @@
+import multiprocessing
+import traceback
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from env import (
+    DOMAIN_WORKERS,
+    DOMAIN_HALO_WIDTH,
+    GLOBAL_SPEED_FACTOR,
+    NUM_FLOCK_NEIGHBORS,
+)
+from flock_engine import (
+    FlockEngine,
+    NUM_FIELDS,
+    X,
+    Y,
+    SPEED_X,
+    SPEED_Y,
+    AVOIDANCE,
+    FOOD_ATTRACTION,
+    AVOIDANCE_DISTANCE,
+    apply_new_velocity,
+    flocking_velocities,
+    food_positions,
+    food_velocities,
+    obstacle_arrays,
+    obstacle_avoidance_forces,
+)
+from profiler import PROFILER
+from spatial_grid import k_nearest_indices
+
+# Rows of the shared float block after the NUM_FIELDS rows of FlockEngine.state.
+RECT_LEFT, RECT_RIGHT, RECT_CENTERY = NUM_FIELDS, NUM_FIELDS + 1, NUM_FIELDS + 2
+STEERED_SPEED_X, STEERED_SPEED_Y = NUM_FIELDS + 3, NUM_FIELDS + 4
+NUM_SHARED_ROWS = NUM_FIELDS + 5
+# Rows of the shared integer block.
+SERIALS, X_ORDER = 0, 1
+NUM_SHARED_INT_ROWS = 2
+
+
+class SharedArrays:
+    """
+    The per-bird arrays the engine and its workers share, in one shared memory block.
+
+    `floats` holds the FlockEngine.state rows, the bird rects the obstacle
+    avoidance needs and the steered velocities the workers write back;
+    `ints` holds the bird serials and the bird indices sorted by x. Both
+    have room for `capacity` birds.
+    """
+
+    def __init__(self, capacity, name=None):
+        """
+        Creates a new block, or attaches to an existing one by name.
+
+        Args:
+            capacity (int): Number of birds the arrays have room for.
+            name (str, optional): The name of a block created by another
+                                  process. Defaults to None, which creates one.
+        """
+        self.capacity = capacity
+        float_bytes = NUM_SHARED_ROWS * capacity * 8
+        size = float_bytes + NUM_SHARED_INT_ROWS * capacity * 8
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        self.floats = np.ndarray(
+            (NUM_SHARED_ROWS, capacity), dtype=np.float64, buffer=self.memory.buf
+        )
+        self.ints = np.ndarray(
+            (NUM_SHARED_INT_ROWS, capacity),
+            dtype=np.int64,
+            buffer=self.memory.buf,
+            offset=float_bytes,
+        )
+
+    def close(self, unlink=False):
+        """
+        Detaches from the block.
+
+        Args:
+            unlink (bool, optional): Also free the block; only its creator
+                                     should. Defaults to False.
+        """
+        self.floats = self.ints = None
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+def _strip_neighbors(shared, count, start, stop, num_neighbors, halo):
+    """
+    Finds the exact k nearest neighbors of the birds in one strip.
+
+    The strip owns the birds at positions start to stop of the x order. They
+    are searched among the birds within `halo` pixels of the strip, read from
+    shared memory. A result is exact when the k-th neighbor is no farther
+    than the nearest bird outside that region can be; the few birds for which
+    that cannot be shown are searched among all birds.
+
+    Args:
+        shared (SharedArrays): The shared arrays.
+        count (int): Number of birds.
+        start (int): First position of the strip in the x order.
+        stop (int): Position after the strip's last bird in the x order.
+        num_neighbors (int): Number of neighbors per bird (at most count - 1).
+        halo (float): Width in pixels of the region searched on each side.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The owned birds and a
+            (len(owned), num_neighbors) array of their neighbors, closest first,
+            in the order of get_closest_n_birds.
+    """
+    x = shared.floats[X, :count]
+    y = shared.floats[Y, :count]
+    serials = shared.ints[SERIALS, :count]
+    x_order = shared.ints[X_ORDER, :count]
+    sorted_x = x[x_order]
+    low = sorted_x[start] - halo
+    high = sorted_x[stop - 1] + halo
+    halo_start = int(np.searchsorted(sorted_x, low, side="left"))
+    halo_stop = int(np.searchsorted(sorted_x, high, side="right"))
+    region = x_order[halo_start:halo_stop]
+    owned = x_order[start:stop]
+
+    neighbors = np.empty((len(owned), num_neighbors), dtype=np.intp)
+    exact = np.zeros(len(owned), dtype=bool)
+    if len(region) > num_neighbors:
+        local = k_nearest_indices(
+            x[region],
+            y[region],
+            serials[region],
+            num_neighbors,
+            rows=np.arange(start - halo_start, stop - halo_start),
+        )
+        neighbors[:] = region[local]
+        kth = neighbors[:, -1]
+        kth_dist_sq = (x[kth] - x[owned]) ** 2 + (y[kth] - y[owned]) ** 2
+        # Birds outside the region are farther away than these margins.
+        left_margin = x[owned] - low if halo_start > 0 else np.inf
+        right_margin = high - x[owned] if halo_stop < count else np.inf
+        margin = np.minimum(left_margin, right_margin)
+        exact = kth_dist_sq <= margin**2
+    if not exact.all():
+        inexact = np.flatnonzero(~exact)
+        by_index = np.argsort(owned[inexact])
+        neighbors[inexact[by_index]] = k_nearest_indices(
+            x, y, serials, num_neighbors, rows=owned[inexact[by_index]]
+        )
+    return owned, neighbors
+
+
+def _avoid_obstacles(shared, count, owned, obstacles, speed_factor, bird_size):
+    """
+    Applies the obstacle avoidance to the owned birds' velocities and writes
+    them to the STEERED rows, leaving the velocities other strips read untouched.
+    """
+    floats = shared.floats[:, :count]
+    force_x, force_y = obstacle_avoidance_forces(
+        {
+            "x": floats[X, owned],
+            "y": floats[Y, owned],
+            "speed_x": floats[STEERED_SPEED_X, owned],
+            "speed_y": floats[STEERED_SPEED_Y, owned],
+            "rect_left": floats[RECT_LEFT, owned],
+            "rect_right": floats[RECT_RIGHT, owned],
+            "rect_centery": floats[RECT_CENTERY, owned],
+            "avoidance_distance": floats[AVOIDANCE_DISTANCE, owned],
+            "width": bird_size[0],
+            "height": bird_size[1],
+        },
+        obstacles,
+        speed_factor,
+    )
+    steer = (force_x != 0) | (force_y != 0)
+    if steer.any():
+        rows = owned[steer]
+        floats[STEERED_SPEED_X, rows], floats[STEERED_SPEED_Y, rows] = (
+            apply_new_velocity(
+                floats[STEERED_SPEED_X, rows],
+                floats[STEERED_SPEED_Y, rows],
+                force_x[steer],
+                force_y[steer],
+                floats[AVOIDANCE, rows],
+            )
+        )
+
+
+def _flock_and_seek_food(shared, count, start, stop, num_neighbors, halo, food):
+    """
+    Steers the owned birds by flocking and food, starting from their
+    velocities in the STEERED rows, and writes the result back there.
+    """
+    floats = shared.floats[:, :count]
+    x_order = shared.ints[X_ORDER, :count]
+    if num_neighbors > 0:
+        owned, neighbors = _strip_neighbors(
+            shared, count, start, stop, num_neighbors, halo
+        )
+        speed_x, speed_y = flocking_velocities(
+            floats[:NUM_FIELDS],
+            owned,
+            neighbors,
+            floats[STEERED_SPEED_X, owned],
+            floats[STEERED_SPEED_Y, owned],
+        )
+    else:
+        owned = x_order[start:stop]
+        speed_x = floats[STEERED_SPEED_X, owned]
+        speed_y = floats[STEERED_SPEED_Y, owned]
+    if food is not None:
+        speed_x, speed_y = food_velocities(
+            floats[X, owned],
+            floats[Y, owned],
+            speed_x,
+            speed_y,
+            floats[FOOD_ATTRACTION, owned],
+            *food,
+        )
+    floats[STEERED_SPEED_X, owned] = speed_x
+    floats[STEERED_SPEED_Y, owned] = speed_y
+
+
+def _worker_main(connection):
+    """
+    Runs in a worker process: executes the strip commands sent by a
+    DomainFlockEngine until told to stop.
+
+    Args:
+        connection (multiprocessing.connection.Connection): The worker's end of
+                                                            the command pipe.
+    """
+    shared = None
+    while True:
+        command, *arguments = connection.recv()
+        if command == "stop":
+            break
+        try:
+            if command == "attach":
+                if shared is not None:
+                    shared.close()
+                shared = SharedArrays(*arguments)
+            elif command == "avoid":
+                count, start, stop, *rest = arguments
+                owned = shared.ints[X_ORDER, start:stop]
+                _avoid_obstacles(shared, count, owned, *rest)
+            elif command == "flock":
+                _flock_and_seek_food(shared, *arguments)
+            connection.send(None)
+        except Exception:  # pylint: disable=broad-except
+            connection.send(traceback.format_exc())
+    if shared is not None:
+        shared.close()
+
+
+def _stop_workers(processes, connections, shared):
+    """Stops the worker processes and frees the shared memory."""
+    for connection in connections:
+        try:
+            connection.send(("stop",))
+        except (BrokenPipeError, OSError):
+            pass
+    for process in processes:
+        process.join(timeout=5)
+    if shared[0] is not None:
+        shared[0].close(unlink=True)
+        shared[0] = None
+
+
+class DomainFlockEngine(FlockEngine):
+    """
+    FlockEngine whose steering phases run in parallel worker processes.
+
+    The world is split into vertical strips holding the same number of birds
+    each, one per worker. The bird arrays live in shared memory, and every
+    step each worker steers the birds in its strip: first obstacle
+    avoidance, then flocking and food seeking, where the k nearest neighbors
+    are searched among the strip's birds and a halo of DOMAIN_HALO_WIDTH
+    pixels of the neighboring strips, read directly from shared memory.
+    Strips are drawn again from the new positions at the next step, so
+    birds that crossed a border migrate to their new strip.
+
+    Every bird's velocity only depends on its own steered velocity and the
+    others' state at the start of the frame, so the result is exactly that
+    of the single-process FlockEngine, including the neighbor order of
+    get_closest_n_birds. Syncing with the sprites, animation and movement
+    stay in the main process.
+    """
+
+    def __init__(self, settings=None, workers=None, halo=DOMAIN_HALO_WIDTH):
+        """
+        Initializes the engine. The worker processes start with the first step.
+
+        Args:
+            settings (dict, optional): The game settings, see FlockEngine.
+            workers (int, optional): Number of worker processes. Defaults to
+                                     the DOMAIN_WORKERS setting.
+            halo (float, optional): Width in pixels of the neighboring region
+                                    each strip reads. Defaults to
+                                    DOMAIN_HALO_WIDTH from ENV.py.
+        """
+        super().__init__(settings)
+        if workers is None:
+            workers = self._setting("DOMAIN_WORKERS", DOMAIN_WORKERS)
+        self.num_workers = max(1, int(workers))
+        self.halo = halo
+        self.processes = []
+        self.connections = []
+        self.shared_holder = [None]  # Mutable, so the finalizer sees replacements
+        self._finalizer = None
+
+    @property
+    def shared(self):
+        """The current SharedArrays, or None before the first step."""
+        return self.shared_holder[0]
+
+    def _start(self):
+        """Starts the worker processes."""
+        for _ in range(self.num_workers):
+            parent_end, child_end = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker_main, args=(child_end,), daemon=True
+            )
+            process.start()
+            child_end.close()
+            self.processes.append(process)
+            self.connections.append(parent_end)
+        self._finalizer = weakref.finalize(
+            self, _stop_workers, self.processes, self.connections, self.shared_holder
+        )
+
+    def close(self):
+        """Stops the worker processes and frees the shared memory."""
+        if self._finalizer is not None:
+            self._finalizer()
+        self.processes = []
+        self.connections = []
+
+    def _ensure_capacity(self, count):
+        """
+        Grows the shared arrays to hold count birds, doubling the capacity,
+        and starts the workers on the first call.
+        """
+        if self.shared is not None and self.shared.capacity >= count:
+            return
+        capacity = max(count, 2 * self.shared.capacity if self.shared else 1024)
+        if self.shared is not None:
+            self.shared.close(unlink=True)
+        self.shared_holder[0] = SharedArrays(capacity)
+        # Started after the first block exists, the workers share this
+        # process's resource tracker, so only the engine ever unlinks a block.
+        if not self.processes:
+            self._start()
+        attach = ("attach", capacity, self.shared.name)
+        self._run_on_workers([attach] * self.num_workers)
+
+    def _run_on_workers(self, commands):
+        """
+        Sends one command each to the first workers and waits until they have finished.
+
+        Workers beyond the number of commands, e.g. when there are fewer birds
+        than workers, stay idle and are not waited for.
+
+        Args:
+            commands (list[tuple]): At most one command per worker.
+
+        Raises:
+            RuntimeError: If a worker failed; carries the worker's traceback.
+        """
+        busy = self.connections[: len(commands)]
+        for connection, command in zip(busy, commands):
+            connection.send(command)
+        errors = [connection.recv() for connection in busy]
+        for error in errors:
+            if error is not None:
+                raise RuntimeError(f"Flock domain worker failed:\n{error}")
+
+    def steer(self, obstacles, food_group):
+        """
+        Applies obstacle avoidance, flocking and food seeking to the velocities
+        of every bird, one strip per worker process.
+
+        Args:
+            obstacles (pygame.sprite.Group): The group containing all obstacle sprites.
+            food_group (pygame.sprite.Group): The group containing all food sprites.
+        """
+        count = len(self.birds)
+        with PROFILER.phase("domains.share"):
+            self._ensure_capacity(count)
+            floats = self.shared.floats
+            floats[:NUM_FIELDS, :count] = self.state
+            floats[STEERED_SPEED_X, :count] = self.state[SPEED_X]
+            floats[STEERED_SPEED_Y, :count] = self.state[SPEED_Y]
+            self.shared.ints[SERIALS, :count] = self.ids
+            self.shared.ints[X_ORDER, :count] = np.argsort(self.state[X], kind="stable")
+            bounds = np.linspace(0, count, min(self.num_workers, count) + 1).astype(int)
+            strips = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+        with PROFILER.phase("domains.avoid_obstacles"):
+            obstacles = obstacle_arrays(obstacles)
+            if obstacles is not None:
+                floats[RECT_LEFT : RECT_CENTERY + 1, :count] = self._bird_rects()
+                bird_size = (self.birds[0].bird_width, self.birds[0].bird_height)
+                speed_factor = self._setting("GLOBAL_SPEED_FACTOR", GLOBAL_SPEED_FACTOR)
+                arguments = (obstacles, speed_factor, bird_size)
+                self._run_on_workers(
+                    [("avoid", count, *strip, *arguments) for strip in strips]
+                )
+
+        with PROFILER.phase("domains.flock_food"):
+            num_neighbors = min(
+                self._setting("NUM_FLOCK_NEIGHBORS", NUM_FLOCK_NEIGHBORS), count - 1
+            )
+            food = food_positions(food_group) if food_group else None
+            self._run_on_workers(
+                [
+                    ("flock", count, start, stop, num_neighbors, self.halo, food)
+                    for start, stop in strips
+                ]
+            )
+            self.state[SPEED_X] = floats[STEERED_SPEED_X, :count]
+            self.state[SPEED_Y] = floats[STEERED_SPEED_Y, :count]
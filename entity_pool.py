@@ -0,0 +1,121 @@
+import pygame
+
+
+class EntityPool:
+    """
+    Free list of entities of one class, reused instead of created and collected.
+
+    acquire() resets a free entity in place with the constructor's arguments
+    (a hit) or constructs a new one if none is free (a miss). Entities come
+    back through release() when they leave their pooled group, e.g. by
+    kill(), but only become free again at the next recycle(), which the Game
+    calls at the start of every step. Until then a released entity keeps its
+    last state, so code still holding it in the same step (a contact list,
+    the flock engine's rows) never sees it reused.
+
+    The entity class must implement reset() taking the same arguments as its
+    constructor and leaving the instance as the constructor would.
+    """
+
+    def __init__(self, entity_class):
+        """
+        Initializes an empty pool.
+
+        Args:
+            entity_class (type): The class of the pooled entities.
+        """
+        self.entity_class = entity_class
+        self.free = []
+        self.released = []  # Released since the last recycle()
+        self.in_use = 0
+        self.high_water = 0
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, *args, **kwargs):
+        """
+        Returns an entity initialized with the given constructor arguments.
+
+        Args:
+            *args: Positional arguments of the entity's constructor.
+            **kwargs: Keyword arguments of the entity's constructor.
+
+        Returns:
+            object: A reset free entity or a new one.
+        """
+        if self.free:
+            entity = self.free.pop()
+            entity.reset(*args, **kwargs)
+            self.hits += 1
+        else:
+            entity = self.entity_class(*args, **kwargs)
+            self.misses += 1
+        self.in_use += 1
+        self.high_water = max(self.high_water, self.in_use)
+        return entity
+
+    def release(self, entity):
+        """
+        Returns an entity to the pool. It is reused after the next recycle().
+
+        Args:
+            entity (object): An entity that is no longer part of the game.
+        """
+        self.released.append(entity)
+        self.in_use -= 1
+
+    def recycle(self):
+        """Makes the entities released since the last call available to acquire()."""
+        if self.released:
+            self.free.extend(self.released)
+            self.released = []
+
+    def hit_rate(self):
+        """Returns the fraction of acquisitions served by a reused entity."""
+        acquisitions = self.hits + self.misses
+        return self.hits / acquisitions if acquisitions else 0.0
+
+    def stats(self):
+        """
+        Returns the pool metrics.
+
+        Returns:
+            dict: Hits, misses, hit rate, entities in use, the most ever in use
+                  at once and the number of free entities.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+            "in_use": self.in_use,
+            "high_water": self.high_water,
+            "free": len(self.free) + len(self.released),
+        }
+
+
+class PooledGroup(pygame.sprite.Group):
+    """
+    Sprite group that hands the sprites removed from it back to a pool.
+
+    The group owns its members: a sprite leaving it, by kill(), remove() or
+    empty(), is released, so it must not be kept or added elsewhere
+    afterwards. Without a pool the group behaves like a plain Group.
+    """
+
+    def __init__(self, *sprites, pool=None):
+        """
+        Initializes the group.
+
+        Args:
+            *sprites (pygame.sprite.Sprite): Sprites to add right away.
+            pool (EntityPool, optional): The pool removed sprites are released
+                                         to. Defaults to None.
+        """
+        self.pool = pool
+        super().__init__(*sprites)
+
+    def remove_internal(self, sprite):
+        """Removes a sprite from the group and releases it to the pool."""
+        super().remove_internal(sprite)
+        if self.pool is not None:
+            self.pool.release(sprite)
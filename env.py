@@ -51,3 +51,37 @@ OBSTACLE_VERTICAL_EVASION_MAGNITUDE = 1.4
 NUM_FLOCK_NEIGHBORS = 5
 REPRODUCTION_THRESHOLD = 2
 GLOBAL_SPEED_FACTOR= 2.3
+
+USE_SPATIAL_GRID = True  # False falls back to the brute-force neighbor search
+SPATIAL_GRID_CELL_SIZE = 50
+USE_FLOCK_ENGINE = False  # True runs flocking and movement in the batched NumPy engine
+FOOD_GRID_CELL_SIZE = 100
+BIRD_ROTATION_HEADINGS = 64  # 0 rotates every frame exactly instead of using the cache
+BIRD_ROTATION_CACHE_MAX_BYTES = 4 * 1024 * 1024
+TRAIL_PARTICLE_INITIAL_CAPACITY = 2048
+TRAIL_PARTICLE_ALPHA_BUCKETS = 32  # alpha levels pre-rendered per particle color and radius
+PROFILER_WINDOW_FRAMES = 120  # frames the on-screen timing percentiles are computed over
+DISPLAY_FPS = 60  # rendered frames per second; FPS is the simulation step rate at 1x
+FAST_FORWARD_SPEEDS = (1, 4, 16, 0)  # simulation steps per real-time step, 0 = as fast as possible
+SIMULATION_FRAME_BUDGET_MS = 33  # max wall time spent simulating per rendered frame
+CHECKPOINT_INTERVAL_FRAMES = 5000  # frames between periodic checkpoints when --checkpoint is given
+GRAPH_HISTORY_MAX_POINTS = 1000  # logged data points kept in memory for the graph; the stats file keeps all
+STATS_FILE_FORMAT = "csv"  # "csv" or "binary" (column blocks, see stats_sink.py)
+STATS_SINK_MAX_PENDING_ROWS = 1024  # rows waiting for the stats writer thread before logging blocks
+STATS_SINK_CLOSE_TIMEOUT_SECONDS = 5  # seconds close() waits for the stats writer thread before giving up
+GRAPH_DOWNSAMPLE_BUCKETS = 256  # min/max/mean buckets the graph summarizes the whole history in
+GRAPH_BACKEND = "matplotlib"  # "matplotlib" opens a separate window, "native" draws a chart panel into the game window
+GRAPH_PANEL_WIDTH = 360
+GRAPH_PANEL_HEIGHT = 180
+GRAPH_PANEL_STEP_PIXELS = 2  # horizontal pixels per logged data point in the native chart
+POPULATION_HISTOGRAM_BINS = 40  # bins of the running per-trait histograms, 0 disables them
+POPULATION_HISTOGRAM_RANGE = (0.0, 0.4)  # trait values the histogram bins cover
+DIRTY_RECT_RENDERING = False  # redraw and update only the changed parts of the window (--dirty-rects)
+DIRTY_RECT_FULL_UPDATE_FRACTION = 0.5  # share of the window above which a dirty frame flips the whole window
+UI_TEXT_CACHE_SIZE = 256  # rendered UI text surfaces kept for reuse
+DIRTY_RECT_MAX_RECTS = 300  # rectangles per dirty frame above which the whole window is redrawn and flipped
+TRAIL_DIRTY_RECT_CELL_SIZE = 32  # trail particles are grouped into dirty rectangles per grid cell of this size
+DOMAIN_WORKERS = 0  # worker processes of the strip-decomposed flock engine (--domain-workers), 0 disables them
+DOMAIN_HALO_WIDTH = 60  # pixels of the neighboring strips each domain worker searches for neighbors
+PARALLEL_UPDATE_THREADS = 0  # threads of the two-phase bird update (--update-threads), 0 keeps the in-place sequential update
+PARALLEL_UPDATE_CHUNK_SIZE = 1024  # birds steered per task of the two-phase bird update, large enough for NumPy to release the GIL
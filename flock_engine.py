@@ -0,0 +1,755 @@
+import numpy as np
+
+from bird_class import (
+    Bird,
+    MAX_PREDICTION_HORIZON_FRAMES,
+    BASE_REPULSION_FORCE_MAGNITUDE,
+    AVOIDANCE_DISTANCE_BUFFER_SCALAR,
+    AVOIDANCE_STRENGTH_SENSITIVITY_SCALAR,
+    EPSILON,
+)
+from env import (
+    SCREEN_WIDTH,
+    SCREEN_HEIGHT,
+    NUM_FLOCK_NEIGHBORS,
+    GLOBAL_SPEED_FACTOR,
+    OBSTACLE_REACTION_DISTANCE_HORIZONTAL,
+)
+from profiler import PROFILER
+from spatial_grid import k_nearest_indices
+
+# Row layout of FlockEngine.state. Each row is one contiguous per-bird array.
+X, Y, SPEED_X, SPEED_Y = 0, 1, 2, 3
+COHESION, ALIGNMENT, SEPARATION = 4, 5, 6
+AVOIDANCE, FOOD_ATTRACTION, AVOIDANCE_DISTANCE = 7, 8, 9
+SEPARATION_DISTANCE = 10
+NUM_FIELDS = 11
+
+# Bird attribute mirrored by each row, in row order.
+FIELD_ATTRIBUTES = (
+    "x",
+    "y",
+    "speed_x",
+    "speed_y",
+    "cohesion_strength",
+    "alignment_strength",
+    "separation_strength",
+    "avoidance_strength",
+    "food_attraction_strength",
+    "obstacle_avoidance_distance",
+    "separation_distance",
+)
+
+# Same constants as Bird.flock / Bird.apply_new_velocity.
+VELOCITY_STEP_SCALE = 0.027
+COHESION_DIVISOR = 10
+SEPARATION_FORCE = 300
+SEPARATION_STRENGTH_DIVISOR = 15
+SEPARATION_EPSILON = 0.00001
+
+# Birds per block in the bird x food distance matrix of FlockEngine.seek_food.
+FOOD_SEARCH_CHUNK_ROWS = 4096
+
+
+def obstacle_avoidance_forces(birds, obstacles, speed_factor):
+    """
+    Batched Bird.avoid_obstacles: the accumulated CPA repulsion force of every bird.
+
+    Bird-obstacle pairs outside the horizontal reaction zone or the vertical
+    interest band are culled first, then closest-point-of-approach times,
+    distances and repulsion forces are computed for the remaining pairs as
+    arrays. Forces are summed per bird in obstacle order, like the per-pair loop.
+
+    Args:
+        birds (dict): Per-bird arrays "x", "y", "speed_x", "speed_y",
+                      "rect_left", "rect_right", "rect_centery" and
+                      "avoidance_distance", plus the scalars "width" and "height".
+        obstacles (dict): Per-obstacle arrays "left", "right", "top", "bottom",
+                          "centerx", "centery", "speed_x", "head_width" and
+                          "head_height".
+        speed_factor (float): The global speed factor applied to bird velocities.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The x and y avoidance force per bird.
+    """
+    count = len(birds["x"])
+    force_x = np.zeros(count)
+    force_y = np.zeros(count)
+    if count == 0 or len(obstacles["left"]) == 0:
+        return force_x, force_y
+
+    bird_vx_gsf = birds["speed_x"] * speed_factor
+    bird_vy_gsf = birds["speed_y"] * speed_factor
+    avoidance_distance = birds["avoidance_distance"]
+
+    # --- Broad phase: N x M interest-zone culling ---
+    broad_horizontal_range = OBSTACLE_REACTION_DISTANCE_HORIZONTAL * 1.5
+    interest_min_x = (birds["rect_left"] - broad_horizontal_range)[:, None]
+    interest_max_x = (birds["rect_right"] + broad_horizontal_range)[:, None]
+    vertical_interest_range = (
+        max(birds["height"] * 5, 100) + avoidance_distance * 50
+    )[:, None]
+    interest_min_y = birds["rect_centery"][:, None] - vertical_interest_range
+    interest_max_y = birds["rect_centery"][:, None] + vertical_interest_range
+
+    in_zone_x = (obstacles["right"] > interest_min_x) & (
+        obstacles["left"] < interest_max_x
+    )
+    in_zone_y = (obstacles["bottom"] > interest_min_y) & (
+        obstacles["top"] < interest_max_y
+    )
+    moving_right = (bird_vx_gsf > EPSILON)[:, None]
+    relevant_horizontally = (
+        in_zone_x
+        | (moving_right & (obstacles["left"] < birds["rect_right"][:, None]))
+        | (~moving_right & (obstacles["right"] > birds["rect_left"][:, None]))
+    )
+    bird_index, obstacle_index = np.nonzero(relevant_horizontally & in_zone_y)
+    if len(bird_index) == 0:
+        return force_x, force_y
+
+    # --- CPA calculation on the surviving pairs ---
+    x = birds["x"][bird_index]
+    y = birds["y"][bird_index]
+    vx = bird_vx_gsf[bird_index]
+    vy = bird_vy_gsf[bird_index]
+    pair_avoidance_distance = avoidance_distance[bird_index]
+    obs_centerx = obstacles["centerx"][obstacle_index]
+    obs_centery = obstacles["centery"][obstacle_index]
+    obs_speed_x = obstacles["speed_x"][obstacle_index]
+
+    r0_x = x - obs_centerx
+    r0_y = y - obs_centery
+    vrel_x = vx - (-obs_speed_x)
+    vrel_y = vy - 0
+    vrel_sq = vrel_x**2 + vrel_y**2
+
+    bird_avg_dim = (birds["width"] + birds["height"]) * 0.25
+    obs_avg_dim = (
+        obstacles["head_width"][obstacle_index] + obstacles["head_height"][obstacle_index]
+    ) * 0.25
+    safe_distance = (
+        bird_avg_dim
+        + obs_avg_dim
+        + pair_avoidance_distance * AVOIDANCE_DISTANCE_BUFFER_SCALAR
+    )
+
+    parallel = vrel_sq < EPSILON
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_cpa = np.where(parallel, 0.0, -(r0_x * vrel_x + r0_y * vrel_y) / vrel_sq)
+    in_horizon = ~parallel & (t_cpa >= 0) & (t_cpa <= MAX_PREDICTION_HORIZON_FRAMES)
+    t_pred = np.where(in_horizon, t_cpa, 0.0)
+    pred_bird_x = np.where(in_horizon, x + vx * t_pred, x)
+    pred_bird_y = np.where(in_horizon, y + vy * t_pred, y)
+    pred_obs_x = np.where(in_horizon, obs_centerx - obs_speed_x * t_pred, obs_centerx)
+    pred_obs_y = obs_centery
+    dist_cpa = np.where(
+        parallel,
+        np.hypot(r0_x, r0_y),
+        np.hypot(pred_bird_x - pred_obs_x, pred_bird_y - pred_obs_y),
+    )
+    apply_force = (parallel | in_horizon) & (dist_cpa < safe_distance)
+    if not apply_force.any():
+        return force_x, force_y
+
+    # --- Repulsion for the pairs on a collision course ---
+    bird_index = bird_index[apply_force]
+    evasion_dx = (pred_bird_x - pred_obs_x)[apply_force]
+    evasion_dy = (pred_bird_y - pred_obs_y)[apply_force]
+    dist_at_pred_cpa = np.hypot(evasion_dx, evasion_dy)
+    separated = dist_at_pred_cpa > EPSILON
+    with np.errstate(divide="ignore", invalid="ignore"):
+        norm_evasion_dx = np.where(separated, evasion_dx / dist_at_pred_cpa, 0.0)
+        # Overlap at CPA: push away vertically from the obstacle's center
+        default_dy = np.where(y[apply_force] < obs_centery[apply_force], -1.0, 1.0)
+        norm_evasion_dy = np.where(
+            separated, evasion_dy / dist_at_pred_cpa, default_dy
+        )
+
+    effective_t_cpa = np.where(parallel, 0.0, t_cpa)[apply_force]
+    time_factor = np.maximum(
+        0.0, 1.0 - (effective_t_cpa / MAX_PREDICTION_HORIZON_FRAMES)
+    )
+    distance_factor = np.maximum(
+        0.0, 1.0 - (dist_cpa[apply_force] / safe_distance[apply_force])
+    )
+    sensitivity_multiplier = 1.0 + (
+        pair_avoidance_distance[apply_force] * AVOIDANCE_STRENGTH_SENSITIVITY_SCALAR
+    )
+    repulsion_magnitude = (
+        BASE_REPULSION_FORCE_MAGNITUDE
+        * time_factor
+        * distance_factor
+        * sensitivity_multiplier
+    )
+
+    force_x = np.bincount(
+        bird_index, weights=norm_evasion_dx * repulsion_magnitude, minlength=count
+    )
+    force_y = np.bincount(
+        bird_index, weights=norm_evasion_dy * repulsion_magnitude, minlength=count
+    )
+    return force_x, force_y
+
+
+def apply_new_velocity(speed_x, speed_y, force_x, force_y, weight):
+    """
+    Batched Bird.apply_new_velocity: steers velocities by a force and renormalizes them.
+
+    Args:
+        speed_x (numpy.ndarray): The x-component of the velocity per bird.
+        speed_y (numpy.ndarray): The y-component of the velocity per bird.
+        force_x (numpy.ndarray): The x-component of the force per bird.
+        force_y (numpy.ndarray): The y-component of the force per bird.
+        weight (numpy.ndarray): The weighting factor per bird.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The new unit velocity per bird.
+    """
+    speed_x = speed_x + force_x * weight * VELOCITY_STEP_SCALE
+    speed_y = speed_y + force_y * weight * VELOCITY_STEP_SCALE
+    magnitude = np.hypot(speed_x, speed_y)
+    moving = magnitude > 0
+    speed_x[moving] /= magnitude[moving]
+    speed_y[moving] /= magnitude[moving]
+    return speed_x, speed_y
+
+
+def obstacle_arrays(obstacles):
+    """
+    Packs the hitboxes and speeds of the obstacles for obstacle_avoidance_forces.
+
+    Args:
+        obstacles (iterable[Obstacle]): The obstacles; sprites without a hitbox
+                                        are skipped.
+
+    Returns:
+        dict or None: The per-obstacle arrays, or None if there are no obstacles.
+    """
+    obstacle_list = [obstacle for obstacle in obstacles if hasattr(obstacle, "hitbox")]
+    if not obstacle_list:
+        return None
+    hitboxes = [obstacle.hitbox for obstacle in obstacle_list]
+    return {
+        "left": np.array([hitbox.left for hitbox in hitboxes], dtype=float),
+        "right": np.array([hitbox.right for hitbox in hitboxes], dtype=float),
+        "top": np.array([hitbox.top for hitbox in hitboxes], dtype=float),
+        "bottom": np.array([hitbox.bottom for hitbox in hitboxes], dtype=float),
+        "centerx": np.array([hitbox.centerx for hitbox in hitboxes], dtype=float),
+        "centery": np.array([hitbox.centery for hitbox in hitboxes], dtype=float),
+        "speed_x": np.array([obstacle.speed_x for obstacle in obstacle_list]),
+        "head_width": np.array(
+            [obstacle.head_width for obstacle in obstacle_list], dtype=float
+        ),
+        "head_height": np.array(
+            [obstacle.head_height for obstacle in obstacle_list], dtype=float
+        ),
+    }
+
+
+def flocking_velocities(state, rows, neighbors, speed_x=None, speed_y=None):
+    """
+    Batched Bird.flock: alignment, cohesion and separation for some birds.
+
+    Every bird sees the positions and velocities in state; only the steered
+    birds' own velocities change, and they are returned rather than written.
+
+    Args:
+        state (numpy.ndarray): A (NUM_FIELDS, n) array laid out like
+                               FlockEngine.state, holding the steered birds
+                               and all their neighbors.
+        rows (numpy.ndarray or slice): Columns of the birds to steer.
+        neighbors (numpy.ndarray): A (len(rows), k) array of the columns of
+                                   each steered bird's neighbors, closest
+                                   first, with k > 0.
+        speed_x (numpy.ndarray, optional): The steered birds' own x velocities,
+                                           if they differ from state (e.g. after
+                                           obstacle avoidance). Defaults to None.
+        speed_y (numpy.ndarray, optional): The steered birds' own y velocities.
+                                           Defaults to None.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The new velocity of every steered bird.
+    """
+    x, y = state[X], state[Y]
+    num_neighbors = neighbors.shape[1]
+    if speed_x is None:
+        speed_x = state[SPEED_X, rows]
+        speed_y = state[SPEED_Y, rows]
+
+    # Alignment
+    avg_vx = state[SPEED_X][neighbors].sum(axis=1) / num_neighbors
+    avg_vy = state[SPEED_Y][neighbors].sum(axis=1) / num_neighbors
+    speed_x, speed_y = apply_new_velocity(
+        speed_x, speed_y, avg_vx - speed_x, avg_vy - speed_y, state[ALIGNMENT, rows]
+    )
+
+    # Cohesion
+    avg_x = x[neighbors].sum(axis=1) / num_neighbors
+    avg_y = y[neighbors].sum(axis=1) / num_neighbors
+    speed_x, speed_y = apply_new_velocity(
+        speed_x,
+        speed_y,
+        (avg_x - x[rows]) / COHESION_DIVISOR,
+        (avg_y - y[rows]) / COHESION_DIVISOR,
+        state[COHESION, rows],
+    )
+
+    # Separation (the squared distance is compared against separation_distance,
+    # exactly as in Bird.flock)
+    diff_x = x[rows, None] - x[neighbors]
+    diff_y = y[rows, None] - y[neighbors]
+    distance = diff_x**2 + diff_y**2
+    force = SEPARATION_FORCE / (distance + SEPARATION_EPSILON)
+    close = distance < state[SEPARATION_DISTANCE, rows][:, None]
+    separation_force_x = np.where(close, diff_x * force, 0.0).sum(axis=1)
+    separation_force_y = np.where(close, diff_y * force, 0.0).sum(axis=1)
+    return apply_new_velocity(
+        speed_x,
+        speed_y,
+        separation_force_x,
+        separation_force_y,
+        state[SEPARATION, rows] / SEPARATION_STRENGTH_DIVISOR,
+    )
+
+
+def food_velocities(x, y, speed_x, speed_y, food_attraction, food_x, food_y):
+    """
+    Batched Bird.move_towards_food: steers birds towards their closest food item.
+
+    Args:
+        x (numpy.ndarray): The x-coordinate per bird.
+        y (numpy.ndarray): The y-coordinate per bird.
+        speed_x (numpy.ndarray): The x-component of the velocity per bird.
+        speed_y (numpy.ndarray): The y-component of the velocity per bird.
+        food_attraction (numpy.ndarray): The food attraction strength per bird.
+        food_x (numpy.ndarray): The x-coordinate of every food item's center.
+        food_y (numpy.ndarray): The y-coordinate of every food item's center.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The new velocity per bird.
+    """
+    closest = np.empty(len(x), dtype=np.intp)
+    for start in range(0, len(x), FOOD_SEARCH_CHUNK_ROWS):
+        rows = slice(start, start + FOOD_SEARCH_CHUNK_ROWS)
+        dist_sq = (food_x[None, :] - x[rows, None]) ** 2 + (
+            food_y[None, :] - y[rows, None]
+        ) ** 2
+        # argmin keeps the first of equally close items, like the linear scan
+        closest[rows] = np.argmin(dist_sq, axis=1)
+
+    food_force_x = food_x[closest] - x
+    food_force_y = food_y[closest] - y
+    magnitude = np.hypot(food_force_x, food_force_y)
+    reachable = magnitude > 0
+    safe_magnitude = np.where(reachable, magnitude, 1.0)
+    normalized_food_force_x = np.where(reachable, food_force_x / safe_magnitude, 0.0)
+    normalized_food_force_y = np.where(reachable, food_force_y / safe_magnitude, 0.0)
+    weight_for_food = np.where(reachable, food_attraction / safe_magnitude, 0.0)
+    return apply_new_velocity(
+        speed_x,
+        speed_y,
+        normalized_food_force_x,
+        normalized_food_force_y,
+        weight_for_food,
+    )
+
+
+def food_positions(food_group):
+    """
+    Returns the center coordinates of every food item as arrays.
+
+    Args:
+        food_group (pygame.sprite.Group): The group containing all food sprites.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The x and y coordinates, in group order.
+    """
+    if hasattr(food_group, "positions"):
+        _, food_x, food_y = food_group.positions()
+        return food_x, food_y
+    items = food_group.sprites()
+    food_x = np.array([item.rect.centerx for item in items], dtype=float)
+    food_y = np.array([item.rect.centery for item in items], dtype=float)
+    return food_x, food_y
+
+
+# Attributes a BirdView reads from its engine instead of its own __dict__.
+VIEW_ATTRIBUTES = FIELD_ATTRIBUTES + ("prev_x", "prev_y")
+
+
+def _state_property(row):
+    """Returns a property reading and writing one row of the bound engine's state."""
+
+    def get(self):
+        return self.flock_engine.state.item(row, self.flock_column)
+
+    def set_(self, value):
+        self.flock_engine.state[row, self.flock_column] = value
+
+    return property(get, set_)
+
+
+def _previous_property(row):
+    """Returns a property reading and writing one row of the previous positions."""
+
+    def get(self):
+        return self.flock_engine.previous.item(row, self.flock_column)
+
+    def set_(self, value):
+        self.flock_engine.previous[row, self.flock_column] = value
+
+    return property(get, set_)
+
+
+class BirdView(Bird):
+    """
+    A bird sprite whose simulation state lives in a FlockEngine.
+
+    FlockEngine.sync turns the birds it tracks into views: their position,
+    velocity, traits and previous position are properties reading and
+    writing the bird's column of the engine arrays, so the engine never
+    copies its state into the sprites. Only the animation, image and rect
+    are still kept per sprite, for rendering. A bird that leaves the flock
+    gets its last state back as plain attributes and becomes a Bird again.
+    """
+
+    x = _state_property(X)
+    y = _state_property(Y)
+    speed_x = _state_property(SPEED_X)
+    speed_y = _state_property(SPEED_Y)
+    cohesion_strength = _state_property(COHESION)
+    alignment_strength = _state_property(ALIGNMENT)
+    separation_strength = _state_property(SEPARATION)
+    avoidance_strength = _state_property(AVOIDANCE)
+    food_attraction_strength = _state_property(FOOD_ATTRACTION)
+    obstacle_avoidance_distance = _state_property(AVOIDANCE_DISTANCE)
+    separation_distance = _state_property(SEPARATION_DISTANCE)
+    prev_x = _previous_property(0)
+    prev_y = _previous_property(1)
+
+    def bind(self, engine, column):
+        """
+        Makes a bird, a plain Bird or a view already, a view of one column
+        of an engine's arrays.
+
+        Args:
+            engine (FlockEngine): The engine holding the bird's state.
+            column (int): The bird's column in engine.state.
+        """
+        self.__class__ = BirdView
+        self.flock_engine = engine
+        self.flock_column = column
+
+    def unbind(self):
+        """Copies the bird's state out of the engine and makes it a plain Bird again."""
+        values = [getattr(self, name) for name in VIEW_ATTRIBUTES]
+        self.__class__ = Bird
+        del self.flock_engine, self.flock_column
+        for name, value in zip(VIEW_ATTRIBUTES, values):
+            setattr(self, name, value)
+
+    def reset(self, *args, **kwargs):
+        """
+        Detaches the bird from its engine and reinitializes it as a new Bird,
+        e.g. when BIRD_POOL reuses it. See Bird.reset.
+        """
+        self.__class__ = Bird
+        del self.flock_engine, self.flock_column
+        self.reset(*args, **kwargs)
+
+
+class FlockEngine:
+    """
+    Structure-of-arrays flocking engine for the whole bird population.
+
+    The engine keeps every bird's position, velocity and genetic traits in
+    contiguous NumPy arrays and advances flocking (alignment, cohesion,
+    separation, renormalization) and movement (including wall bouncing) for
+    all birds in one batched step. The bird sprites it tracks are thin views
+    of those arrays (see BirdView): the rest of the game reads their state
+    straight from the engine, and a step only updates their animation and
+    rect for rendering.
+
+    The step has the two-phase semantics of ParallelBirdUpdater: a bird's
+    own velocity carries over from obstacle avoidance to flocking and food
+    seeking, but it sees its neighbors with the positions and velocities
+    all birds had at the start of the frame. Bird.update instead lets later
+    birds see the already updated state of earlier ones, so the engine does
+    not follow the per-object path; it follows ParallelBirdUpdater up to
+    rounding (see benchmarks/trajectories.py).
+    """
+
+    def __init__(self, settings=None):
+        """
+        Initializes an empty engine.
+
+        Args:
+            settings (dict, optional): The game settings (GLOBAL_SPEED_FACTOR,
+                                       NUM_FLOCK_NEIGHBORS, ...). Defaults to None,
+                                       in which case the ENV.py defaults are used.
+        """
+        self.settings = settings
+        self.birds = []
+        self.index_of = {}
+        self.state = np.empty((NUM_FIELDS, 0))
+        self.previous = np.empty((2, 0))  # Positions before the last move
+        self.ids = np.empty(0, dtype=np.int64)
+
+    def _setting(self, key, default):
+        """Returns a value from the settings, falling back to the ENV.py default."""
+        if self.settings and key in self.settings:
+            return self.settings[key]
+        return default
+
+    def __len__(self):
+        return len(self.birds)
+
+    def sync(self, birds_group):
+        """
+        Brings the arrays in line with the members of the birds group.
+
+        Birds the engine already tracks keep their rows; newly added birds
+        (initial spawns, offspring) are read from their attributes once and
+        become views of their column. A bird reused from BIRD_POOL is
+        recognized as new by its serial. Birds that left the group are
+        unbound and keep their last state.
+
+        Args:
+            birds_group (pygame.sprite.Group): The group containing all bird sprites.
+        """
+        sprites = birds_group.sprites()
+        if sprites == self.birds:
+            return
+        rows = np.fromiter(
+            (self.index_of.get(bird, -1) for bird in sprites),
+            dtype=np.intp,
+            count=len(sprites),
+        )
+        ids = np.fromiter(
+            (bird.serial for bird in sprites), dtype=np.int64, count=len(sprites)
+        )
+        known = rows >= 0
+        known[known] = self.ids[rows[known]] == ids[known]
+        state = np.empty((NUM_FIELDS, len(sprites)))
+        previous = np.empty((2, len(sprites)))
+        state[:, known] = self.state[:, rows[known]]
+        previous[:, known] = self.previous[:, rows[known]]
+        for index in np.flatnonzero(~known):
+            bird = sprites[index]
+            state[:, index] = [getattr(bird, name) for name in FIELD_ATTRIBUTES]
+            previous[:, index] = (bird.prev_x, bird.prev_y)
+
+        members = set(sprites)
+        for bird in self.birds:
+            # Still bound unless BIRD_POOL has reset it in the meantime.
+            if bird not in members and getattr(bird, "flock_engine", None) is self:
+                bird.unbind()
+        self.state = state
+        self.previous = previous
+        self.ids = ids
+        self.birds = sprites
+        self.index_of = {bird: index for index, bird in enumerate(sprites)}
+        for index, bird in enumerate(sprites):
+            BirdView.bind(bird, self, index)
+
+    def _bird_rects(self):
+        """Returns the left, right and center y of the bird rects as a (3, n) array."""
+        return (
+            np.array(
+                [
+                    (bird.rect.left, bird.rect.right, bird.rect.centery)
+                    for bird in self.birds
+                ],
+                dtype=float,
+            )
+            .reshape(-1, 3)
+            .T
+        )
+
+    def avoid_obstacles(self, obstacles):
+        """
+        Applies the CPA obstacle avoidance force to every bird at once.
+
+        Args:
+            obstacles (pygame.sprite.Group): The group containing all obstacle sprites.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: The velocity of every bird after
+                avoidance; the state is not changed.
+        """
+        speed_x = self.state[SPEED_X].copy()
+        speed_y = self.state[SPEED_Y].copy()
+        obstacles = obstacle_arrays(obstacles)
+        if obstacles is None:
+            return speed_x, speed_y
+        rect_left, rect_right, rect_centery = self._bird_rects()
+        bird_arrays = {
+            "x": self.state[X],
+            "y": self.state[Y],
+            "speed_x": speed_x,
+            "speed_y": speed_y,
+            "rect_left": rect_left,
+            "rect_right": rect_right,
+            "rect_centery": rect_centery,
+            "avoidance_distance": self.state[AVOIDANCE_DISTANCE],
+            "width": self.birds[0].bird_width,
+            "height": self.birds[0].bird_height,
+        }
+        force_x, force_y = obstacle_avoidance_forces(
+            bird_arrays,
+            obstacles,
+            self._setting("GLOBAL_SPEED_FACTOR", GLOBAL_SPEED_FACTOR),
+        )
+        steer = (force_x != 0) | (force_y != 0)
+        if steer.any():
+            speed_x[steer], speed_y[steer] = apply_new_velocity(
+                speed_x[steer],
+                speed_y[steer],
+                force_x[steer],
+                force_y[steer],
+                self.state[AVOIDANCE, steer],
+            )
+        return speed_x, speed_y
+
+    def flock(self, speed_x, speed_y):
+        """
+        Applies alignment, cohesion and separation to every bird at once,
+        using each bird's NUM_FLOCK_NEIGHBORS closest neighbors.
+
+        Args:
+            speed_x (numpy.ndarray): The x velocity of every bird after avoidance.
+            speed_y (numpy.ndarray): The y velocity of every bird after avoidance.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: The velocity of every bird after
+                flocking; neighbors are seen with their velocities in the state.
+        """
+        num_neighbors = self._setting("NUM_FLOCK_NEIGHBORS", NUM_FLOCK_NEIGHBORS)
+        neighbors = k_nearest_indices(
+            self.state[X], self.state[Y], self.ids, num_neighbors
+        )
+        if neighbors.shape[1] == 0:
+            return speed_x, speed_y
+        return flocking_velocities(
+            self.state, slice(None), neighbors, speed_x, speed_y
+        )
+
+    def seek_food(self, food_group, speed_x, speed_y):
+        """
+        Batched Bird.move_towards_food: steers every bird towards its closest food item.
+
+        Args:
+            food_group (pygame.sprite.Group): The group containing all food sprites.
+            speed_x (numpy.ndarray): The x velocity of every bird after flocking.
+            speed_y (numpy.ndarray): The y velocity of every bird after flocking.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: The velocity of every bird after
+                food seeking.
+        """
+        if not food_group:
+            return speed_x, speed_y
+        food_x, food_y = food_positions(food_group)
+        return food_velocities(
+            self.state[X],
+            self.state[Y],
+            speed_x,
+            speed_y,
+            self.state[FOOD_ATTRACTION],
+            food_x,
+            food_y,
+        )
+
+    def steer(self, obstacles, food_group):
+        """
+        Applies obstacle avoidance, flocking and food seeking to the velocities
+        of every bird, in the same order as Bird.update.
+
+        All phases read the state from the start of the frame and the new
+        velocities are only written at the end, like in ParallelBirdUpdater.
+
+        Args:
+            obstacles (pygame.sprite.Group): The group containing all obstacle sprites.
+            food_group (pygame.sprite.Group): The group containing all food sprites.
+        """
+        with PROFILER.phase("engine.avoid_obstacles"):
+            speed_x, speed_y = self.avoid_obstacles(obstacles)
+        with PROFILER.phase("engine.flock"):
+            speed_x, speed_y = self.flock(speed_x, speed_y)
+        with PROFILER.phase("engine.food"):
+            speed_x, speed_y = self.seek_food(food_group, speed_x, speed_y)
+        self.state[SPEED_X] = speed_x
+        self.state[SPEED_Y] = speed_y
+
+    def move(self, radius):
+        """
+        Batched Bird.move: advances every bird and bounces it off the screen edges.
+
+        Args:
+            radius (float): The bird radius used for the screen-edge bounce.
+        """
+        speed_factor = self._setting("GLOBAL_SPEED_FACTOR", GLOBAL_SPEED_FACTOR)
+        self.previous = self.state[X : Y + 1].copy()
+        x = self.state[X] + self.state[SPEED_X] * speed_factor
+        y = self.state[Y] + self.state[SPEED_Y] * speed_factor
+
+        bounce_x = (x <= radius) | (x >= SCREEN_WIDTH - radius)
+        self.state[SPEED_X, bounce_x] *= -1
+        x[bounce_x] = np.clip(x[bounce_x], radius, SCREEN_WIDTH - radius)
+        bounce_y = (y <= radius) | (y >= SCREEN_HEIGHT - radius)
+        self.state[SPEED_Y, bounce_y] *= -1
+        y[bounce_y] = np.clip(y[bounce_y], radius, SCREEN_HEIGHT - radius)
+
+        self.state[X] = x
+        self.state[Y] = y
+
+    def interpolated_centers(self, alpha):
+        """
+        Places every tracked bird between its previous and current position,
+        like the per-bird interpolation of Game._interpolated_blits.
+
+        Args:
+            alpha (float): Interpolation factor; 1.0 gives the current positions.
+
+        Returns:
+            tuple[list[int], list[int]]: The x and y of every bird's center, in
+                the order of self.birds.
+        """
+        x = self.previous[0] + (self.state[X] - self.previous[0]) * alpha
+        y = self.previous[1] + (self.state[Y] - self.previous[1]) * alpha
+        return x.astype(int).tolist(), y.astype(int).tolist()
+
+    def step(self, birds_group, obstacles, food_group):
+        """
+        Advances the whole population by one frame.
+
+        The phases run in the same order as in Bird.update. Obstacle avoidance,
+        flocking, food seeking and movement are batched on the arrays; per bird
+        only the animation and the rect are updated, for rendering. Deaths,
+        eating and reproduction are settled before the step by
+        broadphase.resolve_contacts.
+
+        Args:
+            birds_group (pygame.sprite.Group): The group containing all bird sprites.
+            obstacles (pygame.sprite.Group): The group containing all obstacle sprites.
+            food_group (pygame.sprite.Group): The group containing all food sprites.
+        """
+        with PROFILER.phase("engine.sync"):
+            self.sync(birds_group)
+        if not self.birds:
+            return
+
+        self.steer(obstacles, food_group)
+
+        with PROFILER.phase("engine.animate"):
+            for bird in self.birds:
+                bird.animate()
+                bird.rect = bird.image.get_rect()
+
+        with PROFILER.phase("engine.move"):
+            self.move(self.birds[0].radius)
+            for bird, x, y in zip(
+                self.birds, self.state[X].tolist(), self.state[Y].tolist()
+            ):
+                bird.rect.center = (int(x), int(y))
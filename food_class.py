@@ -1,5 +1,11 @@
+import itertools
+import math
+
+import numpy as np
 import pygame
-from env import FOOD_SIZE
+from env import FOOD_SIZE, FOOD_GRID_CELL_SIZE
+from entity_pool import EntityPool, PooledGroup
+from sprite_atlas import SPRITE_ATLAS
 
 
 class Food(pygame.sprite.Sprite):
@@ -16,14 +22,22 @@ class Food(pygame.sprite.Sprite):
             y (int): The y-coordinate for the food item's position.
         """
         super().__init__()
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        """
+        (Re)initializes the food item in place at a new position, e.g. when
+        FOOD_POOL reuses it.
+
+        Args:
+            x (int): The x-coordinate for the food item's position.
+            y (int): The y-coordinate for the food item's position.
+        """
         self.x = x
         self.y = y
         self.width = FOOD_SIZE
         self.height = FOOD_SIZE
-        self.image = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, 
-                           (220, 50, 50, 200),
-                           (self.width // 2, self.height // 2), self.width // 2)
+        self.image = SPRITE_ATLAS.food()  # Shared by every food item
         self.rect = self.image.get_rect(topleft=(self.x, self.y))
 
     def draw(self, screen):
@@ -34,3 +48,138 @@ class Food(pygame.sprite.Sprite):
             screen (pygame.Surface): The Pygame surface to draw the food item on.
         """
         screen.blit(self.image, self.rect)
+
+
+class FoodGroup(PooledGroup):
+    """
+    Sprite group for food items that keeps a spatial index of its members.
+
+    Food never moves, so the index is maintained incrementally: items are
+    filed into a uniform grid when they are added to the group (see
+    Game._spawn_food) and dropped from it when they are removed, e.g. by
+    kill(). Birds query the nearest item through nearest() to steer towards
+    it; eating itself is settled by broadphase.resolve_contacts. With a pool,
+    eaten items are released to it for reuse.
+    """
+
+    def __init__(self, *sprites, cell_size=FOOD_GRID_CELL_SIZE, pool=None):
+        """
+        Initializes the group and its index.
+
+        Args:
+            *sprites (Food): Food items to add right away.
+            cell_size (float, optional): Width and height of an index cell in pixels.
+                                         Defaults to FOOD_GRID_CELL_SIZE from ENV.py.
+            pool (EntityPool, optional): The pool items that leave the group are
+                                         released to, e.g. FOOD_POOL. Defaults to None.
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+        self.cell_of = {}
+        self.sequence_of = {}
+        self.sequence_counter = itertools.count()
+        self._position_cache = None
+        self._cell_bounds = None
+        super().__init__(*sprites, pool=pool)
+
+    def _cell_coords(self, x, y):
+        """Returns the (column, row) of the cell containing the point (x, y)."""
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def add_internal(self, sprite, layer=None):
+        """Adds a food item to the group and files it in the index."""
+        super().add_internal(sprite, layer)
+        cell = self._cell_coords(sprite.rect.centerx, sprite.rect.centery)
+        self.cells.setdefault(cell, []).append(sprite)
+        self.cell_of[sprite] = cell
+        self.sequence_of[sprite] = next(self.sequence_counter)
+        self._position_cache = None
+        self._cell_bounds = None
+
+    def remove_internal(self, sprite):
+        """Removes a food item from the group and from the index."""
+        super().remove_internal(sprite)
+        cell = self.cell_of.pop(sprite)
+        del self.sequence_of[sprite]
+        members = self.cells[cell]
+        members.remove(sprite)
+        if not members:
+            del self.cells[cell]
+        self._position_cache = None
+        self._cell_bounds = None
+
+    def nearest(self, x, y):
+        """
+        Finds the food item whose center is closest to a point.
+
+        Ties go to the item that was added first, the same item a linear
+        scan over the group would pick.
+
+        Args:
+            x (float): The x-coordinate of the query point.
+            y (float): The y-coordinate of the query point.
+
+        Returns:
+            Food or None: The closest food item, or None if the group is empty.
+        """
+        if not self.cells:
+            return None
+        if self._cell_bounds is None:
+            columns = [cell[0] for cell in self.cells]
+            rows = [cell[1] for cell in self.cells]
+            self._cell_bounds = (min(columns), max(columns), min(rows), max(rows))
+        min_column, max_column, min_row, max_row = self._cell_bounds
+        center_x, center_y = self._cell_coords(x, y)
+        max_ring = max(
+            center_x - min_column,
+            max_column - center_x,
+            center_y - min_row,
+            max_row - center_y,
+            0,
+        )
+        best = None
+        ring = 0
+        while True:
+            for cell_x in range(center_x - ring, center_x + ring + 1):
+                on_edge = cell_x in (center_x - ring, center_x + ring)
+                cell_ys = (
+                    range(center_y - ring, center_y + ring + 1)
+                    if on_edge
+                    else (center_y - ring, center_y + ring)
+                )
+                for cell_y in cell_ys:
+                    for food_item in self.cells.get((cell_x, cell_y), ()):
+                        dx = food_item.rect.centerx - x
+                        dy = food_item.rect.centery - y
+                        key = (dx**2 + dy**2, self.sequence_of[food_item])
+                        if best is None or key < best[0]:
+                            best = (key, food_item)
+            # Items outside the rings searched so far are farther than this.
+            covered = ring * self.cell_size
+            if ring >= max_ring or (best is not None and best[0][0] <= covered**2):
+                break
+            ring += 1
+        return best[1]
+
+    def positions(self):
+        """
+        Returns the food items and their center coordinates as arrays.
+
+        The arrays are rebuilt only after the group has changed.
+
+        Returns:
+            tuple[list[Food], numpy.ndarray, numpy.ndarray]: The items in group
+                order and the x and y coordinates of their centers.
+        """
+        if self._position_cache is None:
+            items = self.sprites()
+            self._position_cache = (
+                items,
+                np.array([item.rect.centerx for item in items], dtype=float),
+                np.array([item.rect.centery for item in items], dtype=float),
+            )
+        return self._position_cache
+
+
+# Eaten food items, reused for new ones.
+FOOD_POOL = EntityPool(Food)
@@ -1,40 +1,116 @@
+import argparse
 import os
+import time
 import traceback
-import csv
 import random
-from bird_class import Bird
-from plotter import GamePlotter
-from obstacles import Obstacle
-from food_class import Food
+from bird_class import BIRD_POOL, BirdGroup
+from broadphase import resolve_contacts
+from dirty_renderer import DirtyRectRenderer
+from entity_pool import PooledGroup
+from checkpoint import CheckpointWriter, read_checkpoint, restore_checkpoint
+from plot_buffer import MinMaxMeanDownsampler, PlotRingBuffer
+from obstacles import OBSTACLE_POOL
+from food_class import FOOD_POOL, FoodGroup
+from particles import TrailParticleSystem
+from profiler import PROFILER
+from replay import ReplayRecorder, ReplayVerifier
+from rng import RNG, seed_all
+from spatial_grid import SpatialGrid
+from stats_sink import StatsSink
+from domain_decomposition import DomainFlockEngine
+from flock_engine import FlockEngine
+from parallel_update import ParallelBirdUpdater
+from sprite_atlas import SPRITE_ATLAS
+from sprite_cache import BIRD_ROTATION_CACHE
+import numpy as np
 import pygame
 from datetime import datetime
 
 from env import *
 
+# The pools behind the entity groups, by entity kind.
+ENTITY_POOLS = {"Bird": BIRD_POOL, "Food": FOOD_POOL, "Comet": OBSTACLE_POOL}
+
 
 class Game:
     """The main class running and initializing the simulation."""
 
-    def __init__(self):
-        """Initializes the game window, settings, and game objects."""
+    def __init__(
+        self,
+        headless=False,
+        settings_overrides=None,
+        seed=None,
+        graph_backend=None,
+        dirty_rects=None,
+    ):
+        """
+        Initializes the game window, settings, and game objects.
+
+        Args:
+            headless (bool, optional): If True, no window, icon or fonts are
+                                       created and the game can only
+                                       be driven through run_headless(). Defaults
+                                       to False.
+            settings_overrides (dict, optional): Settings that replace the defaults
+                                                 from _load_initial_settings before
+                                                 the initial birds are created.
+            seed (int, optional): Seed of the shared random stream. Runs with the
+                                  same seed and settings are identical. Defaults
+                                  to None, which picks a random seed.
+            graph_backend (str, optional): "matplotlib" for a separate graph
+                                           window or "native" for a chart drawn
+                                           into the game window. Defaults to
+                                           GRAPH_BACKEND from ENV.py.
+            dirty_rects (bool, optional): Redraw and update only the parts of the
+                                          window that changed, see
+                                          DirtyRectRenderer. Defaults to
+                                          DIRTY_RECT_RENDERING from ENV.py.
+        """
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2**32)
+        seed_all(self.seed)
+        self.replay = None  # ReplayRecorder or ReplayVerifier fed after every frame
+        self.checkpointer = None  # CheckpointWriter fed after every frame
+        self.stats_sink = None  # StatsSink receiving every logged data point
+        self.frame_number = 0  # Simulation steps since the start of the run
+        self.headless = headless
+        if self.headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
         pygame.init()
-        window_pos_x = 50
-        window_pos_y = 50
-        os.environ["SDL_VIDEO_WINDOW_POS"] = f"{window_pos_x},{window_pos_y}"
+        SPRITE_ATLAS.build()  # Every entity's images, drawn once and shared
+
+        if self.headless:
+            self.screen = None
+            self.font = self.button_font = None
+        else:
+            window_pos_x = 50
+            window_pos_y = 50
+            os.environ["SDL_VIDEO_WINDOW_POS"] = f"{window_pos_x},{window_pos_y}"
+
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Genetic Swarm Simulation")
+            pygame.display.set_icon(pygame.image.load("icon.jpg"))
 
-        pygame.display.set_caption("Genetic Swarm Simulation")
-        pygame.display.set_icon(pygame.image.load("icon.jpg"))
+            self.font = pygame.font.Font(None, UI_FONT_SIZE)
+            self.button_font = pygame.font.Font(None, UI_FONT_SIZE - 4)
+        self.text_cache = {}  # Rendered UI text, see _text_surface
 
-        self.font = pygame.font.Font(None, UI_FONT_SIZE)
-        self.button_font = pygame.font.Font(None, UI_FONT_SIZE - 4)
+        if dirty_rects is None:
+            dirty_rects = DIRTY_RECT_RENDERING
+        self.dirty_renderer = None
+        if dirty_rects and not self.headless:
+            self.dirty_renderer = DirtyRectRenderer(self.screen)
 
         self.menu_active = False
         self.settings = self._load_initial_settings()
+        if settings_overrides:
+            self.settings.update(settings_overrides)
         self.setting_ui_elements = {}
-        self.menu_font = pygame.font.Font(None, 28)
-        self.menu_item_font = pygame.font.Font(None, 24)
+        if self.headless:
+            self.menu_font = self.menu_item_font = None
+        else:
+            self.menu_font = pygame.font.Font(None, 28)
+            self.menu_item_font = pygame.font.Font(None, 24)
         self._setup_menu_ui_elements()
 
         self.open_menu_button_rect = pygame.Rect(
@@ -46,10 +122,33 @@ class Game:
 
         self.clock = pygame.time.Clock()
         self.running = True
-
-        self.birds_group = pygame.sprite.Group()
-        self.obstacle_group = pygame.sprite.Group()
-        self.food_group = pygame.sprite.Group()
+        self.speed_index = 0  # Index into FAST_FORWARD_SPEEDS
+        self.step_accumulator = 0.0  # Simulated seconds not yet stepped
+        self.steps_per_second = 0.0
+        self._steps_since_rate_update = 0
+        self._rate_update_time = time.perf_counter()
+
+        # Entities that leave a group are reused instead of collected.
+        self.birds_group = BirdGroup(pool=BIRD_POOL)
+        self.obstacle_group = PooledGroup(pool=OBSTACLE_POOL)
+        self.trail_particles = TrailParticleSystem()
+        self.food_group = FoodGroup(pool=FOOD_POOL)
+        self.neighbor_grid = SpatialGrid()
+        if self.settings["DOMAIN_WORKERS"] > 0:
+            self.flock_engine = DomainFlockEngine(self.settings)
+        else:
+            self.flock_engine = FlockEngine(self.settings)
+        self.bird_updater = None
+        if self.settings["PARALLEL_UPDATE_THREADS"] > 0:
+            if self.settings["USE_FLOCK_ENGINE"] or self.settings["DOMAIN_WORKERS"] > 0:
+                print(
+                    "PARALLEL_UPDATE_THREADS is ignored: the birds are updated by "
+                    "the flock engine (USE_FLOCK_ENGINE or DOMAIN_WORKERS)."
+                )
+            else:
+                self.bird_updater = ParallelBirdUpdater(
+                    self.settings["PARALLEL_UPDATE_THREADS"], settings=self.settings
+                )
         self._create_initial_birds(self.settings["INITIAL_NUM_BIRDS"])
 
         self.food_spawn_timer = 0
@@ -58,15 +157,20 @@ class Game:
 
         self.num_current_birds = 0
 
-        self.graph_time_steps = []
-        self.graph_data = {
-            "AvgCohesion": [],
-            "AvgAlignment": [],
-            "AvgSeparation": [],
-            "AvgAvoidance": [],
-            "AvgFoodAttraction": [],
-            "AvgAvoidanceDistance": [],
-        }  
+        # Only the recent points are kept here; the stats sink has them all,
+        # and graph_summary summarizes them all for the graph.
+        self.graph_history = PlotRingBuffer(
+            GRAPH_HISTORY_MAX_POINTS,
+            [
+                "AvgCohesion",
+                "AvgAlignment",
+                "AvgSeparation",
+                "AvgAvoidance",
+                "AvgFoodAttraction",
+                "AvgAvoidanceDistance",
+            ],
+        )
+        self.graph_summary = MinMaxMeanDownsampler(len(self.graph_history.keys))
         self.data_point_counter = 0
         # Initialize average stats attributes
         self.avg_cohesion = 0.0
@@ -78,7 +182,8 @@ class Game:
         self.close_menu_button_rect = None
         self.apply_settings_button_rect = None
 
-        self.plotter = GamePlotter()
+        self.graph_backend = graph_backend or GRAPH_BACKEND
+        self.plotter = None  # Created when the graph is first shown, see _toggle_graph
 
         self.toggle_graph_button_rect = pygame.Rect(
             SCREEN_WIDTH - 140 - UI_PADDING,
@@ -102,6 +207,10 @@ class Game:
             "GLOBAL_SPEED_FACTOR": GLOBAL_SPEED_FACTOR,
             "REPRODUCTION_THRESHOLD": REPRODUCTION_THRESHOLD,
             "NUM_FLOCK_NEIGHBORS": NUM_FLOCK_NEIGHBORS,
+            "USE_SPATIAL_GRID": USE_SPATIAL_GRID,
+            "USE_FLOCK_ENGINE": USE_FLOCK_ENGINE,
+            "DOMAIN_WORKERS": DOMAIN_WORKERS,
+            "PARALLEL_UPDATE_THREADS": PARALLEL_UPDATE_THREADS,
         }
 
     def _setup_menu_ui_elements(self):
@@ -114,7 +223,7 @@ class Game:
                 "step": 1,
                 "type": int,
             },
-            "FPS": {"label": "FPS", "min": 10, "max": 240, "step": 1, "type": int},
+            "FPS": {"label": "Sim FPS", "min": 10, "max": 240, "step": 1, "type": int},
             "DESIRED_NUM_OBSTACLES": {
                 "label": "Desired Obstacles",
                 "min": 0,
@@ -172,9 +281,9 @@ class Game:
         """Creates the initial set of birds based on the given count."""
         self.birds_group.empty()
         for _ in range(int(count)):
-            bird_x = random.randint(20, SCREEN_WIDTH - 20)
-            bird_y = random.randint(20, SCREEN_HEIGHT - 20)
-            bird = Bird(bird_x, bird_y, settings=self.settings)
+            bird_x = RNG.randint(20, SCREEN_WIDTH - 20)
+            bird_y = RNG.randint(20, SCREEN_HEIGHT - 20)
+            bird = BIRD_POOL.acquire(bird_x, bird_y, settings=self.settings)
             self.birds_group.add(bird)
         self.num_current_birds = len(self.birds_group)
 
@@ -185,9 +294,9 @@ class Game:
             self.food_spawn_timer = 0
             if len(self.food_group) < self.settings["MAX_FOOD_ON_SCREEN"]:
                 self.food_group.add(
-                    Food(
-                        random.randint(10, SCREEN_WIDTH - 10 - FOOD_SIZE),
-                        random.randint(10, SCREEN_HEIGHT - 10 - FOOD_SIZE),
+                    FOOD_POOL.acquire(
+                        RNG.randint(10, SCREEN_WIDTH - 10 - FOOD_SIZE),
+                        RNG.randint(10, SCREEN_HEIGHT - 10 - FOOD_SIZE),
                     )
                 )
 
@@ -202,54 +311,35 @@ class Game:
                     len(self.obstacle_group)
                     < self.settings["DESIRED_NUM_OBSTACLES"] * 3
                 ):
-                    new_obstacle = Obstacle(speed_x=self.settings["OBSTACLE_SPEED"])
+                    new_obstacle = OBSTACLE_POOL.acquire(
+                        speed_x=self.settings["OBSTACLE_SPEED"],
+                        trail_particles=self.trail_particles,
+                    )
                     self.obstacle_group.add(new_obstacle)
         else:
             if len(self.obstacle_group) < self.settings["DESIRED_NUM_OBSTACLES"]:
-                new_obstacle = Obstacle(speed_x=self.settings["OBSTACLE_SPEED"])
+                new_obstacle = OBSTACLE_POOL.acquire(
+                    speed_x=self.settings["OBSTACLE_SPEED"],
+                    trail_particles=self.trail_particles,
+                )
                 self.obstacle_group.add(new_obstacle)
 
-    def _calculate_average_stat(
-        self, sprites, attribute_name, num_sprites, default_value=0.0
-    ):
-        """Calculates the average value of a specific attribute for a group of sprites."""
-        if num_sprites == 0:
-            return default_value
-        return (
-            sum(getattr(b, attribute_name, default_value) for b in sprites)
-            / num_sprites
-        )
-
     def _calculate_and_update_stats(self):
-        """Calculates and updates various game statistics, including average bird attributes."""
-        current_bird_sprites = self.birds_group.sprites()
-        self.num_current_birds = len(current_bird_sprites)
+        """
+        Updates the game statistics, including the average bird attributes.
 
-        if self.num_current_birds > 0:
-            self.avg_cohesion = self._calculate_average_stat(
-                current_bird_sprites, "cohesion_strength", self.num_current_birds
-            )
-            self.avg_alignment = self._calculate_average_stat(
-                current_bird_sprites, "alignment_strength", self.num_current_birds
-            )
-            self.avg_separation = self._calculate_average_stat(
-                current_bird_sprites, "separation_strength", self.num_current_birds
-            )
-            self.avg_avoidance = self._calculate_average_stat(
-                current_bird_sprites, "avoidance_strength", self.num_current_birds
-            )
-            self.avg_food_attraction = self._calculate_average_stat(
-                current_bird_sprites, "food_attraction_strength", self.num_current_birds
-            )
-            self.avg_obstacle_avoidance_distance = self._calculate_average_stat(
-                current_bird_sprites,
-                "obstacle_avoidance_distance",
-                self.num_current_birds,
-            )
-        else:
-            self.avg_cohesion = self.avg_alignment = self.avg_separation = (
-                self.avg_avoidance
-            ) = self.avg_food_attraction = self.avg_obstacle_avoidance_distance = 0.0
+        The averages are read from the running statistics that the bird group
+        maintains as birds are born and die, so no pass over the birds is needed.
+        """
+        self.num_current_birds = len(self.birds_group)
+        (
+            self.avg_cohesion,
+            self.avg_alignment,
+            self.avg_separation,
+            self.avg_avoidance,
+            self.avg_food_attraction,
+            self.avg_obstacle_avoidance_distance,
+        ) = self.birds_group.stats.means().tolist()
 
         self.frame_counter_for_logging_stats += 1
         if (
@@ -257,25 +347,52 @@ class Game:
             >= GRAPH_DATA_LOG_INTERVAL_FRAMES / GAME_LOGIC_UPDATE_INTERVAL_FRAMES
         ):
             self.frame_counter_for_logging_stats = 0
-            self.graph_time_steps.append(self.data_point_counter)
-            self.graph_data["AvgCohesion"].append(self.avg_cohesion)
-            self.graph_data["AvgAlignment"].append(self.avg_alignment)
-            self.graph_data["AvgSeparation"].append(self.avg_separation)
-            self.graph_data["AvgAvoidance"].append(self.avg_avoidance)
-            self.graph_data["AvgFoodAttraction"].append(self.avg_food_attraction)
-            self.graph_data["AvgAvoidanceDistance"].append(
-                self.avg_obstacle_avoidance_distance
+            values = [
+                self.avg_cohesion,
+                self.avg_alignment,
+                self.avg_separation,
+                self.avg_avoidance,
+                self.avg_food_attraction,
+                self.avg_obstacle_avoidance_distance,
+            ]
+            # The plotter's worker picks the new point up from the shared buffer.
+            self.graph_history.append(self.data_point_counter, values)
+            self.graph_summary.add(
+                np.array([self.data_point_counter]), np.array([values])
             )
-
-            if self.plotter.is_graph_showing:
-                self.plotter.queue_new_plot_data(self.graph_time_steps, self.graph_data)
+            if self.stats_sink:
+                stats = self.birds_group.stats
+                self.stats_sink.append(
+                    [self.data_point_counter]
+                    + values
+                    + stats.standard_deviations().tolist()
+                    + [stats.diversity()]
+                )
             self.data_point_counter += 1
 
+    def _text_surface(self, text_str, font_obj, color):
+        """
+        Returns the rendered text, reusing the surface while the text is unchanged.
+        """
+        key = (text_str, id(font_obj), color)
+        text_surface = self.text_cache.get(key)
+        if text_surface is None:
+            if len(self.text_cache) >= UI_TEXT_CACHE_SIZE:
+                self.text_cache.clear()
+            text_surface = font_obj.render(text_str, True, color)
+            self.text_cache[key] = text_surface
+        return text_surface
+
     def _render_text(self, text_str, position, font_obj=None):
-        """Renders text onto the screen at a given position."""
+        """
+        Renders text onto the screen at a given position.
+
+        Returns:
+            pygame.Rect: The region the text was drawn to.
+        """
         use_font = font_obj if font_obj else self.font
-        text_surface = use_font.render(text_str, True, BLACK)
-        self.screen.blit(text_surface, position)
+        text_surface = self._text_surface(text_str, use_font, BLACK)
+        return self.screen.blit(text_surface, position)
 
     def _draw_button(
         self,
@@ -287,48 +404,80 @@ class Game:
         mouse_pos,
         font=None,
     ):
-        """Draws a button on the screen with specified properties."""
+        """
+        Draws a button on the screen with specified properties.
+
+        Returns:
+            pygame.Rect: The region the button covers.
+        """
         current_font = font if font else self.button_font
         button_color = hover_color if rect.collidepoint(mouse_pos) else base_color
 
         pygame.draw.rect(self.screen, button_color, rect)
         pygame.draw.rect(self.screen, text_color, rect, 1)  # Border
 
-        text_surf = current_font.render(text_content, True, text_color)
+        text_surf = self._text_surface(text_content, current_font, text_color)
         self.screen.blit(text_surf, text_surf.get_rect(center=rect.center))
+        return rect
 
     def _draw_ui(self):
-        """Draws the main user interface elements like FPS and bird count."""
+        """
+        Draws the main user interface elements like FPS and bird count.
+
+        Returns:
+            list[pygame.Rect]: The regions the interface was drawn to.
+        """
         current_fps_val = int(self.clock.get_fps())
         pad = UI_PADDING
         line_h = UI_LINE_HEIGHT
 
-        self._render_text(f"FPS: {current_fps_val}", (pad, pad))
-        self._render_text(f"Bird Count: {self.num_current_birds}", (pad, pad + line_h))
+        drawn_rects = [
+            self._render_text(
+                f"FPS: {current_fps_val}  Speed: {self._speed_label()} "
+                f"({self.steps_per_second:.0f} steps/s)",
+                (pad, pad),
+            ),
+            self._render_text(
+                f"Bird Count: {self.num_current_birds}", (pad, pad + line_h)
+            ),
+        ]
+        cache_stats = BIRD_ROTATION_CACHE.stats()
+        drawn_rects.append(
+            self._render_text(
+                f"Sprite Cache: {cache_stats['hit_rate']:.0%} hits, "
+                f"{cache_stats['total_bytes'] // 1024} KB",
+                (pad, pad + 2 * line_h),
+            )
+        )
         mouse_pos = pygame.mouse.get_pos()
 
         graph_button_text = (
             "Graph: ON"
-            if self.plotter.is_graph_showing and self.plotter.fig
+            if self.plotter and self.plotter.is_graph_showing
             else "Graph: OFF"
         )
-        self._draw_button(
-            self.toggle_graph_button_rect,
-            graph_button_text,
-            self.button_color,
-            self.button_hover_color,
-            self.button_text_color,
-            mouse_pos,
+        drawn_rects.append(
+            self._draw_button(
+                self.toggle_graph_button_rect,
+                graph_button_text,
+                self.button_color,
+                self.button_hover_color,
+                self.button_text_color,
+                mouse_pos,
+            )
         )
 
-        self._draw_button(
-            self.open_menu_button_rect,
-            "Settings Menu",
-            self.button_color,
-            self.button_hover_color,
-            self.button_text_color,
-            mouse_pos,
+        drawn_rects.append(
+            self._draw_button(
+                self.open_menu_button_rect,
+                "Settings Menu",
+                self.button_color,
+                self.button_hover_color,
+                self.button_text_color,
+                mouse_pos,
+            )
         )
+        return drawn_rects
 
     def _draw_setting_item(
         self,
@@ -506,37 +655,37 @@ class Game:
         self._create_initial_birds(self.settings["INITIAL_NUM_BIRDS"])
         print(f"Birds re-created with count: {self.settings['INITIAL_NUM_BIRDS']}")
 
-    def _save_graph_data_to_csv(self):
-        """Saves the collected graph data to a CSV file."""
-        if not self.graph_time_steps or not any(self.graph_data.values()):
-            print("No graph data to save.")
-            return
-
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"graph_data_{timestamp}.csv"
-
-        # Prepare headers
-        headers = ["TimeStep"] + list(self.graph_data.keys())
-
-        # Prepare rows
-        # Ensure all data lists are of the same length as graph_time_steps
-        # This handles cases where some data might not have been recorded for every time step
-        num_time_steps = len(self.graph_time_steps)
-        rows = []
-        for i in range(num_time_steps):
-            row = [self.graph_time_steps[i]]
-            for _key, data_list in self.graph_data.items():  # Use .items()
-                row.append(data_list[i] if i < len(data_list) else None)
-            rows.append(row)
-
+    def start_stats_log(self, filename=None, stats_format=STATS_FILE_FORMAT):
+        """
+        Starts streaming every logged data point to a statistics file.
+
+        Args:
+            filename (str, optional): The output path. Defaults to a timestamped
+                                      graph_data_*.csv or graph_data_*.bin.
+            stats_format (str, optional): "csv" or "binary". Defaults to
+                                          STATS_FILE_FORMAT from ENV.py.
+        """
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            extension = "csv" if stats_format == "csv" else "bin"
+            filename = f"graph_data_{timestamp}.{extension}"
         try:
-            with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers)
-                writer.writerows(rows)
-            print(f"Graph data saved to {filename}")
+            self.stats_sink = StatsSink(
+                filename,
+                ["TimeStep"]
+                + self.graph_history.keys
+                + [key.replace("Avg", "Std", 1) for key in self.graph_history.keys]
+                + ["Diversity"],
+                stats_format,
+            )
         except IOError as e:
-            print(f"Error saving graph data to CSV: {e}")
+            print(f"Error opening statistics file: {e}")
+
+    def _close_stats_log(self):
+        """Writes the remaining data points and closes the statistics file."""
+        if self.stats_sink:
+            self.stats_sink.close()
+            self.stats_sink = None
 
     def process_events(self):
         """Processes all Pygame events, including input and quit events."""
@@ -550,58 +699,348 @@ class Game:
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1:
                         if self.toggle_graph_button_rect.collidepoint(event.pos):
-                            self.plotter.toggle_graph_window(
-                                self.graph_time_steps, self.graph_data
-                            )
+                            self._toggle_graph()
                         elif self.open_menu_button_rect.collidepoint(event.pos):
                             self.menu_active = True
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_g:
-                        self.plotter.toggle_graph_window(
-                            self.graph_time_steps, self.graph_data
-                        )
+                        self._toggle_graph()
+                    elif event.key == pygame.K_p:
+                        PROFILER.toggle_panel()
+                    elif event.key == pygame.K_f:
+                        self._cycle_speed()
                     elif event.key == pygame.K_ESCAPE and self.menu_active:
                         self.menu_active = False
 
+    def _toggle_graph(self):
+        """
+        Shows or hides the statistics graph.
+
+        The plotting backend is imported and created on the first call, so
+        runs that never show the graph do not load Matplotlib or Qt. The
+        Matplotlib graph takes over graph_summary, the summary of every point
+        logged so far, and the native chart starts with the recent points
+        still held by graph_history.
+        """
+        if self.plotter is None:
+            # pylint: disable=import-outside-toplevel
+            if self.graph_backend == "native":
+                from native_chart import NativeStatsChart
+
+                self.plotter = NativeStatsChart(self.graph_history)
+            else:
+                from plotter import GamePlotter
+
+                self.plotter = GamePlotter(
+                    self.graph_history, summary=self.graph_summary.copy()
+                )
+        self.plotter.toggle_graph_window()
+
+    def _rebuild_neighbor_grid(self):
+        """
+        Rebuilds the spatial index used by the birds' neighbor queries.
+
+        Returns:
+            SpatialGrid or None: The rebuilt grid, or None when the brute-force
+                                 neighbor search is selected in the settings.
+        """
+        if not self.settings["USE_SPATIAL_GRID"]:
+            return None
+        # A bird's speed is normalized to 1, so it moves at most
+        # GLOBAL_SPEED_FACTOR pixels per frame; one extra pixel absorbs rounding.
+        self.neighbor_grid.rebuild(
+            self.birds_group, self.settings["GLOBAL_SPEED_FACTOR"] + 1.0
+        )
+        return self.neighbor_grid
+
     def update_state(self):
         """Updates the state of all game objects and game logic."""
-        self.birds_group.update(self.birds_group, self.obstacle_group, self.food_group)
-        self.obstacle_group.update()
-        self._spawn_food()
+        # Entities removed in the previous step are no longer referenced.
+        for pool in ENTITY_POOLS.values():
+            pool.recycle()
+        with PROFILER.phase("update.contacts"):
+            offspring = resolve_contacts(
+                self.birds_group, self.obstacle_group, self.food_group, self.settings
+            )
+        if self.settings["USE_FLOCK_ENGINE"] or self.settings["DOMAIN_WORKERS"] > 0:
+            with PROFILER.phase("update.birds"):
+                self.flock_engine.step(
+                    self.birds_group, self.obstacle_group, self.food_group
+                )
+        elif self.bird_updater:
+            with PROFILER.phase("update.birds"):
+                self.bird_updater.update(
+                    self.birds_group, self.obstacle_group, self.food_group
+                )
+        else:
+            with PROFILER.phase("update.neighbor_grid"):
+                neighbor_grid = self._rebuild_neighbor_grid()
+            with PROFILER.phase("update.birds"):
+                self.birds_group.update(
+                    self.birds_group,
+                    self.obstacle_group,
+                    self.food_group,
+                    neighbor_grid,
+                )
+        self.birds_group.add(offspring)  # Newborns start moving next frame
+        with PROFILER.phase("update.food"):
+            self._spawn_food()
+        with PROFILER.phase("update.particles"):
+            self.trail_particles.update()
+        with PROFILER.phase("update.obstacles"):
+            self.obstacle_group.update()
         self.stats_update_timer += 1
         if self.stats_update_timer >= GAME_LOGIC_UPDATE_INTERVAL_FRAMES:
             self.stats_update_timer = 0
-            self._calculate_and_update_stats()
-            self._manage_obstacles()
-
-    def render(self):
-        """Renders all game objects and UI elements to the screen."""
-        self.screen.fill(SKY_BLUE)
-        self.birds_group.draw(self.screen)
-        self.obstacle_group.draw(self.screen)
-        for obstacle in self.obstacle_group:  # Draw lingering particles
-            if hasattr(obstacle, "draw_trail_particles"):
-                obstacle.draw_trail_particles(self.screen)
-        self.food_group.draw(self.screen)
-        self._draw_ui()
-        if self.menu_active:
-            self._draw_menu_overlay()
-        pygame.display.flip()
+            with PROFILER.phase("update.stats"):
+                self._calculate_and_update_stats()
+                self._manage_obstacles()
+        self.frame_number += 1
+        if self.replay:
+            with PROFILER.phase("update.replay"):
+                self.replay.on_frame(self)
+        if self.checkpointer:
+            with PROFILER.phase("update.checkpoint"):
+                self.checkpointer.on_frame(self)
+
+    def _cycle_speed(self):
+        """Switches to the next fast-forward speed (1x, 4x, 16x, max)."""
+        self.speed_index = (self.speed_index + 1) % len(FAST_FORWARD_SPEEDS)
+        self.step_accumulator = 0.0
+
+    def _speed_label(self):
+        """Returns the current fast-forward speed as shown in the UI."""
+        speed = FAST_FORWARD_SPEEDS[self.speed_index]
+        return f"{speed}x" if speed else "max"
+
+    def _advance_simulation(self, elapsed_seconds):
+        """
+        Runs as many fixed simulation steps as the elapsed time and speed call for.
+
+        One step always simulates 1/FPS seconds. At 1x the simulation follows
+        the wall clock; at Nx it runs N steps per real-time step. Stepping stops
+        after SIMULATION_FRAME_BUDGET_MS of wall time so the window stays
+        responsive; at max speed it always uses the whole budget, and when the
+        simulation cannot keep up with the requested speed the backlog is
+        dropped instead of growing without bound.
+
+        Args:
+            elapsed_seconds (float): Wall-clock time since the previous call.
+
+        Returns:
+            float: How far (0-1) the simulation has progressed from the last
+                   step towards the next one, used to interpolate rendering.
+        """
+        step_seconds = 1.0 / self.settings["FPS"]
+        speed = FAST_FORWARD_SPEEDS[self.speed_index]
+        steps = 0
+        deadline = time.perf_counter() + SIMULATION_FRAME_BUDGET_MS / 1000.0
+        if not speed:
+            while True:
+                self.update_state()
+                steps += 1
+                if time.perf_counter() >= deadline:
+                    break
+            self.step_accumulator = 0.0
+            alpha = 1.0
+        else:
+            self.step_accumulator += elapsed_seconds * speed
+            while self.step_accumulator >= step_seconds:
+                if time.perf_counter() >= deadline:
+                    # Too slow to catch up: drop the backlog instead of spiralling.
+                    self.step_accumulator = 0.0
+                    break
+                self.update_state()
+                self.step_accumulator -= step_seconds
+                steps += 1
+            alpha = self.step_accumulator / step_seconds
+
+        self._steps_since_rate_update += steps
+        now = time.perf_counter()
+        if now - self._rate_update_time >= 1.0:
+            self.steps_per_second = self._steps_since_rate_update / (
+                now - self._rate_update_time
+            )
+            self._steps_since_rate_update = 0
+            self._rate_update_time = now
+        return alpha
+
+    def _interpolated_blits(self, alpha):
+        """
+        Places birds and obstacles between their previous and current positions.
+
+        Args:
+            alpha (float): Interpolation factor; 1.0 places them at the current positions.
+
+        Returns:
+            list[tuple]: (image, destination rect) per bird and obstacle, in
+                         drawing order, for Surface.blits.
+        """
+        birds = self.birds_group.sprites()
+        # Birds stepped by the flock engine are placed from its arrays in one
+        # go; birds it has not synced yet (newborns) are placed one by one.
+        engine_birds = self.flock_engine.birds
+        if birds[: len(engine_birds)] != engine_birds:
+            engine_birds = []
+        blits = []
+        if engine_birds:
+            centers_x, centers_y = self.flock_engine.interpolated_centers(alpha)
+            blits.extend(
+                (bird.image, bird.image.get_rect(center=(x, y)))
+                for bird, x, y in zip(engine_birds, centers_x, centers_y)
+            )
+        blits.extend(
+            (
+                bird.image,
+                bird.image.get_rect(
+                    center=(
+                        int(bird.prev_x + (bird.x - bird.prev_x) * alpha),
+                        int(bird.prev_y + (bird.y - bird.prev_y) * alpha),
+                    )
+                ),
+            )
+            for bird in birds[len(engine_birds) :]
+        )
+        blits.extend(
+            (
+                obstacle.image,
+                obstacle.image.get_rect(
+                    topleft=(
+                        int(obstacle.prev_x + (obstacle.x - obstacle.prev_x) * alpha),
+                        obstacle.rect.y,
+                    )
+                ),
+            )
+            for obstacle in self.obstacle_group
+        )
+        return blits
+
+    def _draw_interpolated(self, alpha):
+        """
+        Draws birds and obstacles between their previous and current positions.
+
+        Args:
+            alpha (float): Interpolation factor; 1.0 draws the current positions.
+        """
+        self.screen.blits(self._interpolated_blits(alpha), doreturn=False)
+
+    def render(self, alpha=1.0):
+        """
+        Renders all game objects and UI elements to the screen.
+
+        Args:
+            alpha (float, optional): Interpolation factor between the previous and
+                                     the current simulation step. Defaults to 1.0,
+                                     the current step.
+        """
+        if self.dirty_renderer:
+            if len(self.birds_group) <= self.dirty_renderer.max_rects:
+                self._render_dirty(alpha)
+                return
+            # Too many birds to track; redraw fully now and on returning.
+            self.dirty_renderer.invalidate()
+        with PROFILER.phase("render.sprites"):
+            self.screen.fill(SKY_BLUE)
+            if alpha < 1.0:
+                self._draw_interpolated(alpha)
+            else:
+                self.birds_group.draw(self.screen)
+                self.obstacle_group.draw(self.screen)
+        with PROFILER.phase("render.trails"):
+            self.trail_particles.draw(self.screen)  # Trails of every obstacle in one pass
+        with PROFILER.phase("render.ui"):
+            self.food_group.draw(self.screen)
+            self._draw_ui()
+        if hasattr(self.plotter, "draw"):
+            with PROFILER.phase("render.graph"):
+                self.plotter.draw(self.screen)
+        with PROFILER.phase("render.ui"):
+            if PROFILER.show_panel:
+                PROFILER.draw(self.screen, (UI_PADDING, UI_PADDING + 3 * UI_LINE_HEIGHT))
+            if self.menu_active:
+                self._draw_menu_overlay()
+        with PROFILER.phase("render.flip"):
+            pygame.display.flip()
+
+    def _render_dirty(self, alpha):
+        """
+        Renders like render(), but erases and updates only the regions that
+        were drawn in this or the previous frame, see DirtyRectRenderer.
+
+        Args:
+            alpha (float): Interpolation factor between the previous and the
+                           current simulation step.
+        """
+        renderer = self.dirty_renderer
+        with PROFILER.phase("render.trails"):
+            trail_rects = self.trail_particles.bounding_rects()
+        with PROFILER.phase("render.sprites"):
+            if alpha < 1.0:
+                blits = self._interpolated_blits(alpha)
+            else:
+                blits = [
+                    (sprite.image, sprite.rect)
+                    for group in (self.birds_group, self.obstacle_group)
+                    for sprite in group
+                ]
+            # Food is drawn over sprites and trails, so it is erased under them.
+            renderer.begin_frame(
+                static_group=self.food_group,
+                covered_rects=[rect for _, rect in blits] + trail_rects,
+            )
+            renderer.add_rects(self.screen.blits(blits))
+        with PROFILER.phase("render.trails"):
+            self.trail_particles.draw(self.screen)
+            renderer.add_rects(trail_rects)
+        with PROFILER.phase("render.ui"):
+            renderer.draw_static_group(self.food_group)
+            renderer.add_rects(self._draw_ui())
+        if hasattr(self.plotter, "draw"):
+            with PROFILER.phase("render.graph"):
+                chart_rect = self.plotter.draw(self.screen)
+                if chart_rect:
+                    renderer.add_rects([chart_rect])
+        with PROFILER.phase("render.ui"):
+            # The panel and the menu are not tracked; they are redrawn whole.
+            if PROFILER.show_panel:
+                PROFILER.draw(self.screen, (UI_PADDING, UI_PADDING + 3 * UI_LINE_HEIGHT))
+                renderer.invalidate()
+            if self.menu_active:
+                self._draw_menu_overlay()
+                renderer.invalidate()
+        with PROFILER.phase("render.flip"):
+            renderer.end_frame()
 
     def run(self):
-        """The main game loop."""
+        """
+        The main game loop.
+
+        Simulation and rendering are decoupled: every rendered frame runs a
+        variable number of fixed simulation steps (see _advance_simulation)
+        and then draws the scene interpolated between the last two steps.
+        """
+        self.clock.tick()
+        elapsed_seconds = 0.0
+        if self.stats_sink is None:
+            self.start_stats_log()
         try:
             while self.running:
-                self.process_events()
-                if not self.menu_active:
-                    self.update_state()
-                self.render()
-
-                if self.plotter.is_graph_showing:
-                    if not self.plotter.is_window_alive():
-                        self.plotter.close_graph_window()
-
-                self.clock.tick(self.settings["FPS"])
+                with PROFILER.phase("events"):
+                    self.process_events()
+                if self.menu_active:
+                    alpha = 1.0
+                    self.step_accumulator = 0.0
+                else:
+                    alpha = self._advance_simulation(elapsed_seconds)
+                self.render(alpha)
+
+                with PROFILER.phase("plotter"):
+                    if self.plotter and self.plotter.is_graph_showing:
+                        if not self.plotter.is_window_alive():
+                            self.plotter.close_graph_window()
+                PROFILER.end_frame()
+
+                elapsed_seconds = self.clock.tick(DISPLAY_FPS) / 1000.0
         except pygame.error as e:
             print(f"A Pygame error occurred during the game loop: {e}")
             traceback.print_exc()
@@ -611,13 +1050,230 @@ class Game:
             traceback.print_exc()
             self.running = False
         finally:
+            self._close_stats_log()
             if self.plotter:  # Check if plotter was initialized
-                self._save_graph_data_to_csv()  # Save data before closing plotter
-                self.plotter.close_graph_window()  # This will also stop the thread
-                print("Matplotlib graph resources cleaned up.")
+                self.plotter.shutdown()  # Closes the window and stops the thread
+                print("Graph resources cleaned up.")
+            if self.checkpointer:
+                self.checkpointer.close(self)
+            if hasattr(self.flock_engine, "close"):
+                self.flock_engine.close()  # Stops the domain worker processes
+            if self.bird_updater:
+                self.bird_updater.close()
+            PROFILER.stop_export()
             pygame.quit()
 
+    def run_headless(self, max_frames=None, save_stats=True):
+        """
+        Runs the simulation without rendering, as fast as the CPU allows.
+
+        The loop stops after max_frames frames or when every bird has died,
+        whichever comes first. The statistics are streamed to a file while
+        the run goes on, just like in run().
+
+        Args:
+            max_frames (int, optional): Number of frames to simulate. Defaults to
+                                        None, which runs until extinction.
+            save_stats (bool, optional): Whether to open a statistics file if
+                                         none was started with start_stats_log().
+                                         Defaults to True.
+
+        Returns:
+            dict: The number of simulated frames, the elapsed wall-clock seconds,
+                  the simulated frames per second and the final bird count.
+        """
+        if save_stats and self.stats_sink is None:
+            self.start_stats_log()
+        frames = 0
+        start_time = time.perf_counter()
+        try:
+            while self.birds_group and (max_frames is None or frames < max_frames):
+                self.update_state()
+                PROFILER.end_frame()
+                frames += 1
+        finally:
+            elapsed = time.perf_counter() - start_time
+            self._close_stats_log()
+            if self.checkpointer:
+                self.checkpointer.close(self)
+            if hasattr(self.flock_engine, "close"):
+                self.flock_engine.close()  # Stops the domain worker processes
+            if self.bird_updater:
+                self.bird_updater.close()
+            PROFILER.stop_export()
+            pygame.quit()
+
+        sim_fps = frames / elapsed if elapsed > 0 else 0.0
+        bird_count = len(self.birds_group)
+        print(
+            f"Simulated {frames} frames in {elapsed:.2f}s "
+            f"({sim_fps:.1f} frames/s), {bird_count} birds remaining."
+        )
+        for kind, pool in ENTITY_POOLS.items():
+            pool_stats = pool.stats()
+            print(
+                f"{kind} pool: {pool_stats['hit_rate']:.0%} reused, "
+                f"{pool_stats['misses']} created, "
+                f"{pool_stats['high_water']} in use at most"
+            )
+        return {
+            "frames": frames,
+            "elapsed_seconds": elapsed,
+            "sim_fps": sim_fps,
+            "bird_count": bird_count,
+        }
+
+
+def parse_args():
+    """Parses the command-line options."""
+    parser = argparse.ArgumentParser(description="Genetic Swarm Simulation")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run without a window, as fast as possible",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=None,
+        help="number of frames to simulate in headless mode (default: until extinction)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="seed of the random stream (default: a random seed, printed at start)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="write the time spent in every frame phase to FILE (CSV)",
+    )
+    parser.add_argument(
+        "--graph-backend",
+        choices=("matplotlib", "native"),
+        default=GRAPH_BACKEND,
+        help=f"how the statistics graph is shown (default: {GRAPH_BACKEND})",
+    )
+    parser.add_argument(
+        "--dirty-rects",
+        action=argparse.BooleanOptionalAction,
+        default=DIRTY_RECT_RENDERING,
+        help="redraw and update only the parts of the window that changed "
+        f"(default: {'on' if DIRTY_RECT_RENDERING else 'off'})",
+    )
+    parser.add_argument(
+        "--stats-format",
+        choices=("csv", "binary"),
+        default=STATS_FILE_FORMAT,
+        help=f"format of the streamed statistics file (default: {STATS_FILE_FORMAT})",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="FILE",
+        help="save the full world state to FILE periodically and on exit",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=CHECKPOINT_INTERVAL_FRAMES,
+        metavar="FRAMES",
+        help=f"frames between checkpoints (default: {CHECKPOINT_INTERVAL_FRAMES})",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="FILE",
+        help="continue the run saved in the checkpoint FILE",
+    )
+    parser.add_argument(
+        "--domain-workers",
+        type=int,
+        default=None,
+        metavar="N",
+        help="steer the flock in N worker processes, one strip of the world each "
+        f"(default: {DOMAIN_WORKERS}, 0 disables the worker processes)",
+    )
+    parser.add_argument(
+        "--update-threads",
+        type=int,
+        default=None,
+        metavar="N",
+        help="update the birds in two phases, steering them in N threads "
+        f"(default: {PARALLEL_UPDATE_THREADS}, 0 updates them one after the other)",
+    )
+    replay_options = parser.add_mutually_exclusive_group()
+    replay_options.add_argument(
+        "--record-replay",
+        metavar="FILE",
+        help="save the seed, settings and per-frame state checksums to FILE",
+    )
+    replay_options.add_argument(
+        "--verify-replay",
+        metavar="FILE",
+        help="rerun the recording in FILE and check that every frame is identical",
+    )
+    args = parser.parse_args()
+    if args.update_threads and (args.domain_workers or USE_FLOCK_ENGINE):
+        parser.error(
+            "--update-threads only applies to the per-bird update, not to the "
+            "flock engine used with --domain-workers or USE_FLOCK_ENGINE"
+        )
+    return args
+
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    args = parse_args()
+    verifier = ReplayVerifier(args.verify_replay) if args.verify_replay else None
+    cli_overrides = {}
+    if args.domain_workers is not None:
+        cli_overrides["DOMAIN_WORKERS"] = args.domain_workers
+    if args.update_threads is not None:
+        cli_overrides["PARALLEL_UPDATE_THREADS"] = args.update_threads
+    if args.resume:
+        checkpoint_header, checkpoint_arrays = read_checkpoint(args.resume)
+        game = Game(
+            headless=args.headless,
+            settings_overrides={**checkpoint_header["settings"], **cli_overrides},
+            seed=checkpoint_header["seed"],
+            graph_backend=args.graph_backend,
+            dirty_rects=args.dirty_rects,
+        )
+        restore_checkpoint(game, checkpoint_header, checkpoint_arrays)
+        print(f"Resumed from {args.resume} at frame {game.frame_number}")
+    elif verifier:
+        game = Game(
+            headless=args.headless,
+            settings_overrides={**verifier.settings, **cli_overrides},
+            seed=verifier.seed,
+            graph_backend=args.graph_backend,
+            dirty_rects=args.dirty_rects,
+        )
+    else:
+        game = Game(
+            headless=args.headless,
+            seed=args.seed,
+            settings_overrides=cli_overrides,
+            graph_backend=args.graph_backend,
+            dirty_rects=args.dirty_rects,
+        )
+    if verifier:
+        game.replay = verifier
+    elif args.record_replay:
+        game.replay = ReplayRecorder(game.seed, game.settings)
+    if args.checkpoint:
+        game.checkpointer = CheckpointWriter(args.checkpoint, args.checkpoint_every)
+    print(f"Random seed: {game.seed}")
+    if args.profile:
+        PROFILER.start_export(args.profile)
+    game.start_stats_log(stats_format=args.stats_format)
+    if args.headless:
+        frames = args.frames
+        if verifier and frames is None:
+            frames = verifier.frames_remaining(game)
+        game.run_headless(frames)
+    else:
+        game.run()
+    if args.record_replay:
+        game.replay.save(args.record_replay)
+    if verifier and not verifier.report():
+        raise SystemExit(1)
@@ -0,0 +1,232 @@
+from collections import deque
+
+import pygame
+
+from env import GRAPH_PANEL_WIDTH, GRAPH_PANEL_HEIGHT, GRAPH_PANEL_STEP_PIXELS
+
+PANEL_BACKGROUND_COLOR = (255, 255, 255)
+PANEL_TEXT_COLOR = (0, 0, 0)
+PANEL_ALPHA = 220
+PANEL_PADDING = 6
+PANEL_FONT_SIZE = 18
+# The Matplotlib colors of GamePlotter's series.
+SERIES_COLORS = [
+    (0, 0, 255),
+    (0, 128, 0),
+    (255, 0, 0),
+    (128, 0, 128),
+    (255, 165, 0),
+    (165, 42, 42),
+]
+SERIES_LABELS = ["Coh", "Ali", "Sep", "Avo", "Food", "Dist"]
+SCALE_MARGIN = 0.1  # Fraction of the value range added above and below on rescale
+
+
+class NativeStatsChart:
+    """
+    Scrolling chart of the logged statistics, drawn straight into the game window.
+
+    A drop-in alternative to GamePlotter without Matplotlib, Qt or a worker
+    thread: draw() runs on the main loop, reads the points logged since the
+    last frame from the shared ring buffer, scrolls the existing pixels left
+    and draws only the new line segments. The whole plot is only redrawn when
+    it is opened or a value leaves the current vertical scale.
+    """
+
+    def __init__(
+        self,
+        history,
+        width=GRAPH_PANEL_WIDTH,
+        height=GRAPH_PANEL_HEIGHT,
+        step=GRAPH_PANEL_STEP_PIXELS,
+    ):
+        """
+        Initializes a hidden chart.
+
+        Args:
+            history (PlotRingBuffer): The buffer the game appends its logged
+                                      data points to.
+            width (int, optional): Panel width in pixels. Defaults to
+                                   GRAPH_PANEL_WIDTH from ENV.py.
+            height (int, optional): Panel height in pixels. Defaults to
+                                    GRAPH_PANEL_HEIGHT from ENV.py.
+            step (int, optional): Horizontal pixels per data point. Defaults to
+                                  GRAPH_PANEL_STEP_PIXELS from ENV.py.
+        """
+        self.history = history
+        self.graph_data_keys = list(history.keys)
+        self.colors = list(SERIES_COLORS)
+        self.is_graph_showing = False
+        self.width = width
+        self.height = height
+        self.step = max(1, step)
+        self.font = None
+        self.header_surface = None
+        self.plot_surface = None
+        self.plot_rect = None
+        self.cursor = 0
+        self.points = deque()
+        self.y_min = 0.0
+        self.y_max = 1.0
+
+    def open_graph_window(self):
+        """Shows the chart, starting with the points still held by the history."""
+        if self.font is None:
+            self.font = pygame.font.Font(None, PANEL_FONT_SIZE)
+        header_height = self.font.get_linesize() * 2 + PANEL_PADDING
+        self.plot_rect = pygame.Rect(
+            PANEL_PADDING,
+            header_height,
+            self.width - 2 * PANEL_PADDING,
+            self.height - header_height - PANEL_PADDING,
+        )
+        self.plot_surface = pygame.Surface(self.plot_rect.size)
+        if pygame.display.get_surface() is not None:
+            # In the display's pixel format, so blitting needs no conversion.
+            self.plot_surface = self.plot_surface.convert()
+        self.points = deque(maxlen=self.plot_rect.width // self.step + 2)
+        self.cursor = max(0, self.history.total - self.points.maxlen)
+        self.is_graph_showing = True
+        self._read_new_points()
+        self._rescale()
+
+    def close_graph_window(self):
+        """Hides the chart."""
+        self.is_graph_showing = False
+        self.points = deque()
+
+    def shutdown(self):
+        """Hides the chart; there are no other resources to release."""
+        self.close_graph_window()
+
+    def is_window_alive(self):
+        """
+        Checks if the chart is shown.
+
+        Returns:
+            bool: True while the chart is shown.
+        """
+        return self.is_graph_showing
+
+    def toggle_graph_window(self):
+        """
+        Toggles the visibility of the chart (opens if closed, closes if open).
+        """
+        if self.is_graph_showing:
+            self.close_graph_window()
+        else:
+            self.open_graph_window()
+
+    def _read_new_points(self):
+        """
+        Appends the points logged since the last read to the visible points.
+
+        Returns:
+            int: The number of new points.
+        """
+        self.cursor, _time_steps, values, _dropped = self.history.read_since(
+            self.cursor
+        )
+        self.points.extend(values.tolist())
+        return len(values)
+
+    def _to_y(self, value):
+        """Converts a value to a pixel row of the plot surface."""
+        bottom = self.plot_rect.height - 1
+        return bottom - int((value - self.y_min) / (self.y_max - self.y_min) * bottom)
+
+    def _point_x(self, age):
+        """Returns the pixel column of the point logged `age` points before the newest."""
+        return self.plot_rect.width - 1 - age * self.step
+
+    def _rescale(self):
+        """Fits the vertical scale to the visible points and redraws the whole plot."""
+        if self.points:
+            low = min(min(row) for row in self.points)
+            high = max(max(row) for row in self.points)
+            margin = max(high - low, abs(high) * 0.01, 1e-6) * SCALE_MARGIN
+            self.y_min, self.y_max = low - margin, high + margin
+
+        self.header_surface = pygame.Surface((self.width, self.height))
+        if pygame.display.get_surface() is not None:
+            self.header_surface = self.header_surface.convert()
+        self.header_surface.fill(PANEL_BACKGROUND_COLOR)
+        self.header_surface.set_alpha(PANEL_ALPHA)
+        line_height = self.font.get_linesize()
+        title = self.font.render(
+            f"Avg traits  {self.y_min:.3f} - {self.y_max:.3f}", True, PANEL_TEXT_COLOR
+        )
+        self.header_surface.blit(title, (PANEL_PADDING, PANEL_PADDING // 2))
+        x = PANEL_PADDING
+        for label, color in zip(SERIES_LABELS, self.colors):
+            text = self.font.render(label, True, color)
+            self.header_surface.blit(text, (x, PANEL_PADDING // 2 + line_height))
+            x += text.get_width() + PANEL_PADDING
+
+        self.plot_surface.fill(PANEL_BACKGROUND_COLOR)
+        newest = len(self.points) - 1
+        if newest < 1:
+            return
+        for series, color in enumerate(self.colors):
+            pygame.draw.lines(
+                self.plot_surface,
+                color,
+                False,
+                [
+                    (self._point_x(newest - index), self._to_y(row[series]))
+                    for index, row in enumerate(self.points)
+                ],
+            )
+
+    def _scroll_in(self, count):
+        """Scrolls the plot left by count points and draws only their segments."""
+        shift = count * self.step
+        self.plot_surface.scroll(-shift, 0)
+        self.plot_surface.fill(
+            PANEL_BACKGROUND_COLOR,
+            (self.plot_rect.width - shift, 0, shift, self.plot_rect.height),
+        )
+        points = list(self.points)[-(count + 1) :]
+        if len(points) < 2:
+            return
+        newest = len(points) - 1
+        for series, color in enumerate(self.colors):
+            pygame.draw.lines(
+                self.plot_surface,
+                color,
+                False,
+                [
+                    (self._point_x(newest - index), self._to_y(row[series]))
+                    for index, row in enumerate(points)
+                ],
+            )
+
+    def draw(self, surface):
+        """
+        Brings the chart up to date and draws it in the bottom-right corner.
+
+        Args:
+            surface (pygame.Surface): The surface to draw the chart on.
+
+        Returns:
+            pygame.Rect: The region the chart covers, or None while it is hidden.
+        """
+        if not self.is_graph_showing:
+            return None
+        count = self._read_new_points()
+        if count:
+            new_points = list(self.points)[-count:]
+            out_of_scale = any(
+                min(row) < self.y_min or max(row) > self.y_max for row in new_points
+            )
+            if out_of_scale or count * self.step >= self.plot_rect.width:
+                self._rescale()
+            else:
+                self._scroll_in(count)
+        position = (
+            surface.get_width() - self.width - PANEL_PADDING,
+            surface.get_height() - self.height - PANEL_PADDING,
+        )
+        panel_rect = surface.blit(self.header_surface, position)
+        surface.blit(self.plot_surface, self.plot_rect.move(position))
+        return panel_rect
@@ -1,82 +1,89 @@
-import random
 import pygame
 
 from env import *
+from entity_pool import EntityPool
+from particles import TrailParticleSystem
+from rng import RNG
+from sprite_atlas import SPRITE_ATLAS
 
 
 class Obstacle(pygame.sprite.Sprite):
     """
     Represents a comet-like obstacle that moves across the screen.
     It has a distinct head and a trailing particle effect.
+
+    The image is the head image shared by every comet (see SPRITE_ATLAS) and
+    is not redrawn while the comet moves. A variant whose look changes, e.g.
+    a growing or color-cycling comet, assigns its own surface to head_image
+    and calls invalidate_visual(); the shared surface must not be drawn on.
     """
 
-    def __init__(self, speed_x=OBSTACLE_SPEED):
+    def __init__(self, speed_x=OBSTACLE_SPEED, trail_particles=None):
         """
         Initializes the obstacle.
 
         Args:
             speed_x (float, optional): The horizontal speed of the obstacle.
                                        Defaults to OBSTACLE_SPEED from ENV.py.
+            trail_particles (TrailParticleSystem, optional): The shared particle
+                                       system the trail is spawned into. Defaults
+                                       to a private system for this obstacle.
         """
         super().__init__()
-        self.speed_x = random.uniform(0.8, 1.2) * speed_x
-        self.head_image_orig = self._create_comet_head_surface()
-        self.head_image = self.head_image_orig.copy()
+        self.reset(speed_x, trail_particles)
+
+    def reset(self, speed_x=OBSTACLE_SPEED, trail_particles=None):
+        """
+        (Re)initializes the obstacle in place at the right edge of the screen,
+        e.g. when OBSTACLE_POOL reuses it. Takes the same arguments as the
+        constructor.
+        """
+        self.speed_x = RNG.uniform(0.8, 1.2) * speed_x
+        self.head_image = SPRITE_ATLAS.comet_head()  # Shared by every comet
         self.head_width = self.head_image.get_width()
         self.head_height = self.head_image.get_height()
 
-        self.trail_particles = []
+        # A private system is decayed here; a shared one by its owner (the Game).
+        self.owns_trail_particles = trail_particles is None
+        self.trail_particles = (
+            TrailParticleSystem() if self.owns_trail_particles else trail_particles
+        )
+        self.trail_owner = self.trail_particles.register_owner()
         self.frames_since_last_spawn = 0
 
         self.image_width = self.head_width  # Image is now just the head
         self.image_height = self.head_height
-        self.image = pygame.Surface(
-            (self.image_width, self.image_height), pygame.SRCALPHA
-        )
+        self.image = self.head_image
+        self.visual_dirty = False  # Set by invalidate_visual()
 
-        y_spawn = random.randint(0, SCREEN_HEIGHT - self.image_height)
+        y_spawn = RNG.randint(0, SCREEN_HEIGHT - self.image_height)
         self.rect = self.image.get_rect(topleft=(SCREEN_WIDTH, y_spawn))
         self.x: float = SCREEN_WIDTH
+        self.prev_x: float = self.x  # Position before the last move, for interpolation
         self.hitbox = pygame.Rect(
             0, 0, self.head_width, self.head_height
         )  # Hitbox relative to self.rect.topleft
 
-        self._redraw_comet_surface()
-
-    def _create_comet_head_surface(self):
+    def invalidate_visual(self):
         """
-        Creates the visual surface for the comet's head.
-
-        Returns:
-            pygame.Surface: A surface representing the comet's head with a glow and core.
+        Marks the obstacle's look as changed, e.g. after head_image was replaced.
+        The image, rect and hitbox are refreshed at the end of the next update().
         """
-        head_surface = pygame.Surface(
-            (COMET_HEAD_WIDTH, COMET_HEAD_HEIGHT), pygame.SRCALPHA
-        )
-        center_x = COMET_HEAD_WIDTH // 2
-        center_y = COMET_HEAD_HEIGHT // 2
-
-        pygame.draw.circle(
-            head_surface,
-            COMET_HEAD_GLOW_COLOR,
-            (center_x, center_y),
-            COMET_HEAD_WIDTH // 2,
-        )
-
-        core_radius = int(COMET_HEAD_WIDTH * 0.35)
-        pygame.draw.circle(
-            head_surface, COMET_HEAD_CORE_COLOR, (center_x, center_y), core_radius
-        )
-
-        return head_surface
+        self.visual_dirty = True
 
     def _redraw_comet_surface(self):
         """
-        Redraws the main image surface of the obstacle, typically just the head.
-        This is called when the obstacle's appearance might need to be updated.
+        Shows the current head image and fits the rect and hitbox to its size.
+        Called only after invalidate_visual(), not every frame.
         """
-        self.image.fill((0, 0, 0, 0))
-        self.image.blit(self.head_image, (0, 0))
+        self.head_width = self.head_image.get_width()
+        self.head_height = self.head_image.get_height()
+        self.image_width = self.head_width
+        self.image_height = self.head_height
+        self.image = self.head_image
+        self.rect.size = (self.image_width, self.image_height)
+        self.hitbox.size = (self.head_width, self.head_height)
+        self.visual_dirty = False
 
     def update(self):
         """
@@ -84,6 +91,7 @@ class Obstacle(pygame.sprite.Sprite):
         Moves the obstacle horizontally, updates particle decay, spawns new particles,
         and removes the obstacle if it moves off-screen.
         """
+        self.prev_x = self.x
         self.x -= self.speed_x
         self.rect.x = int(self.x)
 
@@ -93,53 +101,54 @@ class Obstacle(pygame.sprite.Sprite):
             self.kill()
             return
 
-        new_trail_particles = []
-        for particle in self.trail_particles:
-            # Particles use their own decay rates and do not move with the comet
-            particle["radius"] -= particle["radius_decay"]
-            particle["alpha"] -= particle["alpha_decay"]
-
-            if particle["radius"] > 0 and particle["alpha"] > 0:
-                new_trail_particles.append(particle)
-        self.trail_particles = new_trail_particles
+        # Shared trails are decayed all at once by TrailParticleSystem.update,
+        # which the Game runs before updating the obstacles.
+        if self.owns_trail_particles:
+            self.trail_particles.update()
 
         self.frames_since_last_spawn += 1
         if self.frames_since_last_spawn >= COMET_TRAIL_SPAWN_INTERVAL:
             self.frames_since_last_spawn = 0
-            if len(self.trail_particles) < COMET_TRAIL_MAX_PARTICLES:
+            if (
+                self.trail_particles.count_for(self.trail_owner)
+                < COMET_TRAIL_MAX_PARTICLES
+            ):
                 # Spawn particles at the right edge of the comet's head (world coordinates)
                 spawn_world_x = self.rect.right - (self.head_width * 0.2)
                 spawn_world_y = self.rect.centery
 
                 # Decide particle type
-                if random.random() < COMET_YELLOW_PARTICLE_SPAWN_CHANCE:
+                if RNG.random() < COMET_YELLOW_PARTICLE_SPAWN_CHANCE:
                     # Spawn a yellow particle
-                    self.trail_particles.append(
-                        {
-                            "world_pos": [
-                                spawn_world_x + random.uniform(-15, 15),
-                                spawn_world_y + random.uniform(-15, 15),
-                            ],  # Increased random distribution
-                            "radius": COMET_YELLOW_PARTICLE_INITIAL_RADIUS,
-                            "alpha": COMET_YELLOW_PARTICLE_INITIAL_ALPHA,
-                            "color": COMET_TRAIL_YELLOW_PARTICLE_COLOR,
-                            "radius_decay": COMET_YELLOW_PARTICLE_RADIUS_DECAY,
-                            "alpha_decay": COMET_YELLOW_PARTICLE_ALPHA_DECAY,
-                        }
+                    self.trail_particles.spawn(
+                        self.trail_owner,
+                        spawn_world_x + RNG.uniform(-15, 15),
+                        spawn_world_y + RNG.uniform(-15, 15),
+                        COMET_YELLOW_PARTICLE_INITIAL_RADIUS,
+                        COMET_YELLOW_PARTICLE_INITIAL_ALPHA,
+                        COMET_TRAIL_YELLOW_PARTICLE_COLOR,
+                        COMET_YELLOW_PARTICLE_RADIUS_DECAY,
+                        COMET_YELLOW_PARTICLE_ALPHA_DECAY,
                     )
                 else:
                     # Spawn a standard red/orange particle
-                    self.trail_particles.append(
-                        {
-                            "world_pos": [spawn_world_x, spawn_world_y],
-                            "radius": COMET_PARTICLE_INITIAL_RADIUS,
-                            "alpha": COMET_PARTICLE_INITIAL_ALPHA,
-                            "color": COMET_TRAIL_PARTICLE_COLOR,
-                            "radius_decay": COMET_PARTICLE_RADIUS_DECAY,
-                            "alpha_decay": COMET_PARTICLE_ALPHA_DECAY,
-                        }
+                    self.trail_particles.spawn(
+                        self.trail_owner,
+                        spawn_world_x,
+                        spawn_world_y,
+                        COMET_PARTICLE_INITIAL_RADIUS,
+                        COMET_PARTICLE_INITIAL_ALPHA,
+                        COMET_TRAIL_PARTICLE_COLOR,
+                        COMET_PARTICLE_RADIUS_DECAY,
+                        COMET_PARTICLE_ALPHA_DECAY,
                     )
-        self._redraw_comet_surface()
+        if self.visual_dirty:
+            self._redraw_comet_surface()
+
+    def kill(self):
+        """Removes the obstacle from all groups and releases its trail particles."""
+        self.trail_particles.release(self.trail_owner)
+        super().kill()
 
     def draw_trail_particles(self, surface):
         """
@@ -148,15 +157,8 @@ class Obstacle(pygame.sprite.Sprite):
         Args:
             surface (pygame.Surface): The surface to draw the particles on.
         """
-        for particle in self.trail_particles:
-            pos_x, pos_y = particle["world_pos"]
-            radius = particle["radius"]
-            alpha = particle["alpha"]
-            color = particle["color"]
-
-            if radius > 0 and alpha > 0:  # Ensure it's visible
-                temp_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-                pygame.draw.circle(
-                    temp_surface, (*color, int(alpha)), (radius, radius), radius
-                )
-                surface.blit(temp_surface, (pos_x - radius, pos_y - radius))
+        self.trail_particles.draw(surface, owner=self.trail_owner)
+
+
+# Comets that left the screen, reused for new ones.
+OBSTACLE_POOL = EntityPool(Obstacle)
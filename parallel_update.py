@@ -0,0 +1,228 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from env import (
+    GLOBAL_SPEED_FACTOR,
+    NUM_FLOCK_NEIGHBORS,
+    PARALLEL_UPDATE_CHUNK_SIZE,
+    PARALLEL_UPDATE_THREADS,
+)
+from flock_engine import (
+    FIELD_ATTRIBUTES,
+    X,
+    Y,
+    SPEED_X,
+    SPEED_Y,
+    AVOIDANCE,
+    FOOD_ATTRACTION,
+    AVOIDANCE_DISTANCE,
+    apply_new_velocity,
+    flocking_velocities,
+    food_positions,
+    food_velocities,
+    obstacle_arrays,
+    obstacle_avoidance_forces,
+)
+from profiler import PROFILER
+from spatial_grid import k_nearest_indices
+
+
+def plan_velocities(state, rects, rows, neighbors, obstacles, food, speed_factor):
+    """
+    Computes the velocities Bird.update steers some birds to, from the state
+    all birds had at the start of the frame.
+
+    Obstacle avoidance, flocking and food seeking are applied in the order of
+    Bird.update with the batched kernels of flock_engine. A bird's own
+    velocity carries over from one phase to the next, while its neighbors
+    are seen with their velocities from the start of the frame.
+
+    Args:
+        state (numpy.ndarray): A (NUM_FIELDS, n) array of all birds, laid out
+                               like FlockEngine.state. It is not changed.
+        rects (numpy.ndarray): A (3, n) array of the left, right and center y
+                               of every bird rect.
+        rows (slice): The birds to steer.
+        neighbors (numpy.ndarray): A (len(rows), k) array of each steered bird's
+                                   neighbors, closest first.
+        obstacles (dict or None): The obstacle arrays from obstacle_arrays.
+        food (tuple or None): The x and y coordinates of every food item, or
+                              None if there is no food.
+        speed_factor (float): The global speed factor applied to bird velocities.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The new speed_x and speed_y per bird.
+    """
+    speed_x = state[SPEED_X, rows].copy()
+    speed_y = state[SPEED_Y, rows].copy()
+    if obstacles is not None:
+        force_x, force_y = obstacle_avoidance_forces(
+            {
+                "x": state[X, rows],
+                "y": state[Y, rows],
+                "speed_x": speed_x,
+                "speed_y": speed_y,
+                "rect_left": rects[0, rows],
+                "rect_right": rects[1, rows],
+                "rect_centery": rects[2, rows],
+                "avoidance_distance": state[AVOIDANCE_DISTANCE, rows],
+                "width": obstacles["bird_width"],
+                "height": obstacles["bird_height"],
+            },
+            obstacles,
+            speed_factor,
+        )
+        steer = (force_x != 0) | (force_y != 0)
+        if steer.any():
+            speed_x[steer], speed_y[steer] = apply_new_velocity(
+                speed_x[steer],
+                speed_y[steer],
+                force_x[steer],
+                force_y[steer],
+                state[AVOIDANCE, rows][steer],
+            )
+    if neighbors.shape[1] > 0:
+        speed_x, speed_y = flocking_velocities(
+            state, rows, neighbors, speed_x, speed_y
+        )
+    if food is not None:
+        speed_x, speed_y = food_velocities(
+            state[X, rows],
+            state[Y, rows],
+            speed_x,
+            speed_y,
+            state[FOOD_ATTRACTION, rows],
+            *food,
+        )
+    return speed_x, speed_y
+
+
+class ParallelBirdUpdater:
+    """
+    Updates the birds in two phases, steering them in a thread pool.
+
+    Bird.update steers and moves one bird after the other, so every bird
+    sees the new velocities and positions of the birds updated before it.
+    Here the state of all birds is first copied into arrays, and their new
+    velocities are computed from it (read phase): the nearest neighbors of
+    all birds in one vectorized search, then obstacle avoidance, flocking
+    and food seeking with the batched kernels of flock_engine, in chunks of
+    birds spread over a ThreadPoolExecutor. Then the velocities are applied
+    and the birds are animated and moved, in group order (write phase). The
+    result depends neither on the order of the birds nor on the number of
+    threads.
+
+    NumPy releases the GIL inside its array loops, so the chunks are steered
+    at the same time on several cores also on a regular CPython build.
+    """
+
+    def __init__(
+        self,
+        threads=PARALLEL_UPDATE_THREADS,
+        chunk_size=PARALLEL_UPDATE_CHUNK_SIZE,
+        settings=None,
+    ):
+        """
+        Initializes the updater. The thread pool starts with the first update.
+
+        Args:
+            threads (int, optional): Number of threads steering the birds; 1 runs
+                                     both phases in the calling thread. Defaults to
+                                     PARALLEL_UPDATE_THREADS from ENV.py.
+            chunk_size (int, optional): Birds steered per task. Defaults to
+                                        PARALLEL_UPDATE_CHUNK_SIZE from ENV.py.
+            settings (dict, optional): The game settings (GLOBAL_SPEED_FACTOR,
+                                       NUM_FLOCK_NEIGHBORS). Defaults to None, in
+                                       which case the ENV.py defaults are used.
+        """
+        self.threads = max(1, int(threads))
+        self.chunk_size = max(1, int(chunk_size))
+        self.settings = settings
+        self.executor = None
+
+    def _setting(self, key, default):
+        """Returns a value from the settings, falling back to the ENV.py default."""
+        if self.settings and key in self.settings:
+            return self.settings[key]
+        return default
+
+    def close(self):
+        """Stops the thread pool."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def update(self, birds_group, obstacles, food_group):
+        """
+        Updates every bird for the current frame, like calling Bird.update on
+        each one but from the state all birds had at the start of the frame.
+
+        Args:
+            birds_group (pygame.sprite.Group): The group containing all bird sprites.
+            obstacles (pygame.sprite.Group): The group containing all obstacle sprites.
+            food_group (pygame.sprite.Group): The group containing all food sprites.
+        """
+        birds = birds_group.sprites()
+        if not birds:
+            return
+
+        with PROFILER.phase("parallel.gather"):
+            state = np.array(
+                [[getattr(bird, name) for name in FIELD_ATTRIBUTES] for bird in birds],
+                dtype=float,
+            ).T
+            rects = np.array(
+                [
+                    (bird.rect.left, bird.rect.right, bird.rect.centery)
+                    for bird in birds
+                ],
+                dtype=float,
+            ).T
+            ids = np.fromiter(
+                (bird.serial for bird in birds), dtype=np.int64, count=len(birds)
+            )
+            obstacles = obstacle_arrays(obstacles)
+            if obstacles is not None:
+                obstacles["bird_width"] = birds[0].bird_width
+                obstacles["bird_height"] = birds[0].bird_height
+            food = food_positions(food_group) if food_group else None
+            speed_factor = self._setting("GLOBAL_SPEED_FACTOR", GLOBAL_SPEED_FACTOR)
+
+        with PROFILER.phase("parallel.neighbors"):
+            neighbors = k_nearest_indices(
+                state[X],
+                state[Y],
+                ids,
+                self._setting("NUM_FLOCK_NEIGHBORS", NUM_FLOCK_NEIGHBORS),
+            )
+
+        chunks = [
+            slice(start, start + self.chunk_size)
+            for start in range(0, len(birds), self.chunk_size)
+        ]
+
+        def plan_chunk(rows):
+            return plan_velocities(
+                state, rects, rows, neighbors[rows], obstacles, food, speed_factor
+            )
+
+        with PROFILER.phase("parallel.plan"):
+            if self.threads == 1 or len(chunks) <= 1:
+                planned = [plan_chunk(rows) for rows in chunks]
+            else:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(
+                        max_workers=self.threads, thread_name_prefix="bird-update"
+                    )
+                planned = list(self.executor.map(plan_chunk, chunks))
+
+        with PROFILER.phase("parallel.apply"):
+            speed_x = np.concatenate([velocities[0] for velocities in planned])
+            speed_y = np.concatenate([velocities[1] for velocities in planned])
+            for bird, new_speed_x, new_speed_y in zip(
+                birds, speed_x.tolist(), speed_y.tolist()
+            ):
+                bird.speed_x = new_speed_x
+                bird.speed_y = new_speed_y
+                bird.advance()
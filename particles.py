@@ -0,0 +1,291 @@
+import numpy as np
+import pygame
+
+from env import (
+    TRAIL_PARTICLE_INITIAL_CAPACITY,
+    TRAIL_PARTICLE_ALPHA_BUCKETS,
+    TRAIL_DIRTY_RECT_CELL_SIZE,
+)
+
+# Row layout of TrailParticleSystem.state. Each row is one contiguous per-particle array.
+X, Y, RADIUS, ALPHA, RADIUS_DECAY, ALPHA_DECAY = 0, 1, 2, 3, 4, 5
+NUM_FIELDS = 6
+
+
+class TrailParticleSystem:
+    """
+    One pooled, array-backed particle system shared by every comet trail.
+
+    Particles live in the columns of a (NUM_FIELDS, capacity) array, together
+    with the id of the comet that spawned them and an index into a color
+    palette. Decay and removal of faded particles are single vectorized passes
+    over all trails, and particles are drawn from a cache of pre-rendered
+    circle sprites keyed by color, radius and alpha bucket instead of
+    allocating a Surface per particle.
+    """
+
+    def __init__(
+        self,
+        capacity=TRAIL_PARTICLE_INITIAL_CAPACITY,
+        alpha_buckets=TRAIL_PARTICLE_ALPHA_BUCKETS,
+    ):
+        """
+        Initializes an empty particle system.
+
+        Args:
+            capacity (int, optional): Initial number of particle slots; the
+                                      arrays double when full. Defaults to
+                                      TRAIL_PARTICLE_INITIAL_CAPACITY from ENV.py.
+            alpha_buckets (int, optional): Number of alpha levels the sprite
+                                           cache renders. Defaults to
+                                           TRAIL_PARTICLE_ALPHA_BUCKETS from ENV.py.
+        """
+        capacity = max(1, capacity)
+        self.state = np.zeros((NUM_FIELDS, capacity))
+        self.owners = np.zeros(capacity, dtype=np.int64)
+        self.color_indices = np.zeros(capacity, dtype=np.int32)
+        self.count = 0
+        self.colors = []
+        self.color_index_of = {}
+        self.owner_counts = {}
+        self.next_owner_id = 0
+        self.alpha_buckets = alpha_buckets
+        self.sprite_cache = {}
+
+    def __len__(self):
+        return self.count
+
+    def register_owner(self):
+        """
+        Hands out an id under which an emitter spawns its particles.
+
+        Returns:
+            int: A new owner id.
+        """
+        owner = self.next_owner_id
+        self.next_owner_id += 1
+        return owner
+
+    def count_for(self, owner):
+        """Returns the number of live particles spawned by owner."""
+        return self.owner_counts.get(owner, 0)
+
+    def spawn(self, owner, x, y, radius, alpha, color, radius_decay, alpha_decay):
+        """
+        Adds one particle.
+
+        Args:
+            owner (int): The id of the emitter, from register_owner.
+            x (float): The world x-coordinate.
+            y (float): The world y-coordinate.
+            radius (float): The initial radius.
+            alpha (float): The initial alpha (0-255).
+            color (tuple): The RGB color.
+            radius_decay (float): Radius lost per frame.
+            alpha_decay (float): Alpha lost per frame.
+        """
+        if self.count == self.state.shape[1]:
+            self._grow()
+        color_index = self.color_index_of.get(color)
+        if color_index is None:
+            color_index = len(self.colors)
+            self.colors.append(tuple(color))
+            self.color_index_of[color] = color_index
+
+        i = self.count
+        self.state[:, i] = (x, y, radius, alpha, radius_decay, alpha_decay)
+        self.owners[i] = owner
+        self.color_indices[i] = color_index
+        self.count += 1
+        self.owner_counts[owner] = self.owner_counts.get(owner, 0) + 1
+
+    def _grow(self):
+        """Doubles the capacity of every particle array."""
+        capacity = self.state.shape[1] * 2
+        state = np.zeros((NUM_FIELDS, capacity))
+        state[:, : self.count] = self.state[:, : self.count]
+        self.state = state
+        self.owners = np.resize(self.owners, capacity)
+        self.color_indices = np.resize(self.color_indices, capacity)
+
+    def _keep(self, mask):
+        """
+        Compacts the live particles so only those where mask is True remain.
+
+        Args:
+            mask (np.ndarray): Boolean array over the live particles.
+        """
+        kept = int(np.count_nonzero(mask))
+        if kept == self.count:
+            return
+        n = self.count
+        self.state[:, :kept] = self.state[:, :n][:, mask]
+        self.owners[:kept] = self.owners[:n][mask]
+        self.color_indices[:kept] = self.color_indices[:n][mask]
+        self.count = kept
+        owners, counts = np.unique(self.owners[:kept], return_counts=True)
+        self.owner_counts = dict(zip(owners.tolist(), counts.tolist()))
+
+    def update(self):
+        """Decays every particle by one frame and removes the ones that faded out."""
+        n = self.count
+        if n == 0:
+            return
+        state = self.state[:, :n]
+        state[RADIUS] -= state[RADIUS_DECAY]
+        state[ALPHA] -= state[ALPHA_DECAY]
+        self._keep((state[RADIUS] > 0) & (state[ALPHA] > 0))
+
+    def release(self, owner):
+        """
+        Removes every particle spawned by owner, e.g. when its comet leaves the screen.
+
+        Args:
+            owner (int): The id of the emitter.
+        """
+        if self.owner_counts.pop(owner, 0):
+            self._keep(self.owners[: self.count] != owner)
+
+    def clear(self):
+        """Removes all particles."""
+        self.count = 0
+        self.owner_counts = {}
+
+    def snapshot(self):
+        """
+        Returns copies of the live particle arrays and the bookkeeping needed to
+        rebuild the system with restore().
+
+        Returns:
+            tuple[dict, dict]: The arrays (state, owners, color indices) and the
+                               palette and next owner id.
+        """
+        n = self.count
+        arrays = {
+            "state": self.state[:, :n].copy(),
+            "owners": self.owners[:n].copy(),
+            "color_indices": self.color_indices[:n].copy(),
+        }
+        info = {
+            "colors": [list(color) for color in self.colors],
+            "next_owner_id": self.next_owner_id,
+        }
+        return arrays, info
+
+    def restore(self, arrays, info):
+        """
+        Replaces all particles with a snapshot taken by snapshot().
+
+        Args:
+            arrays (dict): The arrays returned by snapshot().
+            info (dict): The bookkeeping returned by snapshot().
+        """
+        n = arrays["state"].shape[1]
+        capacity = max(self.state.shape[1], n)
+        self.state = np.zeros((NUM_FIELDS, capacity))
+        self.state[:, :n] = arrays["state"]
+        self.owners = np.zeros(capacity, dtype=np.int64)
+        self.owners[:n] = arrays["owners"]
+        self.color_indices = np.zeros(capacity, dtype=np.int32)
+        self.color_indices[:n] = arrays["color_indices"]
+        self.count = n
+        self.colors = [tuple(color) for color in info["colors"]]
+        self.color_index_of = {color: index for index, color in enumerate(self.colors)}
+        self.next_owner_id = info["next_owner_id"]
+        self.sprite_cache = {}
+        owners, counts = np.unique(self.owners[:n], return_counts=True)
+        self.owner_counts = dict(zip(owners.tolist(), counts.tolist()))
+
+    def _sprite(self, color_index, radius, alpha_bucket):
+        """
+        Returns the cached circle sprite for a color, radius and alpha bucket,
+        rendering it on first use.
+        """
+        key = (color_index, radius, alpha_bucket)
+        sprite = self.sprite_cache.get(key)
+        if sprite is None:
+            alpha = min(255, alpha_bucket * 256 // self.alpha_buckets)
+            sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(
+                sprite, (*self.colors[color_index], alpha), (radius, radius), radius
+            )
+            self.sprite_cache[key] = sprite
+        return sprite
+
+    def bounding_rects(self, cell_size=TRAIL_DIRTY_RECT_CELL_SIZE):
+        """
+        Returns rectangles that together enclose every particle as draw() places
+        it, e.g. to update only the screen regions the trails cover. Particles
+        are grouped by the grid cell their center lies in, so a long diagonal
+        trail yields a row of small rectangles rather than one large one.
+
+        Args:
+            cell_size (int, optional): Grid cell size in pixels. Defaults to
+                                       TRAIL_DIRTY_RECT_CELL_SIZE from ENV.py.
+
+        Returns:
+            list[pygame.Rect]: One rectangle per occupied cell, in surface
+                               coordinates.
+        """
+        n = self.count
+        if n == 0:
+            return []
+        state = self.state[:, :n]
+        radii = np.maximum(state[RADIUS].astype(np.int64), 1)
+        left = (state[X] - radii).astype(np.int64)
+        top = (state[Y] - radii).astype(np.int64)
+        cells = (left + radii) // cell_size * 2**32 + (top + radii) // cell_size
+        order = np.argsort(cells)
+        cells = cells[order]
+        starts = np.flatnonzero(np.concatenate(([True], cells[1:] != cells[:-1])))
+        left, top, size = left[order], top[order], 2 * radii[order]
+        lefts = np.minimum.reduceat(left, starts)
+        tops = np.minimum.reduceat(top, starts)
+        rights = np.maximum.reduceat(left + size, starts)
+        bottoms = np.maximum.reduceat(top + size, starts)
+        return [
+            pygame.Rect(x, y, right - x, bottom - y)
+            for x, y, right, bottom in zip(
+                lefts.tolist(), tops.tolist(), rights.tolist(), bottoms.tolist()
+            )
+        ]
+
+    def draw(self, surface, owner=None):
+        """
+        Draws the particles onto the given surface.
+
+        Args:
+            surface (pygame.Surface): The surface to draw the particles on.
+            owner (int, optional): Draw only the particles of this emitter.
+                                   Defaults to all particles.
+        """
+        n = self.count
+        if n == 0:
+            return
+        state = self.state[:, :n]
+        radii = np.maximum(state[RADIUS].astype(np.int64), 1)
+        alpha_buckets = np.minimum(
+            (state[ALPHA] * self.alpha_buckets / 256).astype(np.int64),
+            self.alpha_buckets - 1,
+        )
+        left = (state[X] - radii).astype(np.int64)
+        top = (state[Y] - radii).astype(np.int64)
+        color_indices = self.color_indices[:n]
+        if owner is not None:
+            mine = self.owners[:n] == owner
+            radii, alpha_buckets = radii[mine], alpha_buckets[mine]
+            left, top, color_indices = left[mine], top[mine], color_indices[mine]
+
+        surface.blits(
+            [
+                (self._sprite(color_index, radius, bucket), (x, y))
+                for color_index, radius, bucket, x, y in zip(
+                    color_indices.tolist(),
+                    radii.tolist(),
+                    alpha_buckets.tolist(),
+                    left.tolist(),
+                    top.tolist(),
+                )
+            ],
+            doreturn=False,
+        )
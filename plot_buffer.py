@@ -0,0 +1,215 @@
+import copy
+import threading
+
+import numpy as np
+
+from env import GRAPH_DOWNSAMPLE_BUCKETS
+
+
+class PlotRingBuffer:
+    """
+    Fixed-capacity ring of logged data points, shared by the game thread and a reader.
+
+    The game thread appends one point per log in constant time. Readers keep
+    a cursor (the number of points they have seen) and fetch only the points
+    appended since, so nothing is copied that a reader already has. A reader
+    that falls more than `capacity` points behind loses the oldest ones.
+    """
+
+    def __init__(self, capacity, keys):
+        """
+        Initializes an empty buffer.
+
+        Args:
+            capacity (int): Number of most recent points that are kept.
+            keys (list[str]): Names of the data series, one value each per point.
+        """
+        self.capacity = max(1, capacity)
+        self.keys = list(keys)
+        self.time_steps = np.zeros(self.capacity, dtype=np.int64)
+        self.values = np.zeros((self.capacity, len(self.keys)))
+        self.total = 0  # Points appended since the buffer was created or restored
+        self.new_data = threading.Condition()
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, time_step, values):
+        """
+        Adds one point and wakes up any waiting reader.
+
+        Args:
+            time_step (int): The x value of the point.
+            values (list[float]): One value per series, in the order of keys.
+        """
+        with self.new_data:
+            index = self.total % self.capacity
+            self.time_steps[index] = time_step
+            self.values[index] = values
+            self.total += 1
+            self.new_data.notify_all()
+
+    def read_since(self, cursor):
+        """
+        Copies the points appended after a reader's cursor.
+
+        Args:
+            cursor (int): The number of points the reader has already seen.
+
+        Returns:
+            tuple: The new cursor, the time steps (n,), the values (n, len(keys))
+                   and the number of points that were overwritten before they
+                   could be read.
+        """
+        with self.new_data:
+            start = max(cursor, self.total - self.capacity)
+            indices = np.arange(start, self.total) % self.capacity
+            return (
+                self.total,
+                self.time_steps[indices],
+                self.values[indices],
+                start - cursor,
+            )
+
+    def wait_for_data(self, cursor, timeout):
+        """
+        Blocks until points newer than the cursor exist or the timeout expires.
+
+        Returns:
+            bool: True if there are new points.
+        """
+        with self.new_data:
+            return self.new_data.wait_for(lambda: self.total > cursor, timeout)
+
+    def restore(self, time_steps, values):
+        """
+        Replaces the contents with previously saved points, e.g. from a checkpoint.
+
+        Args:
+            time_steps (numpy.ndarray): The time steps, oldest first.
+            values (numpy.ndarray): The (n, len(keys)) values.
+        """
+        with self.new_data:
+            self.total = 0
+        for time_step, row in zip(time_steps.tolist(), values):
+            self.append(time_step, row)
+
+
+class MinMaxMeanDownsampler:
+    """
+    Summarizes an unbounded series of points in a fixed number of buckets.
+
+    Each bucket covers `span` consecutive points and stores their first and
+    last time step and the minimum, maximum and sum of every series. When all
+    buckets are full, neighbouring pairs are merged and the span doubles, so
+    the whole history always fits into at most `num_buckets` buckets and
+    adding a point costs amortized constant time.
+    """
+
+    def __init__(self, num_series, num_buckets=GRAPH_DOWNSAMPLE_BUCKETS):
+        """
+        Initializes an empty summary.
+
+        Args:
+            num_series (int): Number of values per point.
+            num_buckets (int, optional): Maximum number of buckets; rounded up
+                                         to an even number. Defaults to
+                                         GRAPH_DOWNSAMPLE_BUCKETS from ENV.py.
+        """
+        self.num_buckets = max(2, num_buckets + num_buckets % 2)
+        self.first_time_steps = np.zeros(self.num_buckets)
+        self.last_time_steps = np.zeros(self.num_buckets)
+        self.mins = np.zeros((self.num_buckets, num_series))
+        self.maxs = np.zeros((self.num_buckets, num_series))
+        self.sums = np.zeros((self.num_buckets, num_series))
+        self.counts = np.zeros(self.num_buckets, dtype=np.int64)
+        self.span = 1
+        self.used = 0  # Buckets holding at least one point
+
+    def add(self, time_steps, values):
+        """
+        Adds points to the summary.
+
+        Args:
+            time_steps (numpy.ndarray): The time steps of the points (n,).
+            values (numpy.ndarray): Their values (n, num_series).
+        """
+        for time_step, row in zip(time_steps.tolist(), values):
+            if self.used == 0 or self.counts[self.used - 1] == self.span:
+                if self.used == self.num_buckets:
+                    self._merge_pairs()
+                bucket = self.used
+                self.used += 1
+                self.first_time_steps[bucket] = time_step
+                self.mins[bucket] = row
+                self.maxs[bucket] = row
+                self.sums[bucket] = 0.0
+                self.counts[bucket] = 0
+            else:
+                bucket = self.used - 1
+                np.minimum(self.mins[bucket], row, out=self.mins[bucket])
+                np.maximum(self.maxs[bucket], row, out=self.maxs[bucket])
+            self.last_time_steps[bucket] = time_step
+            self.sums[bucket] += row
+            self.counts[bucket] += 1
+
+    def _merge_pairs(self):
+        """Halves the number of buckets by merging each bucket with its neighbour."""
+        half = self.num_buckets // 2
+        self.first_time_steps[:half] = self.first_time_steps[0::2]
+        self.last_time_steps[:half] = self.last_time_steps[1::2]
+        self.mins[:half] = np.minimum(self.mins[0::2], self.mins[1::2])
+        self.maxs[:half] = np.maximum(self.maxs[0::2], self.maxs[1::2])
+        self.sums[:half] = self.sums[0::2] + self.sums[1::2]
+        self.counts[:half] = self.counts[0::2] + self.counts[1::2]
+        self.span *= 2
+        self.used = half
+
+    def copy(self):
+        """Returns an independent copy of the summary."""
+        return copy.deepcopy(self)
+
+    def snapshot(self):
+        """
+        Returns the summary as arrays, e.g. for a checkpoint.
+
+        Returns:
+            dict[str, numpy.ndarray]: The used buckets and the current span.
+        """
+        used = self.used
+        return {
+            "first_time_steps": self.first_time_steps[:used].copy(),
+            "last_time_steps": self.last_time_steps[:used].copy(),
+            "mins": self.mins[:used].copy(),
+            "maxs": self.maxs[:used].copy(),
+            "sums": self.sums[:used].copy(),
+            "counts": self.counts[:used].copy(),
+            "span": np.array(self.span),
+        }
+
+    def restore(self, arrays):
+        """
+        Replaces the summary with one returned by snapshot().
+
+        Args:
+            arrays (dict[str, numpy.ndarray]): The arrays from snapshot().
+        """
+        used = len(arrays["counts"])
+        for name in ("first_time_steps", "last_time_steps", "mins", "maxs", "sums"):
+            getattr(self, name)[:used] = arrays[name]
+        self.counts[:used] = arrays["counts"]
+        self.span = int(arrays["span"])
+        self.used = used
+
+    def view(self):
+        """
+        Returns the summary for plotting.
+
+        Returns:
+            tuple: The bucket centers on the time axis (m,) and the minimum,
+                   maximum and mean of every series (m, num_series) each.
+        """
+        used = self.used
+        centers = (self.first_time_steps[:used] + self.last_time_steps[:used]) / 2
+        means = self.sums[:used] / self.counts[:used, None]
+        return centers, self.mins[:used].copy(), self.maxs[:used].copy(), means
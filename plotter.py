@@ -1,9 +1,10 @@
 import threading
-import queue
 
 import matplotlib
 import matplotlib.pyplot as plt
 
+from plot_buffer import MinMaxMeanDownsampler
+
 matplotlib.use("Qt5Agg")
 
 
@@ -11,41 +12,50 @@ class GamePlotter:
     """
     Manages the Matplotlib graph window for displaying game statistics.
 
-    Handles opening, closing, updating, and threading for the plot window
-    to avoid blocking the main game loop.
+    A worker thread reads only the new data points from the ring buffer the
+    game logs into and folds them into a min/max/mean summary of the whole
+    history, which starts from the game's summary of the points logged
+    before the plotter was created. Logging a point costs the game thread
+    the same no matter how long the run is. While the window is open, the worker redraws the
+    summary: one mean line and one min/max band per series.
     """
 
-    def __init__(self):
+    def __init__(self, history, summary=None):
+        """
+        Starts the worker thread; the window stays closed until toggled.
+
+        Args:
+            history (PlotRingBuffer): The buffer the game appends its logged
+                                      data points to.
+            summary (MinMaxMeanDownsampler, optional): Summary of every point
+                                                       appended to history so
+                                                       far, owned by the plotter
+                                                       from now on. Defaults to
+                                                       None, which starts from
+                                                       the points history holds.
+        """
         self.fig = None
         self.ax = None
         self.plot_lines = {}
+        self.plot_bands = {}
         self.is_graph_showing = False  # Start with graph off by default
-        self.graph_data_keys = [
-            "AvgCohesion",
-            "AvgAlignment",
-            "AvgSeparation",
-            "AvgAvoidance",
-            "AvgFoodAttraction",
-            "AvgAvoidanceDistance",
-        ]
+        self.history = history
+        self.graph_data_keys = list(history.keys)
         self.colors = ["blue", "green", "red", "purple", "orange", "brown"]
-        self.plot_data_queue = queue.Queue(maxsize=5)  # Limit queue size
-        self.plot_thread = None
+        if summary is None:
+            self.downsampler = MinMaxMeanDownsampler(len(self.graph_data_keys))
+            self.cursor = 0  # Points of the history already summarized
+        else:
+            self.downsampler = summary
+            self.cursor = history.total
+        self.redraw_requested = False
         self.stop_event = threading.Event()
         self.graph_lock = threading.Lock()  # For protecting Matplotlib objects
-        self.initial_data_to_plot = None
+        self.plot_thread = threading.Thread(target=self._plotting_worker, daemon=True)
+        self.plot_thread.start()
 
-        if self.is_graph_showing:
-            self.open_graph_window([], {key: [] for key in self.graph_data_keys})
-
-    def open_graph_window(self, time_steps, data_series_map):
-        """
-        Opens or activates the Matplotlib graph window.
-
-        Args:
-            time_steps (list): List of time steps (x-axis data).
-            data_series_map (dict): Dictionary mapping data series labels to lists of values (y-axis data).
-        """
+    def open_graph_window(self):
+        """Opens or activates the Matplotlib graph window."""
         with self.graph_lock:
             if (
                 self.is_graph_showing and self.fig
@@ -68,27 +78,19 @@ class GamePlotter:
 
             self.ax.set_xlabel("Data Point Index")
             self.ax.set_ylabel("Average Attribute Strength")
-            self.ax.set_title("Flocking Behavior Statistics Over Time")
+            self.ax.set_title(
+                "Flocking Behavior Statistics Over Time (mean, min/max band)"
+            )
             self.ax.grid(True)
 
             for i, label_text in enumerate(self.graph_data_keys):
                 (self.plot_lines[label_text],) = self.ax.plot(
                     [], [], label=label_text, color=self.colors[i]
                 )
+            self.plot_bands = {}
             self.ax.legend(loc="upper left")
-            self.is_graph_showing = True  # Set state before starting thread
-            self.initial_data_to_plot = (time_steps, data_series_map)
-
-        if self.plot_thread is None or not self.plot_thread.is_alive():
-            self.stop_event.clear()
-            self.plot_thread = threading.Thread(
-                target=self._plotting_worker, daemon=True
-            )
-            self.plot_thread.start()
-
-        if self.initial_data_to_plot:  # Send initial data to the worker
-            self.queue_new_plot_data(*self.initial_data_to_plot)
-            self.initial_data_to_plot = None
+            self.is_graph_showing = True
+            self.redraw_requested = True  # Draw the history collected so far
 
         plt.show(block=False)  # This often needs to be on the main thread
         with self.graph_lock:
@@ -98,29 +100,27 @@ class GamePlotter:
                 self.fig.canvas.draw_idle()
                 self.fig.canvas.flush_events()
 
-    def redraw_all_graph_data(self, time_steps, data_series_map):
-        """
-        Updates the data displayed on the graph and redraws it.
-
-        Args:
-            time_steps (list): List of time steps (x-axis data).
-            data_series_map (dict): Dictionary mapping data series labels to lists of values (y-axis data).
-        """
+    def redraw_all_graph_data(self):
+        """Draws the current min/max/mean summary of the whole history."""
+        centers, mins, maxs, means = self.downsampler.view()
         with self.graph_lock:  # Ensure thread-safe access to Matplotlib objects
             if not self.fig or not self.ax or not self.is_graph_showing:
                 return
 
-            max_points_to_show = 200
-            current_len_hist = len(time_steps)
-            start_index_hist = max(0, current_len_hist - max_points_to_show)
-            display_time_steps_hist = time_steps[start_index_hist:]
-
-            for label_text, line_obj in self.plot_lines.items():
-                if label_text in data_series_map:
-                    display_data_hist = data_series_map[label_text][start_index_hist:]
-                    line_obj.set_data(display_time_steps_hist, display_data_hist)
-                else:
-                    line_obj.set_data([], [])
+            for i, label_text in enumerate(self.graph_data_keys):
+                self.plot_lines[label_text].set_data(centers, means[:, i])
+                band = self.plot_bands.pop(label_text, None)
+                if band is not None:
+                    band.remove()
+                if len(centers):
+                    self.plot_bands[label_text] = self.ax.fill_between(
+                        centers,
+                        mins[:, i],
+                        maxs[:, i],
+                        color=self.colors[i],
+                        alpha=0.2,
+                        linewidth=0,
+                    )
 
             self.ax.relim()
             self.ax.autoscale_view(True, True, True)
@@ -128,17 +128,8 @@ class GamePlotter:
 
     def close_graph_window(self):
         """
-        Closes the Matplotlib graph window and stops the plotting thread.
+        Closes the Matplotlib graph window. The worker keeps summarizing new data.
         """
-        self.stop_event.set()  # Signal the worker thread to stop
-        if self.plot_thread and self.plot_thread.is_alive():
-            try:
-                self.plot_data_queue.put_nowait(None)  # Sentinel to unblock queue.get
-            except queue.Full:
-                pass  # If full, thread will see stop_event eventually
-            self.plot_thread.join(timeout=1.0)  # Wait for the thread to finish
-            self.plot_thread = None
-
         with self.graph_lock:  # Protect Matplotlib objects
             if self.fig:
                 try:
@@ -153,14 +144,16 @@ class GamePlotter:
             self.fig = None
             self.ax = None
             self.plot_lines = {}
+            self.plot_bands = {}
             self.is_graph_showing = False
 
-        # Clear any remaining items in the queue
-        while not self.plot_data_queue.empty():
-            try:
-                self.plot_data_queue.get_nowait()
-            except queue.Empty:
-                pass
+    def shutdown(self):
+        """Closes the graph window and stops the worker thread."""
+        self.close_graph_window()
+        self.stop_event.set()  # Signal the worker thread to stop
+        if self.plot_thread and self.plot_thread.is_alive():
+            self.plot_thread.join(timeout=1.0)  # Wait for the thread to finish
+            self.plot_thread = None
 
     def is_window_alive(self):
         """
@@ -176,56 +169,28 @@ class GamePlotter:
                 and plt.fignum_exists(self.fig.number)
             )
 
-    def toggle_graph_window(self, time_steps, data_series_map):
+    def toggle_graph_window(self):
         """
         Toggles the visibility of the graph window (opens if closed, closes if open).
-
-        Args: time_steps (list): List of time steps (x-axis data). data_series_map (dict): Dictionary mapping data series labels to lists of values (y-axis data).
         """
         if self.is_graph_showing and self.fig is not None:
             self.close_graph_window()
         elif not self.is_graph_showing:
-            self.open_graph_window(time_steps, data_series_map)
-
-    def queue_new_plot_data(self, time_steps, data_series_map):
-        """
-        Queues new data to be plotted by the worker thread.
-
-        Args:
-            time_steps (list): List of time steps (x-axis data).
-            data_series_map (dict): Dictionary mapping data series labels to lists of values (y-axis data).
-        """
-
-        if self.is_graph_showing and (self.plot_thread and self.plot_thread.is_alive()):
-            try:
-                # Create copies of data to avoid modification by main thread while in queue
-                data_to_queue = (
-                    list(time_steps),
-                    {k: list(v) for k, v in data_series_map.items()},
-                )
-                self.plot_data_queue.put_nowait(data_to_queue)
-            except queue.Full:
-                # Optionally log that the queue is full and data is being skipped
-                pass  # Don't block the main game thread
+            self.open_graph_window()
 
     def _plotting_worker(self):
-        """Worker thread function to handle Matplotlib plotting."""
+        """Worker thread function that summarizes new data points and redraws the plot."""
         while not self.stop_event.is_set():
             try:
-                plot_job = self.plot_data_queue.get(timeout=0.1)
-                if plot_job is None:
-                    break
-
-                time_steps, data_series_map = plot_job
-                self.redraw_all_graph_data(time_steps, data_series_map)
-                with self.graph_lock:
-                    if self.fig and self.is_graph_showing:
-                        try:
-                            pass
-                        except (AttributeError, TypeError, RuntimeError):
-                            pass
-            except queue.Empty:
-                continue
+                if self.history.wait_for_data(self.cursor, timeout=0.1):
+                    self.cursor, time_steps, values, _dropped = (
+                        self.history.read_since(self.cursor)
+                    )
+                    self.downsampler.add(time_steps, values)
+                    self.redraw_requested = True
+                if self.redraw_requested and self.is_graph_showing:
+                    self.redraw_requested = False
+                    self.redraw_all_graph_data()
             except (RuntimeError, ValueError, TypeError, AttributeError, KeyError) as e:
                 print(e.with_traceback)
                 break
@@ -0,0 +1,194 @@
+import math
+
+import numpy as np
+
+from env import POPULATION_HISTOGRAM_BINS, POPULATION_HISTOGRAM_RANGE
+
+# The heritable traits of a bird, in the order of every per-trait array below.
+TRAIT_ATTRIBUTES = (
+    "cohesion_strength",
+    "alignment_strength",
+    "separation_strength",
+    "avoidance_strength",
+    "food_attraction_strength",
+    "obstacle_avoidance_distance",
+)
+
+# Every finite float is an integer multiple of 2**-1074, the smallest subnormal.
+FIXED_POINT_BITS = 1074
+
+
+def _to_fixed(value):
+    """
+    Converts a float to exact fixed-point integers.
+
+    Returns:
+        tuple[int, int]: value * 2**FIXED_POINT_BITS and value**2 *
+                         2**(2 * FIXED_POINT_BITS), both exact.
+    """
+    numerator, denominator = value.as_integer_ratio()
+    shift = FIXED_POINT_BITS + 1 - denominator.bit_length()
+    # Squaring the small numerator before shifting is much cheaper than
+    # squaring the shifted value.
+    return numerator << shift, (numerator * numerator) << (2 * shift)
+
+
+class PopulationStats:
+    """
+    Running statistics of the traits of every bird currently in the flock.
+
+    Birds are added when they join the flock and removed when they die, so
+    the count, the sums and the sums of squares of every trait are always
+    up to date and the mean, variance and histogram can be read without a
+    pass over the birds. Traits never change after birth, so removing a bird
+    subtracts exactly what adding it added.
+
+    The sums are kept as exact integers in fixed point, so they never drift
+    however many birds come and go, the variance does not suffer from
+    cancellation, and the results depend only on the current birds, not on
+    the order they arrived in (a flock restored from a checkpoint reports
+    the same numbers as the original).
+    """
+
+    def __init__(
+        self,
+        traits=TRAIT_ATTRIBUTES,
+        histogram_bins=POPULATION_HISTOGRAM_BINS,
+        histogram_range=POPULATION_HISTOGRAM_RANGE,
+    ):
+        """
+        Initializes the statistics of an empty population.
+
+        Args:
+            traits (tuple[str], optional): The bird attributes to track. Defaults
+                                           to TRAIT_ATTRIBUTES.
+            histogram_bins (int, optional): Bins of the per-trait histograms; 0
+                                            disables them. Defaults to
+                                            POPULATION_HISTOGRAM_BINS from ENV.py.
+            histogram_range (tuple, optional): The (low, high) trait values the
+                                               bins cover; values outside fall
+                                               into the first or last bin.
+                                               Defaults to
+                                               POPULATION_HISTOGRAM_RANGE from ENV.py.
+        """
+        self.traits = tuple(traits)
+        self.histogram_bins = max(histogram_bins, 0)
+        self.histogram_low, self.histogram_high = histogram_range
+        self.count = 0
+        self.sums = [0] * len(self.traits)
+        self.sums_of_squares = [0] * len(self.traits)
+        self.histograms = [[0] * self.histogram_bins for _ in self.traits]
+
+    def _update(self, bird, sign):
+        """Adds (sign 1) or subtracts (sign -1) a bird's traits."""
+        self.count += sign
+        sums = self.sums
+        sums_of_squares = self.sums_of_squares
+        for index, name in enumerate(self.traits):
+            value = getattr(bird, name)
+            fixed, fixed_square = _to_fixed(value)
+            if sign > 0:
+                sums[index] += fixed
+                sums_of_squares[index] += fixed_square
+            else:
+                sums[index] -= fixed
+                sums_of_squares[index] -= fixed_square
+            if self.histogram_bins:
+                self.histograms[index][self._bin(value)] += sign
+
+    def add(self, bird):
+        """
+        Adds a bird's traits to the statistics.
+
+        Args:
+            bird (Bird): The bird that joined the flock.
+        """
+        self._update(bird, 1)
+
+    def remove(self, bird):
+        """
+        Removes a bird's traits from the statistics.
+
+        Args:
+            bird (Bird): The bird that left the flock.
+        """
+        self._update(bird, -1)
+
+    def _bin(self, value):
+        """Returns the histogram bin of a trait value."""
+        position = (value - self.histogram_low) / (
+            self.histogram_high - self.histogram_low
+        )
+        bin_index = math.floor(position * self.histogram_bins)
+        return min(max(bin_index, 0), self.histogram_bins - 1)
+
+    def means(self):
+        """Returns the mean of every trait, 0 for an empty population."""
+        if self.count == 0:
+            return np.zeros(len(self.traits))
+        # Integer true division is correctly rounded, however large the operands.
+        scale = self.count << FIXED_POINT_BITS
+        return np.array([total / scale for total in self.sums])
+
+    def variances(self):
+        """Returns the population variance of every trait."""
+        if self.count == 0:
+            return np.zeros(len(self.traits))
+        scale = (self.count * self.count) << (2 * FIXED_POINT_BITS)
+        return np.array(
+            [
+                (self.count * total_of_squares - total * total) / scale
+                for total, total_of_squares in zip(self.sums, self.sums_of_squares)
+            ]
+        )
+
+    def standard_deviations(self):
+        """Returns the population standard deviation of every trait."""
+        return np.sqrt(self.variances())
+
+    def diversity(self):
+        """
+        Measures the genetic diversity of the flock as the mean coefficient of
+        variation (standard deviation over mean) of the traits.
+
+        Returns:
+            float: 0 for an empty or uniform population.
+        """
+        means = np.abs(self.means())
+        deviations = self.standard_deviations()
+        ratios = np.divide(
+            deviations, means, out=np.zeros_like(means), where=means > 0
+        )
+        return float(np.mean(ratios))
+
+    def histogram(self, trait):
+        """
+        Returns the distribution of one trait.
+
+        Args:
+            trait (str): One of the tracked attributes.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: The bird count per bin and the
+                                                 histogram_bins + 1 bin edges.
+        """
+        edges = np.linspace(
+            self.histogram_low, self.histogram_high, self.histogram_bins + 1
+        )
+        return np.array(self.histograms[self.traits.index(trait)]), edges
+
+    def histogram_entropies(self):
+        """
+        Measures how evenly every trait is spread over its histogram bins.
+
+        Returns:
+            numpy.ndarray: The Shannon entropy in bits of every trait's histogram;
+                           0 when all birds share one bin.
+        """
+        if self.count == 0 or not self.histogram_bins:
+            return np.zeros(len(self.traits))
+        probabilities = np.array(self.histograms) / self.count
+        logs = np.log2(
+            probabilities, out=np.zeros_like(probabilities), where=probabilities > 0
+        )
+        return -(probabilities * logs).sum(axis=1)
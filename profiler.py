@@ -0,0 +1,246 @@
+import csv
+import gc
+import time
+from collections import deque
+
+import pygame
+
+from env import PROFILER_WINDOW_FRAMES
+
+PANEL_BACKGROUND_COLOR = (255, 255, 255, 200)
+PANEL_TEXT_COLOR = (0, 0, 0)
+PANEL_PADDING = 6
+PANEL_FONT_SIZE = 15
+
+
+class _NullPhase:
+    """Context manager that does nothing, returned while the profiler is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    """Context manager that adds the time spent in its block to one phase."""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class FrameProfiler:
+    """
+    Accumulates the wall-clock time of named phases per frame.
+
+    Phases are timed either with `with PROFILER.phase(name):` around a block
+    that runs once per frame, or with lap() for code that runs once per bird,
+    where the time of all birds is summed into the frame's total. The last
+    `window` frames are kept for rolling means and percentiles, and every
+    finished frame can be streamed to a CSV file. While disabled, phase()
+    returns a shared no-op context and hot loops skip timing after checking
+    the enabled flag once. Garbage collector pauses are timed as the phase
+    "gc", whichever phase they interrupt.
+    """
+
+    def __init__(self, window=PROFILER_WINDOW_FRAMES):
+        """
+        Initializes a disabled profiler.
+
+        Args:
+            window (int, optional): Number of recent frames the statistics are
+                                    computed over. Defaults to
+                                    PROFILER_WINDOW_FRAMES from ENV.py.
+        """
+        self.window = window
+        self.enabled = False
+        self.show_panel = False
+        self.recording = False
+        self.current = {}
+        self.history = {}
+        self.frame_index = 0
+        self.export_file = None
+        self.export_writer = None
+        self.font = None
+        self.gc_start = None
+        gc.callbacks.append(self._on_gc)
+
+    def _update_enabled(self):
+        """Times phases only while the panel is shown, recording or exporting."""
+        self.enabled = (
+            self.show_panel or self.recording or self.export_writer is not None
+        )
+        self.current = {}
+
+    def _on_gc(self, phase, info):
+        """Times a garbage collection; registered in gc.callbacks."""
+        if phase == "start":
+            self.gc_start = time.perf_counter() if self.enabled else None
+        elif self.gc_start is not None:
+            self.add("gc", time.perf_counter() - self.gc_start)
+            self.gc_start = None
+
+    def set_recording(self, recording):
+        """
+        Times phases regardless of the panel and the export, e.g. for benchmarks.
+
+        Args:
+            recording (bool): Whether to time phases.
+        """
+        self.recording = recording
+        self._update_enabled()
+
+    def toggle_panel(self):
+        """Shows or hides the on-screen panel, enabling timing while it is shown."""
+        self.show_panel = not self.show_panel
+        self._update_enabled()
+
+    def start_export(self, filename):
+        """
+        Streams the phase timings of every following frame to a CSV file.
+
+        Args:
+            filename (str): The output path.
+        """
+        self.stop_export()
+        self.export_file = open(filename, "w", newline="", encoding="utf-8")
+        self.export_writer = csv.writer(self.export_file)
+        self.export_writer.writerow(["Frame", "Phase", "Milliseconds"])
+        self._update_enabled()
+        print(f"Writing frame timings to {filename}")
+
+    def stop_export(self):
+        """Closes the CSV export, if one is running."""
+        if self.export_file is not None:
+            self.export_file.close()
+        self.export_file = None
+        self.export_writer = None
+        self._update_enabled()
+
+    def phase(self, name):
+        """
+        Returns a context manager timing its block as the phase name.
+
+        Args:
+            name (str): The phase name.
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def add(self, name, seconds):
+        """
+        Adds time to a phase of the current frame.
+
+        Args:
+            name (str): The phase name.
+            seconds (float): The time spent.
+        """
+        self.current[name] = self.current.get(name, 0.0) + seconds
+
+    def lap(self, name, since):
+        """
+        Adds the time elapsed since a timestamp to a phase of the current frame.
+
+        Args:
+            name (str): The phase name.
+            since (float): A time.perf_counter() timestamp.
+
+        Returns:
+            float: The current timestamp, to be passed to the next lap().
+        """
+        now = time.perf_counter()
+        self.current[name] = self.current.get(name, 0.0) + (now - since)
+        return now
+
+    def end_frame(self):
+        """Closes the current frame: stores its timings and writes them to the export."""
+        if not self.enabled:
+            return
+        for name in self.history.keys() | self.current.keys():
+            if name not in self.history:
+                self.history[name] = deque(maxlen=self.window)
+            samples = self.history[name]
+            samples.append(self.current.get(name, 0.0) * 1000.0)
+            if not any(samples):
+                # Not run for a whole window, e.g. after switching to the engine.
+                del self.history[name]
+        if self.export_writer is not None:
+            for name, seconds in self.current.items():
+                self.export_writer.writerow(
+                    [self.frame_index, name, f"{seconds * 1000.0:.4f}"]
+                )
+        self.current = {}
+        self.frame_index += 1
+
+    def summary(self):
+        """
+        Returns rolling statistics of every phase over the recent frames.
+
+        Returns:
+            list[tuple]: (phase, mean ms, p50 ms, p95 ms, max ms) per phase,
+                         sorted by phase name.
+        """
+        rows = []
+        for name in sorted(self.history):
+            samples = sorted(self.history[name])
+            if not samples:
+                continue
+            last = len(samples) - 1
+            rows.append(
+                (
+                    name,
+                    sum(samples) / len(samples),
+                    samples[last // 2],
+                    samples[int(last * 0.95)],
+                    samples[last],
+                )
+            )
+        return rows
+
+    def draw(self, surface, position):
+        """
+        Draws the rolling statistics as a table onto the given surface.
+
+        Args:
+            surface (pygame.Surface): The surface to draw the panel on.
+            position (tuple): The top-left corner of the panel.
+        """
+        if self.font is None:
+            # Monospaced so the columns line up.
+            self.font = pygame.font.SysFont("couriernew,monospace", PANEL_FONT_SIZE)
+        lines = [f"{'phase (ms)':<22}{'mean':>7}{'p50':>7}{'p95':>7}{'max':>7}"]
+        lines += [
+            f"{name:<22}{mean:>7.2f}{p50:>7.2f}{p95:>7.2f}{peak:>7.2f}"
+            for name, mean, p50, p95, peak in self.summary()
+        ]
+        rendered = [self.font.render(line, True, PANEL_TEXT_COLOR) for line in lines]
+        width = max(text.get_width() for text in rendered) + 2 * PANEL_PADDING
+        height = sum(text.get_height() for text in rendered) + 2 * PANEL_PADDING
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(PANEL_BACKGROUND_COLOR)
+        y = PANEL_PADDING
+        for text in rendered:
+            panel.blit(text, (PANEL_PADDING, y))
+            y += text.get_height()
+        surface.blit(panel, position)
+
+
+# The profiler every module reports to.
+PROFILER = FrameProfiler()
@@ -0,0 +1,159 @@
+import hashlib
+import json
+
+import numpy as np
+
+from flock_engine import FIELD_ATTRIBUTES
+
+REPLAY_FORMAT_VERSION = 1
+
+
+def population_checksum(game):
+    """
+    Hashes the simulation state that a replay has to reproduce exactly.
+
+    Covers the position, velocity, traits and food counter of every bird in
+    group order, the position of every food item and of every obstacle.
+
+    Args:
+        game (Game): The running game.
+
+    Returns:
+        str: A 16-digit hexadecimal digest.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    birds = game.birds_group.sprites()
+    bird_state = np.array(
+        [
+            [getattr(bird, name) for name in FIELD_ATTRIBUTES] + [bird.food_counter]
+            for bird in birds
+        ],
+        dtype=np.float64,
+    )
+    digest.update(len(birds).to_bytes(8, "little"))
+    digest.update(bird_state.tobytes())
+    food_state = np.array(
+        [food_item.rect.topleft for food_item in game.food_group], dtype=np.int64
+    )
+    digest.update(food_state.tobytes())
+    obstacle_state = np.array(
+        [obstacle.x for obstacle in game.obstacle_group], dtype=np.float64
+    )
+    digest.update(obstacle_state.tobytes())
+    return digest.hexdigest()
+
+
+class ReplayRecorder:
+    """Collects the seed, the settings snapshot and one checksum per simulated frame."""
+
+    def __init__(self, seed, settings):
+        """
+        Initializes an empty recording.
+
+        Args:
+            seed (int): The seed the run was started with.
+            settings (dict): The settings the run was started with.
+        """
+        self.seed = seed
+        self.settings = dict(settings)
+        self.first_frame = None
+        self.checksums = []
+
+    def on_frame(self, game):
+        """Records the checksum of the frame that was just simulated."""
+        if self.first_frame is None:
+            # Not 0 when recording a run resumed from a checkpoint
+            self.first_frame = game.frame_number - 1
+        self.checksums.append(population_checksum(game))
+
+    def save(self, filename):
+        """
+        Writes the replay log as JSON.
+
+        Args:
+            filename (str): The output path.
+        """
+        with open(filename, "w", encoding="utf-8") as replay_file:
+            json.dump(
+                {
+                    "version": REPLAY_FORMAT_VERSION,
+                    "seed": self.seed,
+                    "settings": self.settings,
+                    "first_frame": self.first_frame or 0,
+                    "checksums": self.checksums,
+                },
+                replay_file,
+            )
+        print(f"Replay of {len(self.checksums)} frames saved to {filename}")
+
+
+class ReplayVerifier:
+    """
+    Compares a run frame by frame against a recorded replay log.
+
+    Frames are matched by Game.frame_number, so a run resumed from a
+    checkpoint is checked against the matching tail of the recording.
+    """
+
+    def __init__(self, filename):
+        """
+        Loads a replay log written by ReplayRecorder.save.
+
+        Args:
+            filename (str): The path of the replay log.
+        """
+        with open(filename, "r", encoding="utf-8") as replay_file:
+            replay = json.load(replay_file)
+        if replay.get("version") != REPLAY_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported replay format version {replay.get('version')} in {filename}"
+            )
+        self.seed = replay["seed"]
+        self.settings = replay["settings"]
+        self.first_frame = replay.get("first_frame", 0)
+        self.checksums = replay["checksums"]
+        self.last_frame = self.first_frame + len(self.checksums) - 1
+        self.frames_checked = 0
+        self.last_frame_checked = None
+        self.first_mismatch = None
+
+    def frames_remaining(self, game):
+        """Returns how many recorded frames lie ahead of the game's current frame."""
+        return max(0, self.last_frame + 1 - max(game.frame_number, self.first_frame))
+
+    def on_frame(self, game):
+        """Checks the frame that was just simulated against the recording."""
+        frame = game.frame_number - 1
+        if not self.first_frame <= frame <= self.last_frame:
+            return
+        self.frames_checked += 1
+        self.last_frame_checked = frame
+        if self.first_mismatch is None:
+            expected = self.checksums[frame - self.first_frame]
+            if population_checksum(game) != expected:
+                self.first_mismatch = frame
+                print(f"Replay diverged at frame {frame}.")
+
+    def report(self):
+        """
+        Prints and returns the verification result.
+
+        Returns:
+            bool: True if every recorded frame was reproduced identically.
+        """
+        identical = (
+            self.first_mismatch is None and self.last_frame_checked == self.last_frame
+        )
+        if identical:
+            print(f"Replay verified: {self.frames_checked} frames are identical.")
+        elif self.first_mismatch is not None:
+            print(
+                f"Replay verification failed: first difference at frame "
+                f"{self.first_mismatch} of {self.last_frame + 1}."
+            )
+        else:
+            print(
+                f"Replay verification incomplete: the run stopped before frame "
+                f"{self.last_frame} of the recording."
+            )
+        return identical
@@ -0,0 +1,69 @@
+import itertools
+import random
+
+# The one random stream every simulation component draws from. It is reseeded
+# in place by seed_all, so modules can keep a reference to it.
+RNG = random.Random()
+
+_serial_counter = itertools.count()
+
+
+def seed_all(seed):
+    """
+    Seeds the shared random stream and restarts the entity serial numbers.
+
+    Two runs seeded with the same value and the same settings produce the same
+    simulation frame by frame.
+
+    Args:
+        seed (int): The seed.
+    """
+    global _serial_counter  # pylint: disable=global-statement
+    RNG.seed(seed)
+    _serial_counter = itertools.count()
+
+
+def next_serial():
+    """
+    Returns the next entity serial number.
+
+    Serial numbers increase in creation order and, unlike id(), are the same
+    in every run, so they are used to break ties between equidistant birds.
+
+    Returns:
+        int: The serial number.
+    """
+    return next(_serial_counter)
+
+
+def get_state():
+    """
+    Captures the position of the random stream and of the serial numbers.
+
+    Returns:
+        dict: A JSON-serializable state for set_state.
+    """
+    global _serial_counter  # pylint: disable=global-statement
+    next_value = next(_serial_counter)
+    _serial_counter = itertools.count(next_value)
+    version, internal_state, gauss_next = RNG.getstate()
+    return {
+        "version": version,
+        "internal_state": list(internal_state),
+        "gauss_next": gauss_next,
+        "next_serial": next_value,
+    }
+
+
+def set_state(state):
+    """
+    Restores a state captured by get_state, so the run continues identically.
+
+    Args:
+        state (dict): The state returned by get_state.
+    """
+    global _serial_counter  # pylint: disable=global-statement
+    RNG.setstate(
+        (state["version"], tuple(state["internal_state"]), state["gauss_next"])
+    )
+    _serial_counter = itertools.count(state["next_serial"])
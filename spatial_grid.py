@@ -0,0 +1,349 @@
+import heapq
+import math
+
+import numpy as np
+
+from env import SPATIAL_GRID_CELL_SIZE
+
+BRUTE_FORCE_CHUNK_ROWS = 256
+
+
+class SpatialGrid:
+    """
+    Uniform grid (cell list) over the bird population used for neighbor queries.
+
+    The grid is rebuilt once per frame from the birds group and then shared by
+    every bird. Birds keep moving while the frame is processed, so each bird is
+    filed under the cell of the position it had at rebuild time, and queries
+    widen their search by `max_displacement` (the furthest a bird can travel in
+    one frame). Distances themselves are always measured on the live positions,
+    which keeps the results identical to a brute-force scan of the group.
+    """
+
+    def __init__(self, cell_size=SPATIAL_GRID_CELL_SIZE):
+        """
+        Initializes an empty grid.
+
+        Args:
+            cell_size (float, optional): Width and height of a grid cell in pixels.
+                                         Defaults to SPATIAL_GRID_CELL_SIZE from ENV.py.
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+        self.cell_of = {}
+        self.max_displacement = 0.0
+        self.min_cell_x = self.max_cell_x = 0
+        self.min_cell_y = self.max_cell_y = 0
+
+    def _cell_coords(self, x, y):
+        """Returns the (column, row) of the cell containing the point (x, y)."""
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def rebuild(self, birds, max_displacement=0.0):
+        """
+        Clears the grid and files every bird under the cell of its current position.
+
+        Args:
+            birds (iterable[Bird]): The birds to index, usually the birds group.
+            max_displacement (float, optional): Upper bound on how far any bird can
+                                                move before the next rebuild.
+        """
+        self.cells = {}
+        self.cell_of = {}
+        self.max_displacement = max_displacement
+        self.min_cell_x = self.min_cell_y = math.inf
+        self.max_cell_x = self.max_cell_y = -math.inf
+        for bird in birds:
+            self.insert(bird)
+
+    def insert(self, bird):
+        """
+        Adds a bird to the grid, e.g. an offspring born during the current frame.
+
+        Args:
+            bird (Bird): The bird to add.
+        """
+        cell = self._cell_coords(bird.x, bird.y)
+        self.cells.setdefault(cell, []).append(bird)
+        self.cell_of[bird] = cell
+        self.min_cell_x = min(self.min_cell_x, cell[0])
+        self.max_cell_x = max(self.max_cell_x, cell[0])
+        self.min_cell_y = min(self.min_cell_y, cell[1])
+        self.max_cell_y = max(self.max_cell_y, cell[1])
+
+    def remove(self, bird):
+        """
+        Removes a bird from the grid, e.g. when it dies during the current frame.
+
+        Args:
+            bird (Bird): The bird to remove. Unknown birds are ignored.
+        """
+        cell = self.cell_of.pop(bird, None)
+        if cell is None:
+            return
+        members = self.cells[cell]
+        members.remove(bird)
+        if not members:
+            del self.cells[cell]
+
+    def _ring_cells(self, center_x, center_y, ring):
+        """Yields the non-empty cell lists lying exactly `ring` cells away from the center."""
+        if ring == 0:
+            members = self.cells.get((center_x, center_y))
+            if members:
+                yield members
+            return
+        for cell_x in range(center_x - ring, center_x + ring + 1):
+            for cell_y in (center_y - ring, center_y + ring):
+                members = self.cells.get((cell_x, cell_y))
+                if members:
+                    yield members
+        for cell_y in range(center_y - ring + 1, center_y + ring):
+            for cell_x in (center_x - ring, center_x + ring):
+                members = self.cells.get((cell_x, cell_y))
+                if members:
+                    yield members
+
+    def _max_ring(self, center_x, center_y):
+        """Returns the ring index beyond which no occupied cell exists."""
+        if not self.cells:
+            return 0
+        return int(
+            max(
+                center_x - self.min_cell_x,
+                self.max_cell_x - center_x,
+                center_y - self.min_cell_y,
+                self.max_cell_y - center_y,
+                0,
+            )
+        )
+
+    def k_nearest(self, bird, k):
+        """
+        Finds the k birds closest to the given bird.
+
+        Ties are broken the same way as in Bird.get_closest_n_birds, so the
+        result matches the brute-force search exactly.
+
+        Args:
+            bird (Bird): The bird whose neighbors are requested. It is never
+                         part of the result.
+            k (int): The number of neighbors to return.
+
+        Returns:
+            list[Bird]: Up to k birds, ordered from closest to farthest.
+        """
+        if k <= 0:
+            return []
+        center_x, center_y = self._cell_coords(bird.x, bird.y)
+        max_ring = self._max_ring(center_x, center_y)
+        candidates = []
+        ring = 0
+        while True:
+            for members in self._ring_cells(center_x, center_y, ring):
+                for other_bird in members:
+                    if other_bird is bird:
+                        continue
+                    dx = other_bird.x - bird.x
+                    dy = other_bird.y - bird.y
+                    candidates.append((dx**2 + dy**2, other_bird.serial, other_bird))
+            if ring >= max_ring:
+                break
+            # Every bird within this live distance has been visited already.
+            covered = ring * self.cell_size - self.max_displacement
+            if covered > 0 and len(candidates) >= k:
+                kth_dist_sq = heapq.nsmallest(k, candidates)[-1][0]
+                if kth_dist_sq <= covered**2:
+                    break
+            ring += 1
+        return [entry[2] for entry in heapq.nsmallest(k, candidates)]
+
+    def query_radius(self, x, y, radius, exclude=None):
+        """
+        Finds all birds within a given distance of a point.
+
+        Args:
+            x (float): The x-coordinate of the query point.
+            y (float): The y-coordinate of the query point.
+            radius (float): The search radius in pixels.
+            exclude (Bird, optional): A bird to leave out of the result, typically
+                                      the bird doing the query.
+
+        Returns:
+            list[Bird]: The birds whose live position lies within the radius.
+        """
+        if not self.cells:
+            return []
+        reach = radius + self.max_displacement
+        min_x, min_y = self._cell_coords(x - reach, y - reach)
+        max_x, max_y = self._cell_coords(x + reach, y + reach)
+        radius_sq = radius**2
+        found = []
+        for cell_x in range(max(min_x, self.min_cell_x), min(max_x, self.max_cell_x) + 1):
+            for cell_y in range(
+                max(min_y, self.min_cell_y), min(max_y, self.max_cell_y) + 1
+            ):
+                for other_bird in self.cells.get((cell_x, cell_y), ()):
+                    if other_bird is exclude:
+                        continue
+                    if (other_bird.x - x) ** 2 + (other_bird.y - y) ** 2 <= radius_sq:
+                        found.append(other_bird)
+        return found
+
+
+def _brute_force_k_nearest(x, y, ids, k, rows):
+    """
+    Exact k-nearest search for the given query rows against every point.
+
+    Args:
+        x (numpy.ndarray): X-coordinates of all points.
+        y (numpy.ndarray): Y-coordinates of all points.
+        ids (numpy.ndarray): Tie-break key of every point.
+        k (int): Number of neighbors per row (at most len(x) - 1).
+        rows (numpy.ndarray): Indices of the query points.
+
+    Returns:
+        numpy.ndarray: A (len(rows), k) array of neighbor indices.
+    """
+    result = np.empty((len(rows), k), dtype=np.intp)
+    for start in range(0, len(rows), BRUTE_FORCE_CHUNK_ROWS):
+        chunk = rows[start : start + BRUTE_FORCE_CHUNK_ROWS]
+        dist_sq = (x[None, :] - x[chunk, None]) ** 2 + (y[None, :] - y[chunk, None]) ** 2
+        dist_sq[np.arange(len(chunk)), chunk] = np.inf
+        tie_keys = np.broadcast_to(ids, dist_sq.shape)
+        order = np.lexsort((tie_keys, dist_sq), axis=-1)
+        result[start : start + len(chunk)] = order[:, :k]
+    return result
+
+
+def _block_candidates(rows, grid, reach):
+    """
+    Pairs every query row with the points in the cells around its own cell.
+
+    Args:
+        rows (numpy.ndarray): Indices of the query points.
+        grid (dict): Cell layout built by k_nearest_indices.
+        reach (int): Number of cells to search in every direction.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: Parallel arrays of query and
+                                             candidate indices (self excluded).
+    """
+    cell_x = grid["cell_x"][rows]
+    cell_y = grid["cell_y"][rows]
+    num_cols = grid["num_cols"]
+    num_rows = grid["num_rows"]
+    query_parts = []
+    candidate_parts = []
+    for offset_x in range(-reach, reach + 1):
+        for offset_y in range(-reach, reach + 1):
+            nx = cell_x + offset_x
+            ny = cell_y + offset_y
+            valid = (nx >= 0) & (nx < num_cols) & (ny >= 0) & (ny < num_rows)
+            neighbor_cells = ny[valid] * num_cols + nx[valid]
+            counts = grid["cell_counts"][neighbor_cells]
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            run_starts = np.repeat(np.cumsum(counts) - counts, counts)
+            within = np.arange(total) - run_starts
+            query_parts.append(np.repeat(rows[valid], counts))
+            candidate_parts.append(
+                grid["order"][
+                    np.repeat(grid["cell_starts"][neighbor_cells], counts) + within
+                ]
+            )
+    if not query_parts:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    queries = np.concatenate(query_parts)
+    candidates = np.concatenate(candidate_parts)
+    not_self = queries != candidates
+    return queries[not_self], candidates[not_self]
+
+
+def k_nearest_indices(x, y, ids, k, cell_size=SPATIAL_GRID_CELL_SIZE, rows=None):
+    """
+    Vectorized k-nearest-neighbor search over a whole population at once.
+
+    Points are bucketed into a uniform grid and every point is first matched
+    against the 3x3 block of cells around it, then a 5x5 block if its k-th
+    candidate is not provably inside the smaller one. Points that are still
+    not settled fall back to an exact brute-force search, so the result is
+    always the same as sorting all other points by (squared distance, id),
+    the order used by Bird.get_closest_n_birds.
+
+    Args:
+        x (numpy.ndarray): X-coordinates of all points.
+        y (numpy.ndarray): Y-coordinates of all points.
+        ids (numpy.ndarray): Integer tie-break key of every point.
+        k (int): Number of neighbors requested per point.
+        cell_size (float, optional): Largest grid cell size in pixels; dense
+                                     populations use smaller cells. Defaults to
+                                     SPATIAL_GRID_CELL_SIZE from ENV.py.
+        rows (numpy.ndarray, optional): Ascending indices of the points whose
+                                        neighbors are requested, searched among
+                                        all points. Defaults to every point.
+
+    Returns:
+        numpy.ndarray: A (len(rows), min(k, n - 1)) array whose row i holds the
+                       indices of the neighbors of point rows[i] (of point i if
+                       rows is not given), closest first.
+    """
+    count = len(x)
+    rows = np.arange(count) if rows is None else np.asarray(rows, dtype=np.intp)
+    k = min(k, count - 1)
+    if k <= 0:
+        return np.empty((len(rows), 0), dtype=np.intp)
+
+    # Size the cells after the expected k-th neighbor distance so that a
+    # 3x3 block holds a few times k points rather than hundreds.
+    area = max(float(np.ptp(x)) * float(np.ptp(y)), 1.0)
+    expected_kth_distance = math.sqrt((k + 1) * area / (math.pi * count))
+    cell_size = max(min(cell_size, expected_kth_distance), 1.0)
+
+    cell_x = np.floor(x / cell_size).astype(np.int64)
+    cell_y = np.floor(y / cell_size).astype(np.int64)
+    cell_x -= cell_x.min()
+    cell_y -= cell_y.min()
+    num_cols = int(cell_x.max()) + 1
+    num_rows = int(cell_y.max()) + 1
+    cell = cell_y * num_cols + cell_x
+    cell_counts = np.bincount(cell, minlength=num_cols * num_rows)
+    grid = {
+        "cell_x": cell_x,
+        "cell_y": cell_y,
+        "num_cols": num_cols,
+        "num_rows": num_rows,
+        "order": np.argsort(cell, kind="stable"),
+        "cell_counts": cell_counts,
+        "cell_starts": np.cumsum(cell_counts) - cell_counts,
+    }
+
+    result = np.empty((len(rows), k), dtype=np.intp)
+    pending = np.arange(len(rows))  # Positions in rows of the unsettled points
+    for reach in (1, 2):
+        queries, candidates = _block_candidates(rows[pending], grid, reach)
+        if len(queries) == 0:
+            continue
+        dist_sq = (x[candidates] - x[queries]) ** 2 + (y[candidates] - y[queries]) ** 2
+        ranking = np.lexsort((ids[candidates], dist_sq, queries))
+        queries = queries[ranking]
+        candidates = candidates[ranking]
+        dist_sq = dist_sq[ranking]
+
+        group_starts = np.searchsorted(queries, rows[pending])
+        group_ends = np.searchsorted(queries, rows[pending], side="right")
+        # A block reaching `reach` cells out covers every point closer than
+        # reach * cell_size, so a k-th candidate within that distance proves
+        # the row is complete.
+        settled = group_ends - group_starts >= k
+        kth_positions = np.minimum(group_starts + k - 1, len(queries) - 1)
+        settled &= dist_sq[kth_positions] <= (reach * cell_size) ** 2
+        picks = group_starts[settled, None] + np.arange(k)
+        result[pending[settled]] = candidates[picks]
+        pending = pending[~settled]
+        if len(pending) == 0:
+            return result
+    result[pending] = _brute_force_k_nearest(x, y, ids, k, rows[pending])
+    return result
@@ -0,0 +1,175 @@
+import pygame
+
+from env import (
+    DEFAULT_RADIUS,
+    FOOD_SIZE,
+    COMET_HEAD_WIDTH,
+    COMET_HEAD_HEIGHT,
+    COMET_HEAD_GLOW_COLOR,
+    COMET_HEAD_CORE_COLOR,
+)
+
+BIRD_WIDTH = DEFAULT_RADIUS * 5
+BIRD_HEIGHT = DEFAULT_RADIUS * 3
+BIRD_BODY_COLOR = (170, 190, 220)  # Light bluish-grey
+BIRD_WING_COLOR = (140, 160, 190)  # Darker bluish-grey
+BIRD_BEAK_COLOR = (255, 180, 0)  # Bright orange/yellow
+BIRD_EYE_COLOR = (0, 0, 0)
+BIRD_WING_OFFSETS = (0, -2)  # Wings normal, wings up; one animation frame each
+FOOD_COLOR = (220, 50, 50, 200)
+
+
+def _draw_bird_frame(wing_offset):
+    """
+    Creates a Pygame Surface representing a small bird.
+
+    The bird is drawn facing to the right, with a simple body, wing, beak, and eye.
+    The wing position can be offset for animation.
+
+    Args:
+        wing_offset (int): Vertical offset for the wing, used for flapping animation.
+
+    Returns:
+        pygame.Surface: A Surface object with the bird image.
+    """
+    image = pygame.Surface((BIRD_WIDTH, BIRD_HEIGHT), pygame.SRCALPHA)
+    body_rect = pygame.Rect(0, 1, BIRD_WIDTH - 3, BIRD_HEIGHT - 2)
+    pygame.draw.ellipse(image, BIRD_BODY_COLOR, body_rect)
+    wing_width = int(BIRD_WIDTH * 0.4)
+    wing_height = int(BIRD_HEIGHT * 0.5)
+    wing_x = body_rect.centerx - wing_width - 1
+    wing_y = body_rect.centery - wing_height // 2 + wing_offset  # Apply offset
+    pygame.draw.ellipse(
+        image, BIRD_WING_COLOR, (wing_x, wing_y, wing_width, wing_height)
+    )
+    beak_tip_x = BIRD_WIDTH - 1
+    beak_tip_y = BIRD_HEIGHT // 2
+    beak_base_x = BIRD_WIDTH - 4
+    pygame.draw.polygon(
+        image,
+        BIRD_BEAK_COLOR,
+        [
+            (beak_tip_x, beak_tip_y),
+            (beak_base_x, beak_tip_y - 2),
+            (beak_base_x, beak_tip_y + 2),
+        ],
+    )
+    eye_x = int(BIRD_WIDTH * 0.70)
+    eye_y = int(BIRD_HEIGHT * 0.35)
+    pygame.draw.circle(image, BIRD_EYE_COLOR, (eye_x, eye_y), 1)
+    return image
+
+
+def _draw_bird_frames():
+    """Returns the animation frames of a bird, one per wing offset."""
+    return tuple(_draw_bird_frame(offset) for offset in BIRD_WING_OFFSETS)
+
+
+def _draw_food():
+    """Returns the image of a food item, a translucent red circle."""
+    image = pygame.Surface((FOOD_SIZE, FOOD_SIZE), pygame.SRCALPHA)
+    pygame.draw.circle(
+        image, FOOD_COLOR, (FOOD_SIZE // 2, FOOD_SIZE // 2), FOOD_SIZE // 2
+    )
+    return image
+
+
+def _draw_comet_head():
+    """
+    Creates the visual surface for the comet's head.
+
+    Returns:
+        pygame.Surface: A surface representing the comet's head with a glow and core.
+    """
+    head_surface = pygame.Surface(
+        (COMET_HEAD_WIDTH, COMET_HEAD_HEIGHT), pygame.SRCALPHA
+    )
+    center_x = COMET_HEAD_WIDTH // 2
+    center_y = COMET_HEAD_HEIGHT // 2
+    pygame.draw.circle(
+        head_surface,
+        COMET_HEAD_GLOW_COLOR,
+        (center_x, center_y),
+        COMET_HEAD_WIDTH // 2,
+    )
+    core_radius = int(COMET_HEAD_WIDTH * 0.35)
+    pygame.draw.circle(
+        head_surface, COMET_HEAD_CORE_COLOR, (center_x, center_y), core_radius
+    )
+    return head_surface
+
+
+class SpriteAtlas:
+    """
+    The images of every entity kind, drawn once and shared by all instances.
+
+    Every bird, food item and comet looks the same as the others of its
+    kind, so instead of drawing its own surfaces in its constructor, each
+    instance references the atlas entry. Entries are drawn on first use, or
+    all at once by build() at startup. The surfaces are shared and must not
+    be drawn on; an instance that needs a different look draws its own copy.
+    """
+
+    BUILDERS = {
+        "bird_frames": _draw_bird_frames,
+        "food": _draw_food,
+        "comet_head": _draw_comet_head,
+    }
+
+    def __init__(self):
+        """Initializes an empty atlas."""
+        self.entries = {}
+
+    def get(self, name):
+        """
+        Returns an entry, drawing it on first use.
+
+        Args:
+            name (str): One of the keys of BUILDERS.
+
+        Returns:
+            pygame.Surface or tuple[pygame.Surface]: The shared image(s).
+        """
+        entry = self.entries.get(name)
+        if entry is None:
+            entry = self.BUILDERS[name]()
+            self.entries[name] = entry
+        return entry
+
+    def build(self):
+        """Draws every entry that has not been drawn yet."""
+        for name in self.BUILDERS:
+            self.get(name)
+
+    def bird_frames(self):
+        """Returns the bird animation frames, facing right."""
+        return self.get("bird_frames")
+
+    def food(self):
+        """Returns the image of a food item."""
+        return self.get("food")
+
+    def comet_head(self):
+        """Returns the image of a comet's head."""
+        return self.get("comet_head")
+
+    def stats(self):
+        """
+        Returns the atlas metrics.
+
+        Returns:
+            dict: The number of surfaces and the pixel bytes they hold.
+        """
+        surfaces = []
+        for entry in self.entries.values():
+            surfaces.extend(entry if isinstance(entry, tuple) else (entry,))
+        return {
+            "surfaces": len(surfaces),
+            "total_bytes": sum(
+                surface.get_pitch() * surface.get_height() for surface in surfaces
+            ),
+        }
+
+
+# Shared by every entity; built by the Game at startup.
+SPRITE_ATLAS = SpriteAtlas()
@@ -0,0 +1,101 @@
+from collections import OrderedDict
+
+import pygame
+
+from env import BIRD_ROTATION_HEADINGS, BIRD_ROTATION_CACHE_MAX_BYTES
+
+
+class RotationCache:
+    """
+    Shared, lazily filled cache of pre-rotated sprite frames.
+
+    Headings are quantized to a fixed angular resolution, so every bird flying
+    in roughly the same direction reuses the same rotated Surface instead of
+    calling pygame.transform.rotate every frame. Entries are evicted in
+    least-recently-used order once the cached surfaces exceed a memory bound.
+    """
+
+    def __init__(
+        self, headings=BIRD_ROTATION_HEADINGS, max_bytes=BIRD_ROTATION_CACHE_MAX_BYTES
+    ):
+        """
+        Initializes an empty cache.
+
+        Args:
+            headings (int, optional): Number of distinct headings per frame. 0
+                                      disables caching and rotates exactly.
+                                      Defaults to BIRD_ROTATION_HEADINGS from ENV.py.
+            max_bytes (int, optional): Upper bound on the pixel memory held by
+                                       the cache. Defaults to
+                                       BIRD_ROTATION_CACHE_MAX_BYTES from ENV.py.
+        """
+        self.headings = headings
+        self.max_bytes = max_bytes
+        self.surfaces = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, frame_key, base_image, angle_deg):
+        """
+        Returns base_image rotated to the nearest cached heading.
+
+        Args:
+            frame_key (hashable): Identifies the unrotated frame, e.g. the
+                                  animation frame index. Frames with the same
+                                  key must look the same.
+            base_image (pygame.Surface): The unrotated frame, used on a miss.
+            angle_deg (float): The requested rotation in degrees.
+
+        Returns:
+            pygame.Surface: The rotated frame. It is shared and must not be
+                            drawn on.
+        """
+        if self.headings <= 0:
+            return pygame.transform.rotate(base_image, angle_deg)
+
+        step = 360.0 / self.headings
+        heading = int(round(angle_deg / step)) % self.headings
+        key = (frame_key, heading)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = pygame.transform.rotate(base_image, heading * step)
+        self.surfaces[key] = surface
+        self.total_bytes += surface.get_pitch() * surface.get_height()
+        while self.total_bytes > self.max_bytes and len(self.surfaces) > 1:
+            _, evicted = self.surfaces.popitem(last=False)
+            self.total_bytes -= evicted.get_pitch() * evicted.get_height()
+            self.evictions += 1
+        return surface
+
+    def hit_rate(self):
+        """Returns the fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """
+        Returns the cache metrics.
+
+        Returns:
+            dict: Hits, misses, evictions, hit rate, number of entries and the
+                  total pixel bytes held.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate(),
+            "entries": len(self.surfaces),
+            "total_bytes": self.total_bytes,
+        }
+
+
+# Shared by every bird; all birds are drawn from the same animation frames.
+BIRD_ROTATION_CACHE = RotationCache()
@@ -0,0 +1,189 @@
+import csv
+import json
+import queue
+import struct
+import threading
+
+import numpy as np
+
+from env import STATS_SINK_CLOSE_TIMEOUT_SECONDS, STATS_SINK_MAX_PENDING_ROWS
+
+# Binary layout: magic, uint32 header length, JSON header with the column
+# names and dtypes, then one block per written batch: a uint32 row count
+# followed by the values of each column in turn.
+BINARY_MAGIC = b"SWSTATS1"
+_UINT32 = struct.Struct("<I")
+
+STATS_FORMATS = ("csv", "binary")
+
+
+class StatsSink:
+    """
+    Append-only statistics file written by a background thread.
+
+    The game thread only hands rows over; the writer thread takes every row
+    that is waiting, writes them as one batch and flushes the file, so a
+    killed process loses at most the rows that were still queued. The queue
+    is bounded, so memory stays fixed however long the run is.
+
+    Two formats are supported: CSV with a header line, and a compact binary
+    format that stores each batch column by column (see read_binary_stats).
+    """
+
+    def __init__(
+        self,
+        filename,
+        columns,
+        stats_format="csv",
+        dtypes=None,
+        max_pending_rows=STATS_SINK_MAX_PENDING_ROWS,
+    ):
+        """
+        Creates the file, writes its header and starts the writer thread.
+
+        Args:
+            filename (str): The output path; an existing file is replaced.
+            columns (list[str]): The column names.
+            stats_format (str, optional): "csv" or "binary". Defaults to "csv".
+            dtypes (list[str], optional): NumPy dtype of each column in the binary
+                                          format. Defaults to int64 for the first
+                                          column (the time step) and float64 for
+                                          the others.
+            max_pending_rows (int, optional): Rows that may wait for the writer
+                                              before append() blocks. Defaults to
+                                              STATS_SINK_MAX_PENDING_ROWS from ENV.py.
+        """
+        if stats_format not in STATS_FORMATS:
+            raise ValueError(
+                f"Unknown stats format '{stats_format}'. Choose from: {', '.join(STATS_FORMATS)}"
+            )
+        self.filename = filename
+        self.columns = list(columns)
+        self.stats_format = stats_format
+        if dtypes is None:
+            dtypes = ["<i8"] + ["<f8"] * (len(self.columns) - 1)
+        self.dtypes = [np.dtype(dtype) for dtype in dtypes]
+        self.rows_written = 0
+        self.pending = queue.Queue(maxsize=max(1, max_pending_rows))
+
+        if stats_format == "csv":
+            self.file = open(filename, "w", newline="", encoding="utf-8")
+            self.csv_writer = csv.writer(self.file)
+            self.csv_writer.writerow(self.columns)
+        else:
+            self.file = open(filename, "wb")
+            self.csv_writer = None
+            header = json.dumps(
+                {"columns": self.columns, "dtypes": [dtype.str for dtype in self.dtypes]}
+            ).encode("utf-8")
+            self.file.write(BINARY_MAGIC + _UINT32.pack(len(header)) + header)
+        self.file.flush()
+
+        self.thread = threading.Thread(target=self._write_loop, daemon=True)
+        self.thread.start()
+
+    def append(self, row):
+        """
+        Queues one row for writing.
+
+        Args:
+            row (list): One value per column.
+        """
+        self.pending.put(row)
+
+    def _write_loop(self):
+        """Writes everything that is queued as one batch until the None sentinel arrives."""
+        stopping = False
+        while not stopping:
+            batch = [self.pending.get()]
+            while True:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                stopping = True
+                batch.pop()
+            if batch:
+                # Any failure only loses this batch; the thread keeps draining
+                # the queue so append() and close() never wait on a dead writer.
+                try:
+                    self._write_batch(batch)
+                except Exception as e:  # pylint: disable=broad-except
+                    print(
+                        f"Error writing statistics to {self.filename}: "
+                        f"{type(e).__name__}: {e}"
+                    )
+
+    def _write_batch(self, batch):
+        """Appends a batch of rows to the file and flushes it to the operating system."""
+        if self.csv_writer is not None:
+            self.csv_writer.writerows(batch)
+        else:
+            # Converted before writing, so a bad value leaves no partial block.
+            blocks = [
+                np.asarray(values, dtype=dtype).tobytes()
+                for values, dtype in zip(zip(*batch), self.dtypes)
+            ]
+            self.file.write(_UINT32.pack(len(batch)) + b"".join(blocks))
+        self.file.flush()
+        self.rows_written += len(batch)
+
+    def close(self, timeout=STATS_SINK_CLOSE_TIMEOUT_SECONDS):
+        """
+        Writes the queued rows, stops the writer thread and closes the file.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the writer before
+                                       giving up on the queued rows. Defaults to
+                                       STATS_SINK_CLOSE_TIMEOUT_SECONDS from ENV.py.
+        """
+        try:
+            self.pending.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.thread.join(timeout)
+        if self.thread.is_alive():
+            # The file is left to the writer, which may still be using it.
+            print(
+                f"Statistics writer for {self.filename} did not finish within "
+                f"{timeout}s; queued rows may be missing."
+            )
+            return
+        self.file.close()
+        print(f"Graph data saved to {self.filename} ({self.rows_written} rows)")
+
+
+def read_binary_stats(filename):
+    """
+    Reads a file written by StatsSink in the binary format, one batch at a time.
+
+    A batch that was cut off by a crash is ignored, so every complete batch
+    before it can still be read.
+
+    Args:
+        filename (str): The path of the statistics file.
+
+    Yields:
+        tuple[list[str], dict]: The column names and the batch as a dict of
+                                column name to numpy array.
+    """
+    with open(filename, "rb") as stats_file:
+        if stats_file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"{filename} is not a binary statistics file")
+        (header_length,) = _UINT32.unpack(stats_file.read(_UINT32.size))
+        header = json.loads(stats_file.read(header_length).decode("utf-8"))
+        columns = header["columns"]
+        dtypes = [np.dtype(dtype) for dtype in header["dtypes"]]
+        while True:
+            count_bytes = stats_file.read(_UINT32.size)
+            if len(count_bytes) < _UINT32.size:
+                return
+            (count,) = _UINT32.unpack(count_bytes)
+            batch = {}
+            for name, dtype in zip(columns, dtypes):
+                data = stats_file.read(count * dtype.itemsize)
+                if len(data) < count * dtype.itemsize:
+                    return
+                batch[name] = np.frombuffer(data, dtype=dtype)
+            yield columns, batch